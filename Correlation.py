@@ -1,32 +1,75 @@
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.stats import pearsonr
-import pandas as pd
+from classroom import get_classroom
+from classroom_view import show_class_controls, show_class_round
+from guide_cache import get_guide_cache
+from leaderboard import get_leaderboard
+from game_config import ROUND_POINTS
+from plot_backend import new_plot, show_guide, show_plot
+from puzzle_view import show_puzzle_code, show_replay
+from prerender import cancel_prerender, prerender_round, prerendered, prerendered_r
+from puzzles import get_puzzle_cache, new_puzzles
+from scoreboard_view import show_scoreboard
+from seeding import GUIDE_SEED, make_rng, new_seed
+from section_timing import get_section_timings
+from session_janitor import session_store
+from timing_view import count_rerun, count_round, finish_rerun, fragment, rerun, show_section_timings, start_rerun
 
 # ---------------------
 # Streamlit config
 # ---------------------
 st.set_page_config(page_title="Guess the Correlation!", layout="centered")
+GAME = "Correlation"  # this app's key on the shared leaderboard
+timings = get_section_timings()
+start_rerun(GAME)  # stopped at the end of the script, or by rerun()
+count_rerun()
 st.title("🎓 Correlation Guessing Game")
 
 # ---------------------
 # Session state setup
 # ---------------------
-if "x" not in st.session_state:
-    st.session_state.x = None
-if "y" not in st.session_state:
-    st.session_state.y = None
+if "puzzle" not in st.session_state:
+    st.session_state.puzzle = None  # the round on screen; its points live in the shared puzzle cache
 if "corr" not in st.session_state:
     st.session_state.corr = None
 if "round" not in st.session_state:
     st.session_state.round = 1
 if "score" not in st.session_state:
     st.session_state.score = 0
-if "scoreboard" not in st.session_state:
-    st.session_state.scoreboard = pd.DataFrame(columns=["Name", "Total Score"])
 if "student_name" not in st.session_state:
     st.session_state.student_name = ""
+if "game" not in st.session_state:
+    st.session_state.game = None
+    st.session_state.game_seed = None
+
+
+def round_figure():
+    """This session's guessing plot, built the first time a round is shown"""
+    store = session_store()  # outside session state, so the session janitor can drop it
+    if "round_figure" not in store:
+        # One figure per session; new rounds only swap the points
+        store["round_figure"] = new_plot(c='orange', edgecolors='black')
+        store["round_figure"].set_title("📊 Estimate the correlation")
+    return store["round_figure"]
+
+
+def new_game(seed):
+    """Puzzles for all 5 rounds, drawn from ``seed``"""
+    return new_puzzles(GAME, make_rng(seed), [(None, None, ROUND_POINTS)] * 5)
+
+
+def class_puzzle():
+    """A fresh round for class mode, drawn like a game round"""
+    return new_game(new_seed())[0]
+
+
+def round_plot(puzzle, x, y):
+    """A round's plot on a figure of its own, for class rounds and background pre-rendering"""
+    plot = new_plot(c='orange', edgecolors='black')
+    plot.set_data(x, y)
+    plot.set_title("📊 Estimate the correlation")
+    return plot
+
 
 # ---------------------
 # Show correlation examples before the game starts
@@ -37,20 +80,23 @@ if st.session_state.student_name == "":
     col1, col2, col3 = st.columns(3)
 
     def plot_example(corr, title, col):
-        x = np.linspace(0, 1, 100)
-        if corr == 1:
-            y = x
-        elif corr == -1:
-            y = -x
-        else:
-            y = np.random.rand(100)
-        fig, ax = plt.subplots()
-        ax.scatter(x, y, c='skyblue', edgecolors='black')
-        ax.set_title(title, fontsize=14)
-        ax.set_xlabel("X", fontsize=12)
-        ax.set_ylabel("Y", fontsize=12)
-        ax.tick_params(axis='both', labelsize=10)
-        col.pyplot(fig)
+        def build():
+            x = np.linspace(0, 1, 100)
+            if corr == 1:
+                y = x
+            elif corr == -1:
+                y = -x
+            else:
+                y = make_rng(GUIDE_SEED).random(100)
+            plot = new_plot(c='skyblue', edgecolors='black')
+            plot.set_data(x, y)
+            plot.set_title(title, fontsize=14)
+            plot.set_labels("X", "Y", fontsize=12)
+            return plot
+
+        # Built once per process, then served from the shared guide cache
+        with timings.section(GAME, "guides"):
+            show_guide(col, corr, "classic", build)
 
     with col1:
         plot_example(1, "+1: Strong Positive", col1)
@@ -66,73 +112,104 @@ if st.session_state.student_name == "":
 # ---------------------
 # Name input (once)
 # ---------------------
+class_round = get_classroom().current(GAME)  # set while the instructor runs class mode
 if st.session_state.student_name == "":
     name_input = st.text_input("Enter your name to begin 👇")
     if name_input:
         st.session_state.student_name = name_input.strip()
         st.success(f"Welcome, {st.session_state.student_name}!")
-        st.rerun()
+        rerun()
+
+elif class_round is not None:
+    show_class_round(GAME, class_round)
 
 else:
-    st.write(f"👋 Hello **{st.session_state.student_name}** – Round {st.session_state.round} of 5")
-
-    # ---------------------
-    # Generate new plot
-    # ---------------------
-    if st.button("🎲 Generate New Plot"):
-        x = np.random.rand(100)
-        true_corr = np.random.uniform(-1, 1)
-        noise = np.random.normal(0, 1 - abs(true_corr), size=100)
-        y = true_corr * x + noise
-
-        st.session_state.x = x
-        st.session_state.y = y
-        st.session_state.corr = pearsonr(x, y)[0]
-
-    # ---------------------
-    # Show plot and guess input
-    # ---------------------
-    if st.session_state.x is not None:
-        fig, ax = plt.subplots()
-        ax.scatter(st.session_state.x, st.session_state.y, c='orange', edgecolors='black')
-        ax.set_title("📊 Estimate the correlation")
-        st.pyplot(fig)
-
-        guess = st.number_input("What is your guess for the correlation (-1 to 1)?", min_value=-1.0, max_value=1.0, step=0.01)
-
-        if st.button("✅ Submit Guess"):
-            actual = st.session_state.corr
-            diff = abs(guess - actual)
-            round_score = max(0, round((1 - diff) * 100))
-            st.session_state.score += round_score
-
-            st.markdown(f"**✅ Actual Correlation:** `{actual:.2f}`")
-            st.markdown(f"**🎯 Your Guess:** `{guess:.2f}`")
-            st.markdown(f"**🏅 Score This Round:** `{round_score}/100`")
-
-            st.session_state.round += 1
-            st.session_state.x = None  # Reset plot for next round
-            st.session_state.y = None
-
-            # Check if final round
-            if st.session_state.round > 5:
-                st.success(f"🎉 Great job, {st.session_state.student_name}! Final Score: {st.session_state.score}/500")
-                # Update scoreboard
-                new_row = pd.DataFrame([[st.session_state.student_name, st.session_state.score]], columns=["Name", "Total Score"])
-                st.session_state.scoreboard = pd.concat([st.session_state.scoreboard, new_row], ignore_index=True)
+    # The round is a fragment: generating a plot or submitting a guess reruns only the round,
+    # not the title, the scoreboard or the instructor panel
+    @fragment
+    def play_round():
+        if not st.session_state.student_name or get_classroom().current(GAME) is not None:
+            rerun()  # the game just ended, or class mode started: the whole page changes
+
+        st.write(f"👋 Hello **{st.session_state.student_name}** – Round {st.session_state.round} of 5")
+
+        # The whole game is a few puzzle descriptors; all its rounds' points are built now, in one stacked pass
+        if st.session_state.game is None:
+            with timings.section(GAME, "data"):
+                st.session_state.game_seed = new_seed()
+                st.session_state.game = new_game(st.session_state.game_seed)
+                get_puzzle_cache().fill(st.session_state.game)
+
+        # ---------------------
+        # Generate new plot
+        # ---------------------
+        if st.button("🎲 Generate New Plot"):
+            puzzle = st.session_state.game[st.session_state.round - 1]
+            st.session_state.puzzle = puzzle
+            st.session_state.corr = prerendered_r(puzzle)  # from this round's background build, if it's ready
+        elif st.session_state.puzzle is None:
+            # Build this round's plot in the background while the student reads, ready for the click
+            prerender_round(st.session_state.game[st.session_state.round - 1], round_plot)
+
+        # ---------------------
+        # Show plot and guess input
+        # ---------------------
+        if st.session_state.puzzle is not None:
+            with timings.section(GAME, "plot"):
+                plot = prerendered(st.session_state.puzzle)
+                if plot is None:
+                    x, y, _ = get_puzzle_cache().get(st.session_state.puzzle)
+                    plot = round_figure()
+                    plot.set_data(x, y)
+                show_plot(plot)
+            show_puzzle_code(st.session_state.puzzle)
+            if st.session_state.round < len(st.session_state.game):
+                # And the next round's, while the student answers this one
+                prerender_round(st.session_state.game[st.session_state.round], round_plot)
+
+            # A form, so typing the guess reruns nothing; only submitting reruns the round
+            with st.form("guess_form", border=False):
+                guess = st.number_input("What is your guess for the correlation (-1 to 1)?", min_value=-1.0, max_value=1.0, step=0.01)
+                submitted = st.form_submit_button("✅ Submit Guess")
+
+            if submitted:
+                actual = st.session_state.corr
+                diff = abs(guess - actual)
+                round_score = max(0, round((1 - diff) * 100))
+                st.session_state.score += round_score
+
+                st.markdown(f"**✅ Actual Correlation:** `{actual:.2f}`")
+                st.markdown(f"**🎯 Your Guess:** `{guess:.2f}`")
+                st.markdown(f"**🏅 Score This Round:** `{round_score}/100`")
+
+                st.session_state.round += 1
+                st.session_state.puzzle = None  # Reset plot for next round
+                count_round()
+
+                # Check if final round
+                if st.session_state.round > 5:
+                    st.success(f"🎉 Great job, {st.session_state.student_name}! Final Score: {st.session_state.score}/500")
+                    # Update scoreboard
+                    st.session_state.last_row_id = get_leaderboard().record(
+                        GAME, st.session_state.student_name, st.session_state.score)
                 
-                # Reset session vars for next student
-                st.session_state.student_name = ""
-                st.session_state.round = 1
-                st.session_state.score = 0
-                st.rerun()
+                    # Reset session vars for next student
+                    st.session_state.student_name = ""
+                    st.session_state.round = 1
+                    st.session_state.score = 0
+                    st.session_state.game = None
+                    cancel_prerender()
+                    rerun()
+
+    play_round()
 
 # ---------------------
 # Show scoreboard
 # ---------------------
-if not st.session_state.scoreboard.empty:
+if get_leaderboard().count(GAME):
     st.subheader("📋 Scoreboard")
-    st.dataframe(st.session_state.scoreboard.sort_values(by="Total Score", ascending=False).reset_index(drop=True))
+    with timings.section(GAME, "scoreboard"):
+        show_scoreboard(GAME, st.session_state.get("last_row_id"))
 
 # ---------------------
 # Instructor reset button (hidden behind password)
@@ -141,5 +218,14 @@ with st.expander("🔒 Instructor Panel"):
     admin_password = st.text_input("Enter instructor password to unlock reset", type="password")
     if admin_password == "letmein":  # Change to your secret
         if st.button("🚨 Reset Entire Scoreboard"):
-            st.session_state.scoreboard = pd.DataFrame(columns=["Name", "Total Score"])
+            get_leaderboard().reset(GAME)
             st.success("Scoreboard has been reset.")
+
+        cache_stats = get_guide_cache().stats()
+        st.caption(f"🖼️ Guide image cache – memory hits: {cache_stats['memory_hits']}, "
+                   f"disk hits: {cache_stats['disk_hits']}, misses: {cache_stats['misses']}")
+        show_section_timings(GAME)
+        show_replay()
+        show_class_controls(GAME, class_puzzle, round_plot)
+
+finish_rerun()
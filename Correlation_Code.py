@@ -1,111 +1,216 @@
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.stats import pearsonr
-import pandas as pd
-import random
+from classroom import get_classroom
+from classroom_view import show_class_controls, show_class_round
+from game_config import ADAPTIVE_JITTER, ADAPTIVE_TOLERANCE, adaptive_target, difficulty_settings, update_running_error
+from guide_cache import get_guide_cache
+from leaderboard import get_leaderboard
+from plot_backend import new_plot, show_guide, show_plot
+from puzzle_view import show_puzzle_code, show_replay
+from prerender import cancel_prerender, prerender_round, prerendered, prerendered_r
+from puzzle_bank import get_puzzle_bank
+from puzzles import aimed_puzzle, get_puzzle_cache, new_puzzles
+from scenario_catalog import get_scenario_catalog
+from scoreboard_view import show_scoreboard
+from seeding import GUIDE_SEED, make_rng, new_seed
+from section_timing import get_section_timings
+from session_janitor import session_store
+from timing_view import count_rerun, count_round, finish_rerun, fragment, rerun, show_section_timings, start_rerun
 
 # Streamlit page config
 st.set_page_config(page_title="Guess the Correlation", layout="centered")
+GAME = "Correlation_Code"  # this app's key on the shared leaderboard
+timings = get_section_timings()
+start_rerun(GAME)  # stopped at the end of the script, or by rerun()
+count_rerun()
 st.title("🚦 Guess the Correlation – Transportation Data Challenge")
 
 # Session state setup
 for var in [
-    "x", "y", "corr", "round", "score", "student_name", "scoreboard", "phase", "scenario",
+    "puzzle", "corr", "round", "score", "student_name", "phase", "scenario",
     "direction_submitted", "direction_correct", "direction_guess", "direction_score",
     "value_submitted", "value_guess", "value_actual", "value_diff", "value_score",
-    "used_scenarios", "xlabel", "ylabel", "difficulty_level"
+    "used_scenarios", "xlabel", "ylabel", "difficulty_level", "game", "game_seed",
+    "value_error", "final_score", "adaptive", "running_error"
 ]:
     if var not in st.session_state:
-        if var == "scoreboard":
-            st.session_state[var] = pd.DataFrame(columns=["Name", "Total Score"])
-        elif var == "round":
+        if var == "round":
             st.session_state[var] = 1
         elif var == "score":
             st.session_state[var] = 0
         elif var == "phase":
             st.session_state[var] = 1
         elif var == "used_scenarios":
-            st.session_state[var] = []
+            st.session_state[var] = set()  # ids of the scenarios this student has seen
         else:
             st.session_state[var] = None
 
-# Define scenarios by difficulty level
-scenarios_by_difficulty = {
-    1: [  # Very Easy - Strong, obvious correlations
-        {"x_label": "Number of Vehicles", "y_label": "Traffic Delay (min)", "direction": "positive", "base_corr": 0.85},
-        {"x_label": "Public Transit Usage", "y_label": "Traffic Congestion Level", "direction": "negative",
-         "base_corr": -0.80},
-        {"x_label": "Gas Prices ($)", "y_label": "Vehicle Miles Traveled", "direction": "negative", "base_corr": -0.75},
-    ],
-    2: [  # Easy - Moderate correlations
-        {"x_label": "Daily Bike Rentals", "y_label": "Air Pollution Index", "direction": "negative",
-         "base_corr": -0.65},
-        {"x_label": "Speed Limit (mph)", "y_label": "Crash Count", "direction": "positive", "base_corr": 0.60},
-        {"x_label": "Road Width (ft)", "y_label": "Vehicle Throughput", "direction": "positive", "base_corr": 0.55},
-    ],
-    3: [  # Medium - Weaker correlations
-        {"x_label": "Hours of Rain", "y_label": "Average Traffic Speed", "direction": "negative", "base_corr": -0.45},
-        {"x_label": "Distance to Downtown (mi)", "y_label": "Bus Ridership", "direction": "negative",
-         "base_corr": -0.40},
-        {"x_label": "Bike Lane Coverage (%)", "y_label": "Bicycle Crash Rate", "direction": "negative",
-         "base_corr": -0.35},
-    ],
-    4: [  # Hard - Very weak correlations
-        {"x_label": "Number of Stop Signs", "y_label": "Average Speed", "direction": "negative", "base_corr": -0.25},
-        {"x_label": "Parking Availability", "y_label": "Traffic Circulation Time", "direction": "negative",
-         "base_corr": -0.20},
-        {"x_label": "Number of Intersections", "y_label": "Signal Delay (sec)", "direction": "positive",
-         "base_corr": 0.15},
-    ],
-    5: [  # Very Hard - Near-zero or tricky correlations
-        {"x_label": "Number of Street Lights", "y_label": "Number of Red Cars", "direction": "zero", "base_corr": 0.05},
-        {"x_label": "Bridge Height (ft)", "y_label": "Average Vehicle Color Brightness", "direction": "zero",
-         "base_corr": -0.03},
-        {"x_label": "Speed Cameras Installed", "y_label": "Crash Count", "direction": "zero", "base_corr": 0.08},
-    ]
-}
-
-# Difficulty settings for each round
-difficulty_settings = {
-    1: {"noise_factor": 0.1, "sample_size": 60, "label": "🟢 EASY"},
-    2: {"noise_factor": 0.3, "sample_size": 55, "label": "🟡 MEDIUM-EASY"},
-    3: {"noise_factor": 0.5, "sample_size": 50, "label": "🟠 MEDIUM"},
-    4: {"noise_factor": 0.7, "sample_size": 45, "label": "🔴 HARD"},
-    5: {"noise_factor": 0.9, "sample_size": 40, "label": "🟣 VERY HARD"}
-}
-
-
-def generate_correlated_data(scenario, difficulty):
-    """Generate data with controlled correlation and difficulty"""
-    settings = difficulty_settings[difficulty]
-    n = settings["sample_size"]
-    noise_factor = settings["noise_factor"]
-    target_corr = scenario["base_corr"]
-
-    # Generate base data
-    x = np.random.uniform(10, 100, n)
-
-    if scenario["direction"] == "positive":
-        # Start with perfect correlation, then add noise
-        y = x * abs(target_corr) + np.random.normal(0, noise_factor * 50, n)
-    elif scenario["direction"] == "negative":
-        # Negative correlation
-        y = -x * abs(target_corr) + 100 + np.random.normal(0, noise_factor * 50, n)
-    else:  # zero correlation
-        # Random data with minimal correlation
-        y = np.random.normal(50, 15, n) + target_corr * x + np.random.normal(0, noise_factor * 30, n)
-
-    # Add extra noise for higher difficulties
-    if difficulty >= 4:
-        x += np.random.normal(0, noise_factor * 10, n)
-        y += np.random.normal(0, noise_factor * 15, n)
-
-    return x, y
+
+def round_figure():
+    """This session's guessing plot, built the first time a round is shown"""
+    store = session_store()  # outside session state, so the session janitor can drop it
+    if "round_figure" not in store:
+        # One figure per session; new rounds only swap the points
+        store["round_figure"] = new_plot(figsize=(8, 6), color="orange", edgecolors="black", alpha=0.7)
+    return store["round_figure"]
+
+
+def pick_scenario(difficulty, rng):
+    """Id of a scenario for a difficulty level, avoiding ones this student has already seen"""
+    scenario_id = get_scenario_catalog().pick(difficulty, rng, st.session_state.used_scenarios)
+    st.session_state.used_scenarios.add(scenario_id)
+    return scenario_id
+
+
+def adaptive_puzzle(rng):
+    """Next round in adaptive mode, aimed at the target r for this student's running error.
+
+    The target is jittered, then the banked puzzle nearest it is used when
+    it is close enough; otherwise (no bank, or nothing near) an aimed round
+    is drawn whose r lands near it. Neither kind's code shows the target.
+    """
+    level, target = adaptive_target(st.session_state.running_error, rng)
+    scenario_id, target = get_scenario_catalog().aim(level, target, st.session_state.used_scenarios)
+    target += rng.uniform(-ADAPTIVE_JITTER, ADAPTIVE_JITTER)
+    n = difficulty_settings[level]["sample_size"]
+    bank = get_puzzle_bank()
+    puzzle = bank.nearest(GAME, level, n, target, exclude=st.session_state.game or ())
+    if (puzzle is None or abs(bank.get(puzzle)[2] - target) > ADAPTIVE_TOLERANCE
+            or puzzle.scenario not in get_scenario_catalog()):  # the scenario was edited out after the build
+        puzzle = aimed_puzzle(GAME, rng, scenario_id, level, n, target, ADAPTIVE_TOLERANCE)
+    st.session_state.used_scenarios.add(puzzle.scenario)
+    return puzzle
+
+
+# ---------------------
+# Form callbacks: they run before the rerun a submission triggers, so that one
+# rerun already shows the next phase (two reruns per round in all)
+# ---------------------
+def submit_direction():
+    """Score the direction guess and move on to the value phase"""
+    correct = st.session_state.scenario["direction"]
+    direction_guess = st.session_state.direction_radio
+    score_this = 20 if (
+            (correct == "positive" and direction_guess == "Positive") or
+            (correct == "negative" and direction_guess == "Negative") or
+            (correct == "zero" and direction_guess == "No Correlation")
+    ) else 0
+
+    st.session_state.score += score_this
+    st.session_state.direction_correct = correct
+    st.session_state.direction_guess = direction_guess
+    st.session_state.direction_score = score_this
+    st.session_state.direction_submitted = True
+    st.session_state.value_submitted = False
+    st.session_state.phase = 2
+
+
+def submit_value():
+    """Score the value guess, then start the next round (or finish the game)"""
+    guess_input = st.session_state[f"guess_{st.session_state.round}"]
+    st.session_state.value_error = None
+    if guess_input.strip() == "":
+        st.session_state.value_error = "❗ Please enter a number."
+        return
+    try:
+        guess = float(guess_input)
+    except ValueError:
+        st.session_state.value_error = "❗ Please enter a valid numeric value."
+        return
+    if not -1.0 <= guess <= 1.0:
+        st.session_state.value_error = "❗ Number must be between -1 and 1."
+        return
+
+    current_difficulty = st.session_state.puzzle.difficulty
+    actual = st.session_state.corr
+    diff = abs(guess - actual)
+    st.session_state.running_error = update_running_error(st.session_state.running_error, diff)
+
+    # Adjust scoring based on difficulty (harder rounds are more forgiving)
+    max_score = 80
+    if current_difficulty >= 4:  # Hard rounds
+        round_score = max(0, round((1 - diff * 0.8) * max_score))
+    elif current_difficulty >= 3:  # Medium rounds
+        round_score = max(0, round((1 - diff * 0.9) * max_score))
+    else:  # Easy rounds
+        round_score = max(0, round((1 - diff) * max_score))
+
+    st.session_state.value_guess = guess
+    st.session_state.value_actual = actual
+    st.session_state.value_diff = diff
+    st.session_state.value_score = round_score
+    st.session_state.score += round_score
+    st.session_state.value_submitted = True
+    st.session_state.direction_submitted = False
+
+    st.session_state.round += 1
+    st.session_state.puzzle = None
+    st.session_state.phase = 1
+    count_round()
+
+    if st.session_state.adaptive and st.session_state.round <= 5:
+        # The next round is picked only now, from the error so far; its plots start building right away
+        next_puzzle = adaptive_puzzle(make_rng([st.session_state.game_seed, st.session_state.round]))
+        st.session_state.game.append(next_puzzle)
+        prerender_round(next_puzzle, round_plots)
+
+    if st.session_state.round > 5:
+        st.session_state.last_row_id = get_leaderboard().record(
+            GAME, st.session_state.student_name, st.session_state.score)
+        st.session_state.final_score = st.session_state.score
+        st.session_state.student_name = ""
+        st.session_state.round = 1
+        st.session_state.score = 0
+        st.session_state.phase = 1
+        st.session_state.used_scenarios = set()
+        st.session_state.value_submitted = False
+        st.session_state.game = None
+        st.session_state.running_error = None
+        cancel_prerender()
+
+
+def class_puzzle():
+    """A fresh round for class mode: a random scenario at a random difficulty level"""
+    rng = make_rng(new_seed())
+    level = int(rng.integers(1, len(difficulty_settings) + 1))
+    scenario_id = get_scenario_catalog().pick(level, rng)
+    return new_puzzles(GAME, rng, [(scenario_id, level, difficulty_settings[level]["sample_size"])])[0]
+
+
+def class_plot(puzzle, x, y):
+    """The class round's shared plot, styled like the game's"""
+    scenario = get_scenario_catalog().scenario(puzzle.scenario)
+    plot = new_plot(figsize=(8, 6), color="orange", edgecolors="black", alpha=0.7)
+    plot.set_data(x, y)
+    plot.set_labels(scenario["x_label"], scenario["y_label"], fontsize=12)
+    plot.set_title(f"📊 Guess the correlation! {difficulty_settings[puzzle.difficulty]['label']}", fontsize=14)
+    return plot
+
+
+def round_plots(puzzle, x, y):
+    """A round's two plots on figures of their own, for background pre-rendering:
+    the empty axes of the direction guess, then the points of the value guess"""
+    scenario = get_scenario_catalog().scenario(puzzle.scenario)
+    difficulty_label = difficulty_settings[puzzle.difficulty]["label"]
+    plots = []
+    for title in (f"🤔 What kind of relationship do you expect? {difficulty_label}",
+                  f"📊 Now guess the actual correlation value! {difficulty_label}"):
+        plot = new_plot(figsize=(8, 6), color="orange", edgecolors="black", alpha=0.7)
+        plot.set_labels(scenario["x_label"], scenario["y_label"], fontsize=12)
+        plot.set_title(title, fontsize=14)
+        plots.append(plot)
+    plots[0].clear_data()
+    plots[1].set_data(x, y)
+    return tuple(plots)
+
+
+class_round = get_classroom().current(GAME)  # set while the instructor runs class mode
 
 
 # Show intro if no name yet
 if not st.session_state.student_name:
+    if st.session_state.final_score is not None:
+        st.success(f"🎉 Done! Final Score: {st.session_state.final_score}/500")
     st.subheader("📚 Quick Guide to Correlation")
     st.markdown("""
 Correlation measures how two variables relate to each other.
@@ -119,24 +224,36 @@ Correlation measures how two variables relate to each other.
 - Round 3: Moderate relationships  
 - Round 4-5: Weak or tricky correlations with more noise
 
+**🧭 Adaptive mode:** each round follows how close your guesses are – closer guesses bring noisier data and weaker correlations.
+
 You'll see transport-related variable pairs. First, guess the **direction** (positive, negative, zero), then estimate the **correlation value**.
     """)
     col1, col2, col3 = st.columns(3)
 
 
-    def plot_example(corr, col):
-        x = np.linspace(0, 10, 100)
-        if corr == 1:
-            y = x + np.random.normal(0, 0.5, 100)
-        elif corr == -1:
-            y = -x + np.random.normal(0, 0.5, 100)
-        else:
-            y = np.random.normal(0, 2, 100)
-        fig, ax = plt.subplots(figsize=(3, 2))
-        ax.scatter(x, y, alpha=0.6)
+    def hide_ticks(fig, ax):
         ax.set_xticks([])
         ax.set_yticks([])
-        col.pyplot(fig)
+
+
+    def plot_example(corr, col):
+        def build():
+            rng = make_rng(GUIDE_SEED)
+            x = np.linspace(0, 10, 100)
+            if corr == 1:
+                y = x + rng.normal(0, 0.5, 100)
+            elif corr == -1:
+                y = -x + rng.normal(0, 0.5, 100)
+            else:
+                y = rng.normal(0, 2, 100)
+            plot = new_plot(figsize=(3, 2), setup=hide_ticks,
+                            chart_config={"axis": {"ticks": False, "labels": False}}, alpha=0.6)
+            plot.set_data(x, y)
+            return plot
+
+        # Built once per process, then served from the shared guide cache
+        with timings.section(GAME, "guides"):
+            show_guide(col, corr, "transport-mini", build)
 
 
     with col1:
@@ -151,174 +268,157 @@ You'll see transport-related variable pairs. First, guess the **direction** (pos
 
     st.markdown("---")
     st.subheader("🎮 Enter your name to start")
+    adaptive = st.toggle("🧭 Adaptive mode")
     name_input = st.text_input("Student Name:")
     if name_input:
         st.session_state.student_name = name_input.strip()
-        st.session_state.used_scenarios = []
-        st.rerun()
+        st.session_state.used_scenarios = set()
+        st.session_state.final_score = None
+        st.session_state.adaptive = adaptive
+        st.session_state.running_error = None
+        rerun()
+
+elif class_round is not None:
+    show_class_round(GAME, class_round)
 
 # Game Begins
 else:
-    current_difficulty = st.session_state.round
-    difficulty_label = difficulty_settings[current_difficulty]["label"]
-
-    st.write(f"👋 Hello **{st.session_state.student_name}** – Round {st.session_state.round} of 5 {difficulty_label}")
-
-    # Progress bar
-    progress = (st.session_state.round - 1) / 5
-    st.progress(progress)
-
-    if st.session_state.phase == 1:  # Direction Guess Phase
-        if st.session_state.x is None:
-            # Select scenario for current difficulty level
-            available_scenarios = [s for s in scenarios_by_difficulty[current_difficulty]
-                                   if s not in st.session_state.used_scenarios]
-
-            if not available_scenarios:
-                available_scenarios = scenarios_by_difficulty[current_difficulty].copy()
-
-            scenario = random.choice(available_scenarios)
-            st.session_state.used_scenarios.append(scenario)
-
-            # Generate data with progressive difficulty
-            x, y = generate_correlated_data(scenario, current_difficulty)
-
-            st.session_state.x = x
-            st.session_state.y = y
-            st.session_state.corr = round(pearsonr(x, y)[0], 2)
-            st.session_state.xlabel = scenario["x_label"]
-            st.session_state.ylabel = scenario["y_label"]
-            st.session_state.scenario = scenario
-
-        # Plot without points (just axes)
-        fig, ax = plt.subplots(figsize=(8, 6))
-        if st.session_state.xlabel:
-            ax.set_xlabel(st.session_state.xlabel, fontsize=12)
-        if st.session_state.ylabel:
-            ax.set_ylabel(st.session_state.ylabel, fontsize=12)
-        ax.set_title(f"🤔 What kind of relationship do you expect? {difficulty_label}", fontsize=14)
-        st.pyplot(fig)
-
-        direction_guess = st.radio(
-            "Guess the correlation **direction**:",
-            options=["Positive", "Negative", "No Correlation"],
-            horizontal=True,
-            key="direction_radio"
-        )
-
-        if st.button("✅ Submit Direction Guess") and not st.session_state.direction_submitted:
-            correct = st.session_state.scenario["direction"]
-            score_this = 20 if (
-                    (correct == "positive" and direction_guess == "Positive") or
-                    (correct == "negative" and direction_guess == "Negative") or
-                    (correct == "zero" and direction_guess == "No Correlation")
-            ) else 0
-
-            st.session_state.score += score_this
-            st.session_state.direction_correct = correct
-            st.session_state.direction_guess = direction_guess
-            st.session_state.direction_score = score_this
-            st.session_state.direction_submitted = True
-
-        if st.session_state.direction_submitted:
-            st.markdown(f"**✅ Correct Direction:** `{st.session_state.direction_correct.capitalize()}`")
-            st.markdown(f"**🎯 Your Guess:** `{st.session_state.direction_guess}`")
-            st.markdown(f"**🏅 Score This Round (Direction):** `{st.session_state.direction_score}/20`")
-
-            if st.button("➡️ Next: Guess Correlation Value"):
-                st.session_state.phase = 2
-                st.session_state.direction_submitted = False
-                st.rerun()
-
-    elif st.session_state.phase == 2:  # Correlation Value Guess Phase
-        fig, ax = plt.subplots(figsize=(8, 6))
-        ax.scatter(st.session_state.x, st.session_state.y, color="orange", edgecolors="black", alpha=0.7)
-        if st.session_state.xlabel:
-            ax.set_xlabel(st.session_state.xlabel, fontsize=12)
-        if st.session_state.ylabel:
-            ax.set_ylabel(st.session_state.ylabel, fontsize=12)
-        ax.set_title(f"📊 Now guess the actual correlation value! {difficulty_label}", fontsize=14)
-        st.pyplot(fig)
-
-        # Show correlation strength guide
-        st.markdown("""
-        **Correlation Strength Guide:**
-        - 0.0 to ±0.2: Very weak
-        - ±0.2 to ±0.4: Weak  
-        - ±0.4 to ±0.6: Moderate
-        - ±0.6 to ±0.8: Strong
-        - ±0.8 to ±1.0: Very strong
-        """)
-
-        guess_input = st.text_input(
-            "🔢 Your guess for correlation (between -1 and 1):",
-            placeholder="e.g. 0.72",
-            key=f"guess_{st.session_state.round}"
-        )
-
-        if st.button("✅ Submit Correlation Guess") and not st.session_state.value_submitted:
-            if guess_input.strip() == "":
-                st.error("❗ Please enter a number.")
-            else:
-                try:
-                    guess = float(guess_input)
-                    if -1.0 <= guess <= 1.0:
-                        actual = st.session_state.corr
-                        diff = abs(guess - actual)
-
-                        # Adjust scoring based on difficulty (harder rounds are more forgiving)
-                        max_score = 80
-                        if current_difficulty >= 4:  # Hard rounds
-                            round_score = max(0, round((1 - diff * 0.8) * max_score))
-                        elif current_difficulty >= 3:  # Medium rounds
-                            round_score = max(0, round((1 - diff * 0.9) * max_score))
-                        else:  # Easy rounds
-                            round_score = max(0, round((1 - diff) * max_score))
-
-                        st.session_state.value_guess = guess
-                        st.session_state.value_actual = actual
-                        st.session_state.value_diff = diff
-                        st.session_state.value_score = round_score
-                        st.session_state.score += round_score
-                        st.session_state.value_submitted = True
-                    else:
-                        st.error("❗ Number must be between -1 and 1.")
-                except ValueError:
-                    st.error("❗ Please enter a valid numeric value.")
-
-        if st.session_state.value_submitted:
-            st.markdown(f"**✅ Actual Correlation:** `{st.session_state.value_actual:.2f}`")
-            st.markdown(f"**🎯 Your Guess:** `{st.session_state.value_guess:.2f}`")
-            st.markdown(f"**📏 Difference:** `{st.session_state.value_diff:.2f}`")
-            st.markdown(f"**🏅 Score This Round (Value):** `{st.session_state.value_score}/80`")
-
-            if st.button("➡️ Next Round"):
-                st.session_state.round += 1
-                st.session_state.x = None
-                st.session_state.y = None
-                st.session_state.phase = 1
-                st.session_state.value_submitted = False
-
-                if st.session_state.round > 5:
-                    st.success(f"🎉 Done! Final Score: {st.session_state.score}/500")
-                    new_row = pd.DataFrame([[st.session_state.student_name, st.session_state.score]],
-                                           columns=["Name", "Total Score"])
-                    st.session_state.scoreboard = pd.concat([st.session_state.scoreboard, new_row], ignore_index=True)
-                    st.session_state.student_name = ""
-                    st.session_state.round = 1
-                    st.session_state.score = 0
-                    st.session_state.phase = 1
-                    st.session_state.used_scenarios = []
-                st.rerun()
+    # The round is a fragment: submitting a guess reruns only the round, not the title, the
+    # scoreboard or the instructor panel. The form callbacks have already scored it by then.
+    @fragment
+    def play_round():
+        if not st.session_state.student_name or get_classroom().current(GAME) is not None:
+            rerun()  # the game just ended, or class mode started: the whole page changes
+
+        # Scenarios for the whole game are picked once, as puzzle descriptors; points are built when shown.
+        # In adaptive mode only the first round is; submit_value picks each next one.
+        if st.session_state.game is None:
+            with timings.section(GAME, "data"):
+                st.session_state.game_seed = new_seed()
+                rng = make_rng(st.session_state.game_seed)
+                if st.session_state.adaptive:
+                    st.session_state.game = [adaptive_puzzle(rng)]
+                else:
+                    st.session_state.game = new_puzzles(GAME, rng, [
+                        (pick_scenario(level, rng), level, settings["sample_size"])
+                        for level, settings in difficulty_settings.items()
+                    ])
+
+        current_difficulty = st.session_state.game[st.session_state.round - 1].difficulty
+        difficulty_label = difficulty_settings[current_difficulty]["label"]
+
+        st.write(f"👋 Hello **{st.session_state.student_name}** – Round {st.session_state.round} of 5 {difficulty_label}")
+
+        # Progress bar
+        progress = (st.session_state.round - 1) / 5
+        st.progress(progress)
+
+        if st.session_state.phase == 1:  # Direction Guess Phase
+            if st.session_state.value_submitted:
+                # Result of the round just finished, scored by submit_value
+                st.markdown(f"**✅ Actual Correlation:** `{st.session_state.value_actual:.2f}`")
+                st.markdown(f"**🎯 Your Guess:** `{st.session_state.value_guess:.2f}`")
+                st.markdown(f"**📏 Difference:** `{st.session_state.value_diff:.2f}`")
+                st.markdown(f"**🏅 Score Last Round (Value):** `{st.session_state.value_score}/80`")
+                st.markdown("---")
+
+            if st.session_state.puzzle is None:
+                # Scenario and data for the current difficulty level
+                puzzle = st.session_state.game[st.session_state.round - 1]
+                scenario = get_scenario_catalog().scenario(puzzle.scenario)
+
+                st.session_state.puzzle = puzzle
+                st.session_state.corr = round(prerendered_r(puzzle), 2)
+                st.session_state.xlabel = scenario["x_label"]
+                st.session_state.ylabel = scenario["y_label"]
+                st.session_state.scenario = scenario
+
+            # Plot without points (just axes)
+            with timings.section(GAME, "plot"):
+                plots = prerendered(st.session_state.puzzle)
+                if plots is not None:
+                    show_plot(plots[0])
+                else:
+                    round_fig = round_figure()
+                    round_fig.clear_data()
+                    round_fig.set_labels(st.session_state.xlabel or "", st.session_state.ylabel or "", fontsize=12)
+                    round_fig.set_title(f"🤔 What kind of relationship do you expect? {difficulty_label}", fontsize=14)
+                    show_plot(round_fig)
+            if st.session_state.round < len(st.session_state.game):
+                # The next round is built in the background while the student plays this one
+                prerender_round(st.session_state.game[st.session_state.round], round_plots)
+
+            # Picking a direction doesn't rerun the page; submitting scores it and moves on to phase 2
+            with st.form("direction_form", border=False):
+                st.radio(
+                    "Guess the correlation **direction**:",
+                    options=["Positive", "Negative", "No Correlation"],
+                    horizontal=True,
+                    key="direction_radio"
+                )
+                st.form_submit_button("✅ Submit Direction Guess", on_click=submit_direction)
+
+        elif st.session_state.phase == 2:  # Correlation Value Guess Phase
+            if st.session_state.direction_submitted:
+                st.markdown(f"**✅ Correct Direction:** `{st.session_state.direction_correct.capitalize()}`")
+                st.markdown(f"**🎯 Your Guess:** `{st.session_state.direction_guess}`")
+                st.markdown(f"**🏅 Score This Round (Direction):** `{st.session_state.direction_score}/20`")
+
+            with timings.section(GAME, "plot"):
+                plots = prerendered(st.session_state.puzzle)
+                if plots is not None:
+                    show_plot(plots[1])
+                else:
+                    x, y, _ = get_puzzle_cache().get(st.session_state.puzzle)
+                    round_fig = round_figure()
+                    round_fig.set_data(x, y)
+                    round_fig.set_labels(st.session_state.xlabel or "", st.session_state.ylabel or "", fontsize=12)
+                    round_fig.set_title(f"📊 Now guess the actual correlation value! {difficulty_label}", fontsize=14)
+                    show_plot(round_fig)
+            show_puzzle_code(st.session_state.puzzle)
+
+            # Show correlation strength guide
+            st.markdown("""
+            **Correlation Strength Guide:**
+            - 0.0 to ±0.2: Very weak
+            - ±0.2 to ±0.4: Weak  
+            - ±0.4 to ±0.6: Moderate
+            - ±0.6 to ±0.8: Strong
+            - ±0.8 to ±1.0: Very strong
+            """)
+
+            # Typing doesn't rerun the page; submitting scores the guess and starts the next round
+            with st.form("value_form", border=False):
+                st.text_input(
+                    "🔢 Your guess for correlation (between -1 and 1):",
+                    placeholder="e.g. 0.72",
+                    key=f"guess_{st.session_state.round}"
+                )
+                st.form_submit_button("✅ Submit Correlation Guess", on_click=submit_value)
+
+            if st.session_state.value_error:
+                st.error(st.session_state.value_error)
+
+    play_round()
 
 # Scoreboard
-if not st.session_state.scoreboard.empty:
+if get_leaderboard().count(GAME):
     st.subheader("📋 Scoreboard")
-    st.dataframe(st.session_state.scoreboard.sort_values(by="Total Score", ascending=False).reset_index(drop=True))
+    with timings.section(GAME, "scoreboard"):
+        show_scoreboard(GAME, st.session_state.get("last_row_id"))
 
 # Instructor Reset
 with st.expander("🔒 Instructor Panel"):
     if st.text_input("Password", type="password") == "letmein":
         if st.button("🚨 Reset Entire Scoreboard"):
-            st.session_state.scoreboard = pd.DataFrame(columns=["Name", "Total Score"])
-            st.success("Scoreboard reset.")
\ No newline at end of file
+            get_leaderboard().reset(GAME)
+            st.success("Scoreboard reset.")
+
+        cache_stats = get_guide_cache().stats()
+        st.caption(f"🖼️ Guide image cache – memory hits: {cache_stats['memory_hits']}, "
+                   f"disk hits: {cache_stats['disk_hits']}, misses: {cache_stats['misses']}")
+        show_section_timings(GAME)
+        show_replay()
+        show_class_controls(GAME, class_puzzle, class_plot)
+
+finish_rerun()
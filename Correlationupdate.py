@@ -1,51 +1,125 @@
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.stats import pearsonr
-import pandas as pd
+from classroom import get_classroom
+from classroom_view import show_class_controls, show_class_round
+from game_config import CORRELATION_STRUCTURE, POINTS_OPTIONS, get_actual_label
+from guide_cache import get_guide_cache
+from leaderboard import get_leaderboard
+from plot_backend import new_plot, show_guide, show_plot
+from puzzle_view import show_puzzle_code, show_replay
+from prerender import cancel_prerender, prerender_round, prerendered, prerendered_r
+from puzzles import get_puzzle_cache, new_puzzles
+from scoreboard_view import show_scoreboard
+from seeding import GUIDE_SEED, make_rng, new_seed
+from section_timing import get_section_timings
+from session_janitor import session_store
+from timing_view import count_rerun, count_round, finish_rerun, fragment, rerun, show_section_timings, start_rerun
 
 # ---------------------
 # Streamlit config
 # ---------------------
 st.set_page_config(page_title="🎯 Guess the Correlation!", layout="centered")
+GAME = "Correlationupdate"  # this app's key on the shared leaderboard
+timings = get_section_timings()
+start_rerun(GAME)  # stopped at the end of the script, or by rerun()
+count_rerun()
 st.title(" Correlation Guessing Game \n FAMU-FSU College of Engineering 🎓")
 st.markdown("#### 🚀 **Welcome to the most fun way to learn correlations!** 🌟")
 
-# ---------------------
-# Define correlation structure for 6 rounds
-# ---------------------
-CORRELATION_STRUCTURE = [
-    {"type": "Strong Positive", "target": 0.95, "emoji": "🚀📈", "color": "#FF6B6B",
-     "desc": "Super Strong Upward Trend!"},
-    {"type": "Strong Negative", "target": -0.95, "emoji": "⚡📉", "color": "#4ECDC4",
-     "desc": "Super Strong Downward Trend!"},
-    {"type": "No Correlation", "target": 0.0, "emoji": "🌪️🔄", "color": "#45B7D1", "desc": "Random Chaos Mode!"},
-    {"type": "Strong Positive", "target": 0.90, "emoji": "🔥📈", "color": "#96CEB4", "desc": "Blazing Upward Pattern!"},
-    {"type": "Strong Negative", "target": -0.90, "emoji": "❄️📉", "color": "#FFEAA7", "desc": "Icy Downward Slide!"},
-    {"type": "No Correlation", "target": 0.0, "emoji": "🎲🔄", "color": "#DDA0DD", "desc": "Pure Randomness!"}
-]
+def new_game(points, seed):
+    """Puzzles for every round of CORRELATION_STRUCTURE, drawn from ``seed``"""
+    return new_puzzles(GAME, make_rng(seed), [(i, None, points) for i in range(len(CORRELATION_STRUCTURE))])
+
+
+def load_round(round_number):
+    """Put round ``round_number`` of the current game on screen"""
+    puzzle = st.session_state.game[round_number - 1]
+    st.session_state.puzzle = puzzle
+    # From this round's background build, if any, rather than building it twice;
+    # rounded like the displayed value, so a 0.90 target can't grade as 0.8999999
+    st.session_state.corr = round(prerendered_r(puzzle), 2)
+
 
 # ---------------------
 # Session state setup
 # ---------------------
-if "x" not in st.session_state:
-    st.session_state.x = None
-if "y" not in st.session_state:
-    st.session_state.y = None
+if "puzzle" not in st.session_state:
+    st.session_state.puzzle = None  # the round on screen; its points live in the shared puzzle cache
 if "corr" not in st.session_state:
     st.session_state.corr = None
 if "round" not in st.session_state:
     st.session_state.round = 1
 if "score" not in st.session_state:
     st.session_state.score = 0
-if "scoreboard" not in st.session_state:
-    st.session_state.scoreboard = pd.DataFrame(columns=["Name", "Total Score"])
 if "student_name" not in st.session_state:
     st.session_state.student_name = ""
 if "round_results" not in st.session_state:
     st.session_state.round_results = []
 if "game_completed" not in st.session_state:
     st.session_state.game_completed = False
+if "game" not in st.session_state:
+    st.session_state.game = None
+    st.session_state.game_seed = None
+if "points" not in st.session_state:
+    st.session_state.points = POINTS_OPTIONS[0]
+
+
+def setup_round_axes(fig, ax):
+    ax.grid(True, alpha=0.1, linestyle='--')
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['bottom'].set_color('#CCCCCC')
+    ax.spines['left'].set_color('#CCCCCC')
+    ax.spines['bottom'].set_linewidth(1.5)
+    ax.spines['left'].set_linewidth(1.5)
+    fig.patch.set_facecolor('white')
+
+
+# The same styling for the browser-drawn plot backend
+ROUND_CHART_CONFIG = {
+    "axis": {"grid": True, "gridOpacity": 0.1, "gridDash": [4, 4],
+             "domainColor": "#CCCCCC", "domainWidth": 2, "tickColor": "#CCCCCC"},
+    "view": {"stroke": None},
+}
+
+
+def round_figure():
+    """This session's guessing plot, built the first time a round is shown"""
+    store = session_store()  # outside session state, so the session janitor can drop it
+    if "round_figure" not in store:
+        # One figure per session; new rounds only swap the points and colour
+        round_fig = new_plot(figsize=(10, 7), setup=setup_round_axes, chart_config=ROUND_CHART_CONFIG,
+                             edgecolors='white', s=80, alpha=0.8, linewidth=1.5)
+        round_fig.set_labels("X Variable", "Y Variable", fontsize=14, fontweight='bold')
+        store["round_figure"] = round_fig
+    return store["round_figure"]
+
+
+def class_puzzle():
+    """A fresh round for class mode: a random round type of CORRELATION_STRUCTURE"""
+    rng = make_rng(new_seed())
+    structure_index = int(rng.integers(len(CORRELATION_STRUCTURE)))
+    return new_puzzles(GAME, rng, [(structure_index, None, st.session_state.points)])[0]
+
+
+def round_plot(puzzle, x, y):
+    """A game round's plot on a figure of its own, for background pre-rendering"""
+    plot = new_plot(figsize=(10, 7), setup=setup_round_axes, chart_config=ROUND_CHART_CONFIG,
+                    edgecolors='white', s=80, alpha=0.8, linewidth=1.5)
+    plot.set_labels("X Variable", "Y Variable", fontsize=14, fontweight='bold')
+    plot.set_data(x, y)
+    plot.set_point_color(CORRELATION_STRUCTURE[puzzle.scenario]['color'])
+    plot.set_title(f"Round {puzzle.scenario + 1}: Estimate the correlation!",
+                   fontsize=18, fontweight='bold', color='black', pad=20)
+    return plot
+
+
+def class_plot(puzzle, x, y):
+    """The class round's shared plot, styled like the game's"""
+    plot = round_plot(puzzle, x, y)
+    plot.set_title("📣 Class round: Estimate the correlation!", fontsize=18, fontweight='bold', color='black', pad=20)
+    return plot
+
 
 # ---------------------
 # Show correlation examples before the game starts
@@ -58,26 +132,40 @@ if st.session_state.student_name == "":
     col1, col2, col3 = st.columns(3)
 
 
-    def plot_example(corr, title, col, color):
-        np.random.seed(42)  # Consistent examples
-        x = np.linspace(0, 1, 1000)
-        if corr == 1:
-            y = x + np.random.normal(0, 0.05, 1000)
-        elif corr == -1:
-            y = -x + 1 + np.random.normal(0, 0.05, 1000)
-        else:
-            y = np.random.rand(1000)
-
-        fig, ax = plt.subplots(figsize=(5, 4))
-        ax.scatter(x, y, c=color, edgecolors='white', s=50, alpha=0.8)
-        ax.set_title(title, fontsize=14, fontweight='bold', color='#2E4057')
-        ax.set_xlabel("X Variable", fontsize=11, color='#2E4057')
-        ax.set_ylabel("Y Variable", fontsize=11, color='#2E4057')
+    def setup_guide_axes(fig, ax):
         ax.tick_params(axis='both', labelsize=9)
         ax.grid(True, alpha=0.3, color='gray')
         ax.set_facecolor('#F8F9FA')
         fig.patch.set_facecolor('white')
-        col.pyplot(fig)
+
+
+    GUIDE_CHART_CONFIG = {
+        "axis": {"labelFontSize": 12, "grid": True, "gridColor": "gray", "gridOpacity": 0.3},
+        "view": {"fill": "#F8F9FA"},
+    }
+
+
+    def plot_example(corr, title, col, color):
+        def build():
+            rng = make_rng(GUIDE_SEED)  # Consistent examples
+            x = np.linspace(0, 1, 1000)
+            if corr == 1:
+                y = x + rng.normal(0, 0.05, 1000)
+            elif corr == -1:
+                y = -x + 1 + rng.normal(0, 0.05, 1000)
+            else:
+                y = rng.random(1000)
+
+            plot = new_plot(figsize=(5, 4), setup=setup_guide_axes, chart_config=GUIDE_CHART_CONFIG,
+                            c=color, edgecolors='white', s=50, alpha=0.8)
+            plot.set_data(x, y)
+            plot.set_title(title, fontsize=14, fontweight='bold', color='#2E4057')
+            plot.set_labels("X Variable", "Y Variable", fontsize=11, color='#2E4057')
+            return plot
+
+        # Three 1000-point renders per rerun otherwise; build them once per process
+        with timings.section(GAME, "guides"):
+            show_guide(col, corr, "vivid", build)
 
 
     with col1:
@@ -98,30 +186,37 @@ if st.session_state.student_name == "":
 # ---------------------
 # Name input (once)
 # ---------------------
+class_round = get_classroom().current(GAME)  # set while the instructor runs class mode
 if st.session_state.student_name == "":
     st.markdown("##### **Enter your name to start your correlation adventure!**")
     name_input = st.text_input("✏️ Your Name Here 👇", placeholder="Type your awesome name...")
+    points = st.select_slider("🐘 Points per plot (try big data mode!)", options=POINTS_OPTIONS,
+                              value=st.session_state.points, format_func=lambda n: f"{n:,}")
     if name_input:
         st.session_state.student_name = name_input.strip()
+        st.session_state.points = points
         # Reset game state for new student
         st.session_state.round = 1
         st.session_state.score = 0
         st.session_state.round_results = []
         st.session_state.game_completed = False
         st.session_state.show_result = False
+        st.session_state.game = None
         st.success(f"🎉🎊 Welcome to the game, **{st.session_state.student_name}**! 🎊🎉")
         st.balloons()
-        st.rerun()
+        rerun()
+
+elif class_round is not None:
+    show_class_round(GAME, class_round)
 
 else:
     # 🛑 Check if all rounds are completed
     if st.session_state.round > len(CORRELATION_STRUCTURE) and not st.session_state.game_completed:
         st.session_state.game_completed = True
         # Update scoreboard
-        new_row = pd.DataFrame([[st.session_state.student_name, st.session_state.score]],
-                               columns=["Name", "Total Score"])
-        st.session_state.scoreboard = pd.concat([st.session_state.scoreboard, new_row], ignore_index=True)
-        st.rerun()
+        st.session_state.last_row_id = get_leaderboard().record(
+            GAME, st.session_state.student_name, st.session_state.score)
+        rerun()
 
     # Show final results screen
     elif st.session_state.game_completed:
@@ -153,6 +248,7 @@ else:
             grade_color = "#6c757d"
             grade_text = "KEEP PRACTICING!"
 
+        markdown_span = timings.start(GAME, "markdown")  # start/stop, so the HTML keeps its indentation
         st.markdown(f"""
         <div style="background: linear-gradient(135deg, {grade_color}22, {grade_color}44);
                     padding: 30px;
@@ -166,6 +262,7 @@ else:
             <h3 style="color: {grade_color}; margin: 10px 0;">Final Score: {score_percentage:.1f}%</h3>
         </div>
         """, unsafe_allow_html=True)
+        markdown_span.stop()
 
         # Round-by-round summary
         st.markdown("### 📊 **Round-by-Round Performance Summary**")
@@ -183,6 +280,8 @@ else:
                 "Score": f"{result['score']}/100"
             })
 
+        import pandas as pd  # loaded only once a game is finished
+
         summary_df = pd.DataFrame(summary_data)
         st.dataframe(
             summary_df,
@@ -251,13 +350,14 @@ else:
                 st.session_state.student_name = ""
                 st.session_state.round = 1
                 st.session_state.score = 0
-                st.session_state.x = None
-                st.session_state.y = None
+                st.session_state.puzzle = None
                 st.session_state.corr = None
                 st.session_state.show_result = False
                 st.session_state.round_results = []
                 st.session_state.game_completed = False
-                st.rerun()
+                st.session_state.game = None
+                cancel_prerender()
+                rerun()
 
         with col2:
             if st.button("📊 **View Leaderboard**", type="secondary", use_container_width=True):
@@ -278,6 +378,7 @@ else:
             # st.markdown(f"### **Round {st.session_state.round} of 6** 🎮")
 
         # Round info with colorful styling
+        markdown_span = timings.start(GAME, "markdown")
         st.markdown(f"""
         <div style="
             background: linear-gradient(90deg, {current_round_info['color']}22, {current_round_info['color']}44);
@@ -294,216 +395,186 @@ else:
             </p>
         </div>
         """, unsafe_allow_html=True)
+        markdown_span.stop()
 
         # ---------------------
         # Generate new plot with structured correlation
         # ---------------------
-        if st.button("**Generate New Awesome Plot!** ✨🎲", type="primary"):
-            # Get the target correlation for this round
-            target_corr = current_round_info['target']
-
-            # Generate data based on correlation type
-            np.random.seed()  # Ensure randomness in each generation
-            x = np.random.rand(1000)
+        # Every round is a puzzle descriptor picked once per game; its data (hitting the
+        # target correlation exactly, on [0, 1] axes) is built by the shared puzzle cache
+        if st.session_state.game is None:
+            with timings.section(GAME, "data"):
+                st.session_state.game_seed = new_seed()
+                st.session_state.game = new_game(st.session_state.points, st.session_state.game_seed)
+                get_puzzle_cache().fill(st.session_state.game)  # rounds of up to BATCH_POINTS, in one stacked pass
 
-            if abs(target_corr) < 0.1:  # No correlation
-                y = np.random.rand(1000)
-            else:
-                # Create very strong correlated data
-                noise_factor = 0.1  # Very low noise for strong correlations (0.9-1.0)
-                noise = np.random.normal(0, noise_factor, 1000)
-
-                if target_corr > 0:
-                    # Positive correlation
-                    y = target_corr * x + noise
-                else:
-                    # Negative correlation
-                    y = target_corr * x + noise
-
-            # Normalize y to reasonable range
-            y = (y - np.min(y)) / (np.max(y) - np.min(y))
-
-            st.session_state.x = x
-            st.session_state.y = y
-            st.session_state.corr = pearsonr(x, y)[0]
+        if st.button("**Generate New Awesome Plot!** ✨🎲", type="primary"):
+            load_round(st.session_state.round)
             st.success("🎉 New plot generated! Time to make your guess! 🎯\n\n")
+        elif st.session_state.puzzle is None:
+            # Build this round's plot in the background while the student reads, ready for the click
+            prerender_round(st.session_state.game[st.session_state.round - 1], round_plot)
 
         # ---------------------
         # Show plot and guess input
         # ---------------------
-        if st.session_state.x is not None:
+        if st.session_state.puzzle is not None:
             st.markdown("#####  **Instruction : You are to use the plot below to guess the correlation!**")
 
             # Plot
-            fig, ax = plt.subplots(figsize=(10, 7))
-            ax.scatter(st.session_state.x, st.session_state.y,
-                       c=current_round_info['color'],
-                       edgecolors='white',
-                       s=80,
-                       alpha=0.8,
-                       linewidth=1.5)
-            ax.set_title(f"Round {st.session_state.round}: Estimate the correlation!",
-                         fontsize=18, fontweight='bold', color='black', pad=20)
-            ax.set_xlabel("X Variable", fontsize=14, fontweight='bold')
-            ax.set_ylabel("Y Variable", fontsize=14, fontweight='bold')
-            ax.grid(True, alpha=0.1, linestyle='--')
-            ax.spines['top'].set_visible(False)
-            ax.spines['right'].set_visible(False)
-            ax.spines['bottom'].set_color('#CCCCCC')
-            ax.spines['left'].set_color('#CCCCCC')
-            ax.spines['bottom'].set_linewidth(1.5)
-            ax.spines['left'].set_linewidth(1.5)
-            fig.patch.set_facecolor('white')
-            st.pyplot(fig)
-
-            # Guess input
-            st.markdown("### 💭 **What's your guess?**")
-            col1, col2, col3 = st.columns([1, 2, 1])
-            with col2:
-                guess = st.radio(
-                    "🎯 Choose the best description of the correlation in the plot:",
-                    [
-                        "High Positive Correlation",
-                        "Low Positive Correlation",
-                        "No Correlation",
-                        "Low Negative Correlation",
-                        "High Negative Correlation",
-                        "I Don't Know"
-                    ],
-                    key=f"guess_select_round_{st.session_state.round}"
-                )
-
-            if "show_result" not in st.session_state:
-                st.session_state.show_result = False
-
-            if st.button("**Click here to submit your awesome guess!** ✅",
-                         type="primary") and not st.session_state.show_result:
-                actual = st.session_state.corr
-
-
-                def get_actual_label(corr_val):
-                    if corr_val >= 0.90:
-                        return "High Positive Correlation"
-                    elif 0.30 <= corr_val < 0.90:
-                        return "Low Positive Correlation"
-                    elif -0.30 < corr_val < 0.30:
-                        return "No Correlation"
-                    elif -0.90 < corr_val <= -0.30:
-                        return "Low Negative Correlation"
-                    elif corr_val <= -0.90:
-                        return "High Negative Correlation"
-                    else:
-                        return "Uncategorized"
-
-
-                actual_label = get_actual_label(actual)
-
-                if guess == "I Don't Know":
-                    round_score = 0
-                elif guess == actual_label:
-                    round_score = 100
-                else:
-                    round_score = 50
-
-                st.session_state.round_score = round_score
-                st.session_state.actual_label = actual_label
-                st.session_state.actual_corr = actual
-                st.session_state.student_guess = guess
-                st.session_state.score += round_score
-                st.session_state.show_result = True
-
-                # Store round results for final summary
-                round_result = {
-                    "round": st.session_state.round,
-                    "type": current_round_info['type'],
-                    "target": current_round_info['target'],
-                    "actual": actual,
-                    "guess": guess,
-                    "correct": guess == actual_label,
-                    "score": round_score
-                }
-                st.session_state.round_results.append(round_result)
-
-            if st.session_state.show_result:
-                # Show feedback/results
-                round_score = st.session_state.round_score
-                actual = st.session_state.actual_corr
-                actual_label = st.session_state.actual_label
-                guess = st.session_state.student_guess
-
-                if round_score == 100:
-                    result_emoji = "🏆🌟"
-                    result_color = "#28a745"
-                    result_msg = "Perfect! You nailed it!"
-                elif round_score == 50:
-                    result_emoji = "👍💪"
-                    result_color = "#17a2b8"
-                    result_msg = "Good try! You're close!"
-                else:
-                    result_emoji = "🤔💡"
-                    result_color = "#6c757d"
-                    result_msg = "Keep practicing!"
-
-                st.markdown(f"""
-                <div style="background: linear-gradient(135deg, {result_color}22, {result_color}44);
-                            padding: 20px;
-                            border-radius: 15px;
-                            border-left: 5px solid {result_color};
-                            margin: 10px 0;">
-                    <h3 style="color: #2E4057;">{result_emoji} <strong>{result_msg}</strong></h3>
-                    <p><strong>✅ Actual Correlation Value:</strong> <code>{actual:.2f}</code></p>
-                    <p><strong>🏷️ Actual Category:</strong> <code>{actual_label}</code></p>
-                    <p><strong>🎯 Your Guess:</strong> <code>{guess}</code></p>
-                    <p><strong>🏅 Score This Round:</strong> <code>{round_score}/100</code></p>
-                    <p><strong>🔥 Total Score:</strong> <code>{st.session_state.score}/600</code></p>
-                </div>
-                """, unsafe_allow_html=True)
-
-                if st.button("➡️ Next Round"):
-                    st.session_state.round += 1
-                    st.session_state.x = None
-                    st.session_state.y = None
-                    st.session_state.show_result = False
-                    if st.session_state.round > len(CORRELATION_STRUCTURE):
-                        # Game is complete, will show final results on next rerun
-                        pass
-                    st.rerun()
+            with timings.section(GAME, "plot"):
+                plot = prerendered(st.session_state.puzzle)
+                if plot is None:
+                    x, y, _ = get_puzzle_cache().get(st.session_state.puzzle)
+                    plot = round_figure()
+                    plot.set_data(x, y)
+                    plot.set_point_color(current_round_info['color'])
+                    plot.set_title(f"Round {st.session_state.round}: Estimate the correlation!",
+                                   fontsize=18, fontweight='bold', color='black', pad=20)
+                show_plot(plot)
+            show_puzzle_code(st.session_state.puzzle)
+            if st.session_state.round < len(st.session_state.game):
+                # And the next round's, while the student answers this one
+                prerender_round(st.session_state.game[st.session_state.round], round_plot)
+
+            # The guess widget and result card are a fragment: submitting a guess reruns only
+            # this part, not the plot, the scoreboard or the rest of the page. The guess sits
+            # in a form, so picking an answer reruns nothing. Results go to the rest of the
+            # app through session state; "Next Round" then reruns the whole page once, with
+            # the next round's plot already loaded.
+            @fragment
+            def guess_and_result():
+                with timings.section(GAME, "guess"):
+                    # Guess input
+                    st.markdown("### 💭 **What's your guess?**")
+                    with st.form("guess_form", border=False):
+                        col1, col2, col3 = st.columns([1, 2, 1])
+                        with col2:
+                            guess = st.radio(
+                                "🎯 Choose the best description of the correlation in the plot:",
+                                [
+                                    "High Positive Correlation",
+                                    "Low Positive Correlation",
+                                    "No Correlation",
+                                    "Low Negative Correlation",
+                                    "High Negative Correlation",
+                                    "I Don't Know"
+                                ],
+                                key=f"guess_select_round_{st.session_state.round}"
+                            )
+                        submitted = st.form_submit_button("**Click here to submit your awesome guess!** ✅",
+                                                          type="primary")
+
+                    if "show_result" not in st.session_state:
+                        st.session_state.show_result = False
+
+                    if submitted and not st.session_state.show_result:
+                        actual = st.session_state.corr
+                        actual_label = get_actual_label(actual)
+
+                        if guess == "I Don't Know":
+                            round_score = 0
+                        elif guess == actual_label:
+                            round_score = 100
+                        else:
+                            round_score = 50
+
+                        st.session_state.round_score = round_score
+                        st.session_state.actual_label = actual_label
+                        st.session_state.actual_corr = actual
+                        st.session_state.student_guess = guess
+                        st.session_state.score += round_score
+                        st.session_state.show_result = True
+
+                        # Store round results for final summary
+                        round_result = {
+                            "round": st.session_state.round,
+                            "type": current_round_info['type'],
+                            "target": current_round_info['target'],
+                            "actual": actual,
+                            "guess": guess,
+                            "correct": guess == actual_label,
+                            "score": round_score
+                        }
+                        st.session_state.round_results.append(round_result)
+                        count_round()
+
+                    if st.session_state.show_result:
+                        # Show feedback/results
+                        round_score = st.session_state.round_score
+                        actual = st.session_state.actual_corr
+                        actual_label = st.session_state.actual_label
+                        guess = st.session_state.student_guess
+
+                        if round_score == 100:
+                            result_emoji = "🏆🌟"
+                            result_color = "#28a745"
+                            result_msg = "Perfect! You nailed it!"
+                        elif round_score == 50:
+                            result_emoji = "👍💪"
+                            result_color = "#17a2b8"
+                            result_msg = "Good try! You're close!"
+                        else:
+                            result_emoji = "🤔💡"
+                            result_color = "#6c757d"
+                            result_msg = "Keep practicing!"
+
+                        markdown_span = timings.start(GAME, "markdown")
+                        st.markdown(f"""
+                        <div style="background: linear-gradient(135deg, {result_color}22, {result_color}44);
+                                    padding: 20px;
+                                    border-radius: 15px;
+                                    border-left: 5px solid {result_color};
+                                    margin: 10px 0;">
+                            <h3 style="color: #2E4057;">{result_emoji} <strong>{result_msg}</strong></h3>
+                            <p><strong>✅ Actual Correlation Value:</strong> <code>{actual:.2f}</code></p>
+                            <p><strong>🏷️ Actual Category:</strong> <code>{actual_label}</code></p>
+                            <p><strong>🎯 Your Guess:</strong> <code>{guess}</code></p>
+                            <p><strong>🏅 Score This Round:</strong> <code>{round_score}/100</code></p>
+                            <p><strong>🔥 Total Score:</strong> <code>{st.session_state.score}/600</code></p>
+                        </div>
+                        """, unsafe_allow_html=True)
+                        markdown_span.stop()
+
+                        if st.button("➡️ Next Round"):
+                            st.session_state.round += 1
+                            st.session_state.puzzle = None
+                            st.session_state.show_result = False
+                            if st.session_state.round <= len(CORRELATION_STRUCTURE):
+                                # Load the next plot now, so the round needs no "Generate" rerun
+                                load_round(st.session_state.round)
+                            # Otherwise the game is complete and shows final results on the rerun
+                            rerun()
+
+            guess_and_result()
 
 # ---------------------
 # Show scoreboard
 # ---------------------
-if not st.session_state.scoreboard.empty:
+if get_leaderboard().count(GAME):
     st.markdown("---")
     st.markdown("### 🏆🌟 **Hall of Fame - Correlation Champions!** 🌟🏆")
 
-    sorted_scoreboard = st.session_state.scoreboard.sort_values(by="Total Score", ascending=False).reset_index(
-        drop=True)
-
     # Add ranking emojis
     ranking_emojis = ["🥇", "🥈", "🥉", "🏅", "⭐", "🌟", "💫", "✨", "🎯", "🎮"]
 
-    # Create a copy for display
-    display_scoreboard = sorted_scoreboard.copy()
-    display_scoreboard.index += 1  # Start ranking from 1
-
-    # Add emoji column
-    display_scoreboard['Rank'] = [ranking_emojis[min(i, len(ranking_emojis) - 1)] for i in
-                                  range(len(display_scoreboard))]
-
-    # Reorder columns
-    display_scoreboard = display_scoreboard[['Rank', 'Name', 'Total Score']]
-
-    # Style the dataframe
-    st.dataframe(
-        display_scoreboard,
-        use_container_width=True,
-        hide_index=True,
-        column_config={
-            "Rank": st.column_config.TextColumn("🏆 Rank", width="small"),
-            "Name": st.column_config.TextColumn("👤 Player Name", width="medium"),
-            "Total Score": st.column_config.NumberColumn("🎯 Score", width="small", format="%d/600")
-        }
-    )
+
+    def rank_label(rank):
+        return ranking_emojis[rank - 1] if rank <= len(ranking_emojis) else f"#{rank}"
+
+
+    # Top ten, the player's own rank and a paged full list
+    with timings.section(GAME, "scoreboard"):
+        show_scoreboard(
+            GAME,
+            st.session_state.get("last_row_id"),
+            rank_label=rank_label,
+            column_config={
+                "Rank": st.column_config.TextColumn("🏆 Rank", width="small"),
+                "Name": st.column_config.TextColumn("👤 Player Name", width="medium"),
+                "Total Score": st.column_config.NumberColumn("🎯 Score", width="small", format="%d/600")
+            }
+        )
 
 # ---------------------
 # Instructor reset button (hidden behind password)
@@ -519,19 +590,29 @@ with st.expander("🔐👨‍🏫 **Instructor Control Panel**"):
 
         with col1:
             if st.button("🚨💥 **Reset Entire Scoreboard** 💥🚨", type="secondary"):
-                st.session_state.scoreboard = pd.DataFrame(columns=["Name", "Total Score"])
+                get_leaderboard().reset(GAME)
                 st.success("✅ Scoreboard has been reset successfully! 🧹✨")
                 st.balloons()
 
         with col2:
             st.info("🔥 **Quick Stats:** 🔥\n\n" +
-                    f"📊 Total Players: **{len(st.session_state.scoreboard)}**\n\n" +
+                    f"📊 Total Players: **{get_leaderboard().count(GAME)}**\n\n" +
                     f"🎯 Rounds per Game: **6**\n\n" +
                     f"🏆 Max Possible Score: **600**")
 
+        cache_stats = get_guide_cache().stats()
+        st.caption(f"🖼️ Guide image cache – memory hits: {cache_stats['memory_hits']}, "
+                   f"disk hits: {cache_stats['disk_hits']}, misses: {cache_stats['misses']}, "
+                   f"on disk: {cache_stats['disk_bytes'] / 1024:.0f} KB")
+        show_section_timings(GAME)
+        show_replay()
+        show_class_controls(GAME, class_puzzle, class_plot)
+
         # Show correlation structure for instructor reference
         st.markdown("### 📋🎯 **Game Structure Reference:**")
 
+        import pandas as pd  # loaded only once the panel is unlocked
+
         structure_df = pd.DataFrame([
             {
                 "Round": f"Round {i + 1}",
@@ -552,4 +633,6 @@ with st.expander("🔐👨‍🏫 **Instructor Control Panel**"):
                 "Target": st.column_config.TextColumn("🎯 Target Value", width="small"),
                 "Description": st.column_config.TextColumn("💭 Description", width="large")
             }
-        )
\ No newline at end of file
+        )
+
+finish_rerun()
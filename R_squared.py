@@ -1,91 +1,115 @@
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.stats import pearsonr
-import pandas as pd
-import random
+from classroom import get_classroom
+from classroom_view import show_class_controls, show_class_round
+from game_config import ROUND_POINTS, r_squared_scenarios
+from guide_cache import get_guide_cache
+from leaderboard import get_leaderboard
+from plot_backend import new_plot, show_guide, show_plot
+from puzzle_view import show_puzzle_code, show_replay
+from prerender import cancel_prerender, prerender_round, prerendered, prerendered_r
+from puzzles import get_puzzle_cache, new_puzzles
+from scoreboard_view import show_scoreboard
+from seeding import GUIDE_SEED, make_rng, new_seed
+from section_timing import get_section_timings
+from session_janitor import session_store
+from timing_view import count_rerun, count_round, finish_rerun, fragment, rerun, show_section_timings, start_rerun
 
 # ---------------------
 # Streamlit config
 # ---------------------
 st.set_page_config(page_title="Guess the R²!", layout="centered")
+GAME = "R_squared"  # this app's key on the shared leaderboard
+timings = get_section_timings()
+start_rerun(GAME)  # stopped at the end of the script, or by rerun()
+count_rerun()
 st.title("🚦 Guess the R² – Transportation Data Challenge")
 
 # ---------------------
 # Session state setup
 # ---------------------
-if "x" not in st.session_state:
-    st.session_state.x = None
-if "y" not in st.session_state:
-    st.session_state.y = None
+if "puzzle" not in st.session_state:
+    st.session_state.puzzle = None  # the round on screen; its points live in the shared puzzle cache
 if "r_squared" not in st.session_state:
     st.session_state.r_squared = None
 if "round" not in st.session_state:
     st.session_state.round = 1
 if "score" not in st.session_state:
     st.session_state.score = 0
-if "scoreboard" not in st.session_state:
-    st.session_state.scoreboard = pd.DataFrame(columns=["Name", "Total Score"])
 if "student_name" not in st.session_state:
     st.session_state.student_name = ""
+if "game" not in st.session_state:
+    st.session_state.game = None
+    st.session_state.game_seed = None
+
+
+def round_figure():
+    """This session's guessing plot, built the first time a round is shown"""
+    store = session_store()  # outside session state, so the session janitor can drop it
+    if "round_figure" not in store:
+        # One figure per session; new rounds only swap the points
+        store["round_figure"] = new_plot(c='orange', edgecolors='black')
+        store["round_figure"].set_title("📊 Estimate the R² (How well does X predict Y?)")
+    return store["round_figure"]
+
 
 # ---------------------
 # Show intro plots before starting
 # ---------------------
 def generate_transport_plot(corr_type):
+    rng = make_rng(GUIDE_SEED)
     x = np.linspace(0, 100, 100)
     if corr_type == "positive":
-        y = x + np.random.normal(0, 10, size=100)
+        y = x + rng.normal(0, 10, size=100)
         title = "More Bicycle Lanes vs. Fewer Accidents"
         xlabel = "Miles of Dedicated Bicycle Lanes"
         ylabel = "Number of Bicycle Accidents"
     elif corr_type == "negative":
-        y = -x + np.random.normal(0, 10, size=100) + 100
+        y = -x + rng.normal(0, 10, size=100) + 100
         title = "Public Transit Usage vs. Traffic Congestion"
         xlabel = "Public Transit Usage (%)"
         ylabel = "Traffic Congestion Level"
     else:
-        y = np.random.normal(50, 15, size=100)
+        y = rng.normal(50, 15, size=100)
         title = "Street Lights vs. Car Color"
         xlabel = "Number of Street Lights"
         ylabel = "Number of Red Cars"
 
-    fig, ax = plt.subplots()
-    ax.scatter(x, y, c='skyblue', edgecolors='black')
-    ax.set_title(title, fontsize=14)
-    ax.set_xlabel(xlabel, fontsize=12)
-    ax.set_ylabel(ylabel, fontsize=12)
-    ax.tick_params(axis='both', labelsize=10)
-    return fig
-
-# Data generation rules
-scenarios = [
-    {
-        "x_label": "Speed Limit (mph)",
-        "y_label": "Crash Count",
-        "direction": "positive"
-    },
-    {
-        "x_label": "Number of Vehicles",
-        "y_label": "Traffic Delay (min)",
-        "direction": "positive"
-    },
-    {
-        "x_label": "Public Transit Usage (%)",
-        "y_label": "Traffic Congestion Level",
-        "direction": "negative"
-    },
-    {
-        "x_label": "Road Width (m)",
-        "y_label": "Vehicle Throughput",
-        "direction": "positive"
-    },
-    {
-        "x_label": "Gas Prices ($/gallon)",
-        "y_label": "Vehicle Miles Traveled",
-        "direction": "negative"
-    }
-]
+    plot = new_plot(c='skyblue', edgecolors='black')
+    plot.set_data(x, y)
+    plot.set_title(title, fontsize=14)
+    plot.set_labels(xlabel, ylabel, fontsize=12)
+    return plot
+
+def show_transport_guide(corr_type):
+    # Built once per process, then served from the shared guide cache
+    with timings.section(GAME, "guides"):
+        show_guide(st, corr_type, "transport", lambda: generate_transport_plot(corr_type))
+
+# Data generation rules (scenarios and target R² range) live in game_config
+def new_game(seed):
+    """Puzzles for all 5 rounds, each a random scenario, drawn from ``seed``"""
+    rng = make_rng(seed)
+    return new_puzzles(GAME, rng, [(int(i), None, ROUND_POINTS) for i in rng.integers(len(r_squared_scenarios), size=5)])
+
+
+def class_puzzle():
+    """A fresh round for class mode, drawn like a game round"""
+    return new_game(new_seed())[0]
+
+
+def round_plot(puzzle, x, y):
+    """A round's plot on a figure of its own, for class rounds and background pre-rendering"""
+    scenario = r_squared_scenarios[puzzle.scenario]
+    plot = new_plot(c='orange', edgecolors='black')
+    plot.set_data(x, y)
+    plot.set_title("📊 Estimate the R² (How well does X predict Y?)")
+    plot.set_labels(scenario["x_label"], scenario["y_label"])
+    return plot
+
+
+class_round = get_classroom().current(GAME)  # set while the instructor runs class mode
+
 
 if st.session_state.student_name == "":
     st.subheader("📚 Quick Guide to R²")
@@ -93,13 +117,13 @@ if st.session_state.student_name == "":
 
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.pyplot(generate_transport_plot("positive"))
+        show_transport_guide("positive")
         st.caption("🚲 More bike lanes = fewer accidents (strong **positive** correlation)")
     with col2:
-        st.pyplot(generate_transport_plot("negative"))
+        show_transport_guide("negative")
         st.caption("🚌 More transit use = less congestion (strong **negative** correlation)")
     with col3:
-        st.pyplot(generate_transport_plot("zero"))
+        show_transport_guide("zero")
         st.caption("💡 Street lights and car color = **no clear relation**")
 
     st.markdown("---")
@@ -108,84 +132,111 @@ if st.session_state.student_name == "":
     if name_input:
         st.session_state.student_name = name_input.strip()
         st.success(f"Welcome, {st.session_state.student_name}!")
-        st.rerun()
+        rerun()
+
+elif class_round is not None:
+    show_class_round(GAME, class_round, "r_squared")
 
 # ---------------------
 # Game begins here
 # ---------------------
 else:
-    st.write(f"👋 Hello **{st.session_state.student_name}** – Round {st.session_state.round} of 5")
-
-    if st.button("🎲 Generate New Plot"):
-        scenario = random.choice(scenarios)
-        x = np.random.uniform(10, 100, 100)
-
-        if scenario["direction"] == "positive":
-            y = x + np.random.normal(0, 10, size=100)
-        elif scenario["direction"] == "negative":
-            y = -x + np.random.normal(0, 10, size=100) + 100
-        else:
-            y = np.random.normal(50, 10, size=100)
-
-        st.session_state.x = x
-        st.session_state.y = y
-        st.session_state.r_squared = round(pearsonr(x, y)[0] ** 2, 2)
-        st.session_state.xlabel = scenario["x_label"]
-        st.session_state.ylabel = scenario["y_label"]
-
-    if st.session_state.x is not None:
-        fig, ax = plt.subplots()
-        ax.scatter(st.session_state.x, st.session_state.y, c='orange', edgecolors='black')
-        ax.set_title("📊 Estimate the R² (How well does X predict Y?)")
-        ax.set_xlabel(st.session_state.get("xlabel", "X"))
-        ax.set_ylabel(st.session_state.get("ylabel", "Y"))
-        st.pyplot(fig)
-
-        guess_input = st.text_input(
-            "🔢 Enter your guess for R² (between 0 and 1):",
-            placeholder="e.g. 0.75",
-            key=f"guess_{st.session_state.round}"
-        )
-
-        if st.button("✅ Submit Guess"):
-            if guess_input.strip() == "":
-                st.error("❗ Please enter a number.")
-            else:
-                try:
-                    guess = float(guess_input)
-                    if 0.0 <= guess <= 1.0:
-                        actual = st.session_state.r_squared
-                        diff = abs(guess - actual)
-                        round_score = max(0, round((1 - diff) * 100))
-                        st.session_state.score += round_score
-
-                        st.markdown(f"**✅ Actual R²:** `{actual:.2f}`")
-                        st.markdown(f"**🎯 Your Guess:** `{guess:.2f}`")
-                        st.markdown(f"**🏅 Score This Round:** `{round_score}/100`")
-
-                        st.session_state.round += 1
-                        st.session_state.x = None
-                        st.session_state.y = None
-
-                        if st.session_state.round > 5:
-                            st.success(f"🎉 Great job, {st.session_state.student_name}! Final Score: {st.session_state.score}/500")
-                            new_row = pd.DataFrame([[st.session_state.student_name, st.session_state.score]], columns=["Name", "Total Score"])
-                            st.session_state.scoreboard = pd.concat([st.session_state.scoreboard, new_row], ignore_index=True)
-                            st.session_state.student_name = ""
-                            st.session_state.round = 1
-                            st.session_state.score = 0
-                            st.rerun()
-                    else:
-                        st.error("❗ Number must be between 0 and 1.")
-                except ValueError:
-                    st.error("❗ Please enter a valid numeric value.")
+    # The round is a fragment: generating a plot or submitting a guess reruns only the round,
+    # not the title, the scoreboard or the instructor panel
+    @fragment
+    def play_round():
+        if not st.session_state.student_name or get_classroom().current(GAME) is not None:
+            rerun()  # the game just ended, or class mode started: the whole page changes
+
+        st.write(f"👋 Hello **{st.session_state.student_name}** – Round {st.session_state.round} of 5")
+
+        # The whole game is a few puzzle descriptors; all its rounds' points are built now, in one stacked pass
+        if st.session_state.game is None:
+            with timings.section(GAME, "data"):
+                st.session_state.game_seed = new_seed()
+                st.session_state.game = new_game(st.session_state.game_seed)
+                get_puzzle_cache().fill(st.session_state.game)
+
+        if st.button("🎲 Generate New Plot"):
+            puzzle = st.session_state.game[st.session_state.round - 1]
+            scenario = r_squared_scenarios[puzzle.scenario]
+
+            st.session_state.puzzle = puzzle
+            # From this round's background build, if it's ready
+            st.session_state.r_squared = round(prerendered_r(puzzle) ** 2, 2)
+            st.session_state.xlabel = scenario["x_label"]
+            st.session_state.ylabel = scenario["y_label"]
+        elif st.session_state.puzzle is None:
+            # Build this round's plot in the background while the student reads, ready for the click
+            prerender_round(st.session_state.game[st.session_state.round - 1], round_plot)
+
+        if st.session_state.puzzle is not None:
+            with timings.section(GAME, "plot"):
+                plot = prerendered(st.session_state.puzzle)
+                if plot is None:
+                    x, y, _ = get_puzzle_cache().get(st.session_state.puzzle)
+                    plot = round_figure()
+                    plot.set_data(x, y)
+                    plot.set_labels(st.session_state.get("xlabel", "X"), st.session_state.get("ylabel", "Y"))
+                show_plot(plot)
+            show_puzzle_code(st.session_state.puzzle)
+            if st.session_state.round < len(st.session_state.game):
+                # And the next round's, while the student answers this one
+                prerender_round(st.session_state.game[st.session_state.round], round_plot)
+
+            # A form, so typing the guess reruns nothing; only submitting reruns the round
+            with st.form("guess_form", border=False):
+                guess_input = st.text_input(
+                    "🔢 Enter your guess for R² (between 0 and 1):",
+                    placeholder="e.g. 0.75",
+                    key=f"guess_{st.session_state.round}"
+                )
+                submitted = st.form_submit_button("✅ Submit Guess")
+
+            if submitted:
+                if guess_input.strip() == "":
+                    st.error("❗ Please enter a number.")
+                else:
+                    try:
+                        guess = float(guess_input)
+                        if 0.0 <= guess <= 1.0:
+                            actual = st.session_state.r_squared
+                            diff = abs(guess - actual)
+                            round_score = max(0, round((1 - diff) * 100))
+                            st.session_state.score += round_score
+
+                            st.markdown(f"**✅ Actual R²:** `{actual:.2f}`")
+                            st.markdown(f"**🎯 Your Guess:** `{guess:.2f}`")
+                            st.markdown(f"**🏅 Score This Round:** `{round_score}/100`")
+
+                            st.session_state.round += 1
+                            st.session_state.puzzle = None
+                            count_round()
+
+                            if st.session_state.round > 5:
+                                st.success(f"🎉 Great job, {st.session_state.student_name}! Final Score: {st.session_state.score}/500")
+                                st.session_state.last_row_id = get_leaderboard().record(
+                                    GAME, st.session_state.student_name, st.session_state.score)
+                                st.session_state.student_name = ""
+                                st.session_state.round = 1
+                                st.session_state.score = 0
+                                st.session_state.game = None
+                                cancel_prerender()
+                                rerun()
+                        else:
+                            st.error("❗ Number must be between 0 and 1.")
+                    except ValueError:
+                        st.error("❗ Please enter a valid numeric value.")
+
+    play_round()
 
 # ---------------------
 # Show scoreboard
 # ---------------------
-if not st.session_state.scoreboard.empty:
+if get_leaderboard().count(GAME):
     st.subheader("📋 Scoreboard")
-    st.dataframe(st.session_state.scoreboard.sort_values(by="Total Score", ascending=False).reset_index(drop=True))
+    with timings.section(GAME, "scoreboard"):
+        show_scoreboard(GAME, st.session_state.get("last_row_id"))
 
 # ---------------------
 # Instructor reset button
@@ -194,5 +245,14 @@ with st.expander("🔒 Instructor Panel"):
     admin_password = st.text_input("Enter instructor password to unlock reset", type="password")
     if admin_password == "letmein":
         if st.button("🚨 Reset Entire Scoreboard"):
-            st.session_state.scoreboard = pd.DataFrame(columns=["Name", "Total Score"])
+            get_leaderboard().reset(GAME)
             st.success("Scoreboard has been reset.")
+
+        cache_stats = get_guide_cache().stats()
+        st.caption(f"🖼️ Guide image cache – memory hits: {cache_stats['memory_hits']}, "
+                   f"disk hits: {cache_stats['disk_hits']}, misses: {cache_stats['misses']}")
+        show_section_timings(GAME)
+        show_replay()
+        show_class_controls(GAME, class_puzzle, round_plot)
+
+finish_rerun()
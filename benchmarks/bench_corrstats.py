@@ -0,0 +1,71 @@
+"""Import time and per-call cost of corrstats vs. scipy.stats.pearsonr.
+
+Import times are measured in fresh interpreters, on top of an already
+imported numpy. Per-call times cover a single pair at the apps' sizes and
+one batched call over a whole 6-round game.
+
+    python -m benchmarks.bench_corrstats
+"""
+import argparse
+import os
+import subprocess
+import sys
+import timeit
+
+import numpy as np
+
+import corrstats
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SIZES = [40, 100, 1_000, 100_000]
+
+
+def import_seconds(module, runs):
+    code = (
+        "import time, numpy; start = time.perf_counter(); "
+        f"import {module}; print(time.perf_counter() - start)"
+    )
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, check=True,
+                             capture_output=True, text=True).stdout
+        samples.append(float(out))
+    return min(samples)
+
+
+def per_call(fn, number):
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--import-runs", type=int, default=5)
+    args = parser.parse_args()
+
+    from scipy.stats import pearsonr
+
+    print("import time (best of fresh interpreters, numpy preloaded):")
+    for module in ["corrstats", "scipy.stats"]:
+        print(f"  {module:<12} {import_seconds(module, args.import_runs) * 1e3:8.1f} ms")
+
+    rng = np.random.default_rng(0)
+    print("\nper call:")
+    print(f"  {'n':>8} {'corrstats µs':>13} {'scipy µs':>10} {'|Δr|':>9}")
+    for n in SIZES:
+        x = rng.uniform(10, 100, n)
+        y = 0.6 * x + rng.normal(0, 20, n)
+        number = max(10, 20_000 // n)
+        ours = per_call(lambda: corrstats.pearson_r(x, y), number)
+        theirs = per_call(lambda: pearsonr(x, y)[0], number)
+        diff = abs(corrstats.pearson_r(x, y) - pearsonr(x, y)[0])
+        print(f"  {n:>8} {ours * 1e6:>13.1f} {theirs * 1e6:>10.1f} {diff:>9.1e}")
+
+    x = rng.uniform(size=(6, 1000))
+    y = x + rng.normal(0, 0.3, (6, 1000))
+    ours = per_call(lambda: corrstats.pearson_r(x, y), 200)
+    theirs = per_call(lambda: [pearsonr(a, b)[0] for a, b in zip(x, y)], 200)
+    print(f"  6x1000 batch: corrstats {ours * 1e6:.1f} µs in one call, scipy {theirs * 1e6:.1f} µs in a loop")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Per-dataset cost and accuracy of datagen.correlated_data from n=40 to n=100k.
+
+For comparison it also runs the old noise-then-rescale recipe from
+Correlation_Code.py and reports how far its realized r lands from the target.
+
+    python -m benchmarks.bench_datagen
+"""
+import argparse
+import timeit
+
+import numpy as np
+
+from datagen import correlated_data
+
+SIZES = [40, 60, 100, 1_000, 10_000, 100_000]
+TARGETS = [-0.95, -0.8, -0.45, -0.2, 0.0, 0.05, 0.15, 0.6, 0.9, 0.95]
+
+
+def pearson(x, y):
+    return np.corrcoef(x, y)[0, 1]
+
+
+def legacy(n, target_corr):
+    # The pre-datagen recipe: a straight line plus noise, target only approximate
+    x = np.random.uniform(10, 100, n)
+    y = x * abs(target_corr) * np.sign(target_corr) + np.random.normal(0, 0.5 * 50, n)
+    return x, y
+
+
+def measure(generate, n, repeat):
+    errors = []
+    for target in TARGETS:
+        x, y = generate(n, target)
+        errors.append(abs(pearson(x, y) - target))
+    per_call = min(timeit.repeat(lambda: generate(n, 0.6), number=repeat, repeat=3)) / repeat
+    return per_call, max(errors), float(np.mean(errors))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200, help="calls per timing sample (scaled down for big n)")
+    args = parser.parse_args()
+
+    print(f"{'n':>8} | {'datagen µs':>11} {'max |Δr|':>10} | {'legacy µs':>10} {'mean |Δr|':>10}")
+    for n in SIZES:
+        repeat = max(3, args.repeat * 100 // max(n, 100))
+        new_t, new_err, _ = measure(lambda n, r: correlated_data(n, r, (10, 100), (0, 100)), n, repeat)
+        old_t, _, old_err = measure(legacy, n, repeat)
+        print(f"{n:>8} | {new_t * 1e6:>11.1f} {new_err:>10.1e} | {old_t * 1e6:>10.1f} {old_err:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Render time and PNG size per round as n grows: plain scatter vs. density LOD.
+
+For each n a fresh scatter figure is drawn next to the RoundFigure used by the
+apps, which switches to a binned density image above DENSITY_THRESHOLD. It
+checks three things:
+- the LOD render stays under a fixed time budget at every n
+- the binned image keeps the data's correlation (count-weighted r of bin centres)
+- scatter is skipped above --max-scatter points, where it takes seconds
+
+    python -m benchmarks.bench_density --points 1000 10000 100000 1000000
+"""
+import argparse
+import io
+import sys
+import time
+import warnings
+
+import numpy as np
+from matplotlib.figure import Figure
+
+from corrstats import pearson_r
+from datagen import correlated_data
+from density import DENSITY_THRESHOLD, bin_points
+from round_figure import RoundFigure
+
+STYLE = dict(c="#FF6B6B", edgecolors="white", s=80, alpha=0.8, linewidth=1.5)
+FIGSIZE = (10, 7)
+
+
+def to_png(fig):
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=200, bbox_inches="tight")
+    return len(buf.getvalue())
+
+
+def plain_scatter(x, y):
+    fig = Figure(figsize=FIGSIZE)
+    fig.add_subplot().scatter(x, y, **STYLE)
+    return to_png(fig)
+
+
+def lod(round_fig, x, y):
+    round_fig.clear_data()  # otherwise repeats with the same arrays skip the binning
+    round_fig.set_data(x, y)
+    return to_png(round_fig.fig)
+
+
+def binned_r(x, y):
+    counts, (x0, x1, y0, y1) = bin_points(x, y, FIGSIZE[1] / FIGSIZE[0])
+    ny, nx = counts.shape
+    cx = x0 + (np.arange(nx) + 0.5) * (x1 - x0) / nx
+    cy = y0 + (np.arange(ny) + 0.5) * (y1 - y0) / ny
+    w = counts / counts.sum()
+    mx, my = (w.sum(axis=0) * cx).sum(), (w.sum(axis=1) * cy).sum()
+    dx, dy = cx[np.newaxis, :] - mx, cy[:, np.newaxis] - my
+    return (w * dx * dy).sum() / np.sqrt((w * dx ** 2).sum() * (w * dy ** 2).sum())
+
+
+def timed(render, *args, repeat=3):
+    best, size = np.inf, 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = render(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1e3, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, nargs="+", default=[1000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--budget-ms", type=float, default=500.0, help="max LOD render time at any n")
+    parser.add_argument("--max-scatter", type=int, default=100_000, help="largest n to draw as a plain scatter")
+    parser.add_argument("--target", type=float, default=0.7)
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore", message="Glyph")
+
+    rng = np.random.default_rng(0)
+    round_fig = RoundFigure(figsize=FIGSIZE, **STYLE)
+    over_budget = []
+    print(f"threshold: {DENSITY_THRESHOLD:,} points")
+    print(f"{'points':>10}  {'scatter':>18}  {'LOD':>18}  {'r data':>7} {'r bins':>7}")
+    for n in args.points:
+        x, y = correlated_data(n, args.target, (10, 100), (0, 100), rng=rng)
+        if n <= args.max_scatter:
+            ms, size = timed(plain_scatter, x, y, repeat=1)
+            scatter = f"{ms:>7.0f}ms {size / 1024:>7.0f}KB"
+        else:
+            scatter = f"{'skipped':>18}"
+        lod_ms, lod_size = timed(lod, round_fig, x, y)
+        shown_r = binned_r(x, y) if n > DENSITY_THRESHOLD else float("nan")
+        print(f"{n:>10,}  {scatter}  {lod_ms:>7.0f}ms {lod_size / 1024:>7.0f}KB  "
+              f"{pearson_r(x, y):>7.3f} {shown_r:>7.3f}")
+        if lod_ms > args.budget_ms:
+            over_budget.append(n)
+
+    if over_budget:
+        print(f"\nOVER BUDGET ({args.budget_ms:.0f}ms) at n = {', '.join(f'{n:,}' for n in over_budget)}")
+        sys.exit(1)
+    print(f"\nLOD render within {args.budget_ms:.0f}ms at every n")
+
+
+if __name__ == "__main__":
+    main()
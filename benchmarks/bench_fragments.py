@@ -0,0 +1,93 @@
+"""Script runs and latency per interaction, with and without the st.fragment split.
+
+Plays load_test's games on a live ``streamlit run`` server through
+live_server.Browser, paging the scoreboard after each, once as shipped and
+once with CHALLENGER_FRAGMENTS=0. With that setting
+every fragment runs inside a full rerun, as the apps did before the split.
+The server reports every script run it starts, so the full and fragment runs
+below are counted, not assumed. Picking an answer in a form sends nothing,
+so it costs no run and isn't listed. The scratch leaderboard is seeded with
+enough rows that the full, paged scoreboard is shown.
+
+    python -m benchmarks.bench_fragments --games 3
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SEED_ROWS = 30  # leaderboard rows written before the run, so the scoreboard has pages
+
+
+FRAGMENT_APPS = ["Correlation.py", "Correlationupdate.py", "Correlation_Code.py", "R_squared.py"]  # every game
+
+
+async def page_scoreboard(tab):
+    await tab.change("checkbox", "Show full leaderboard", True, "show scoreboard")
+    await tab.change("number_input", "Page", 2, "page scoreboard")
+    await tab.change("checkbox", "Show full leaderboard", False, "hide scoreboard")
+
+
+def measure(app, games, fragments):
+    from benchmarks.live_server import Browser, serve
+    from benchmarks.load_test import PLAYERS
+
+    async def play(url):
+        tab = await Browser(url).open()
+        rng = random.Random(0)
+        try:
+            for _ in range(games):
+                await PLAYERS[app](tab, rng, "Benchmark Student")
+                await page_scoreboard(tab)
+        finally:
+            tab.close()
+        return tab
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="challenger_frag_"), "leaderboard.sqlite3")
+    env = {"CHALLENGER_LEADERBOARD_DB": db_path, "CHALLENGER_FRAGMENTS": "1" if fragments else "0"}
+    os.environ["CHALLENGER_LEADERBOARD_DB"] = db_path
+    from leaderboard import Leaderboard
+
+    board = Leaderboard(db_path)
+    for i in range(SEED_ROWS):
+        board.record(app[:-3], f"Seed Student {i}", 10 * i)
+    with serve(app, env) as server:
+        return asyncio.run(play(server.url))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--apps", nargs="+", default=FRAGMENT_APPS)
+    parser.add_argument("--games", type=int, default=3)
+    args = parser.parse_args()
+    sys.path.insert(0, REPO_ROOT)
+
+    for app in args.apps:
+        before = measure(app, args.games, fragments=False)
+        after = measure(app, args.games, fragments=True)
+        print(f"{app}, {args.games} game(s); runs per interaction are full + fragment")
+        print(f"  {'interaction':<18}{'before':>16}{'after':>16}{'p50 before':>12}{'p50 after':>11}")
+        for action in after.runs:
+            if action == "open page":
+                continue
+            print(f"  {action:<18}{_runs(before.runs[action]):>16}{_runs(after.runs[action]):>16}"
+                  f"{statistics.median(before.latencies[action]) * 1e3:>10.0f}ms"
+                  f"{statistics.median(after.latencies[action]) * 1e3:>9.0f}ms")
+        print(f"  {'whole session':<18}{before.full_runs:>10} + {before.fragment_runs:<3}"
+              f"{after.full_runs:>10} + {after.fragment_runs:<3}"
+              f"{sum(map(sum, before.latencies.values())):>11.1f}s{sum(map(sum, after.latencies.values())):>10.1f}s")
+
+
+def _runs(samples):
+    """Mean full + fragment runs per interaction"""
+    full = sum(runs[0] for runs in samples) / len(samples)
+    fragment = sum(runs[1] for runs in samples) / len(samples)
+    return f"{full:.1f} + {fragment:.1f}"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Memory held by per-session plots over a day of back-to-back classes, with and without the session janitor.
+
+Simulates ``--classes`` classes of ``--students`` sessions on a fake clock.
+Each student opens the app when their class starts, reruns it every
+``--rerun-every`` seconds for ``--class-minutes`` minutes and then leaves
+without closing anything, as a browser tab left open does. Each session
+holds what the apps keep in their session store: a rendered RoundFigure
+and a pre-rendered PNG. The janitor sweeps once a minute. Both runs go in
+a fresh process, which reports the peak bytes held by sessions and its
+peak RSS.
+
+    python -m benchmarks.bench_janitor --classes 8 --students 30
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import warnings
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BREAK_MINUTES = 10  # between two classes
+
+
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+def open_session(store, rng):
+    from render import render_png
+    from round_figure import RoundFigure
+
+    round_fig = RoundFigure(c='orange', edgecolors='black')
+    round_fig.set_title("Estimate the correlation")
+    round_fig.set_data(rng.normal(size=100), rng.normal(size=100))
+    next_round = RoundFigure(c='orange', edgecolors='black')
+    next_round.set_data(rng.normal(size=100), rng.normal(size=100))
+    store["round_figure"] = round_fig
+    store["prerender_shown"] = (None, render_png(next_round.fig), 0.0)
+    next_round.close()
+    render_png(round_fig.fig)  # the round on screen; leaves the figure's renderer behind
+
+
+def simulate(args, ttl, results):
+    import numpy as np
+
+    from session_janitor import SWEEP_SECONDS, SessionJanitor
+
+    warnings.filterwarnings("ignore", message="Glyph")
+    rng = np.random.default_rng(0)
+    janitor = SessionJanitor(ttl=ttl)
+    class_seconds = args.class_minutes * 60
+    peak_held = peak_rss = 0
+    for lesson in range(args.classes):
+        start = lesson * (class_seconds + BREAK_MINUTES * 60)
+        for second in range(0, class_seconds + BREAK_MINUTES * 60, args.rerun_every):
+            now = start + second
+            if second < class_seconds:
+                for student in range(args.students):
+                    store = janitor.touch((lesson, student), now=now)
+                    if not store:
+                        open_session(store, rng)
+            if second % SWEEP_SECONDS == 0:
+                janitor.sweep(now=now)
+                peak_held = max(peak_held, janitor.stats()["held_bytes"])
+                peak_rss = max(peak_rss, rss_mb())
+    stats = janitor.stats()
+    results.put((peak_held / 2 ** 20, peak_rss, stats["held_bytes"] / 2 ** 20, stats["evicted"],
+                 stats["freed_bytes"] / 2 ** 20))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--classes", type=int, default=8)
+    parser.add_argument("--students", type=int, default=30)
+    parser.add_argument("--class-minutes", type=int, default=50)
+    parser.add_argument("--rerun-every", type=int, default=30, help="seconds between a student's reruns")
+    parser.add_argument("--ttl", type=int, default=900, help="janitor's idle TTL, seconds")
+    args = parser.parse_args()
+
+    sys.path.insert(0, REPO_ROOT)
+    context = multiprocessing.get_context("fork")
+    print(f"{args.classes} classes x {args.students} students, {args.class_minutes} min each, "
+          f"{BREAK_MINUTES} min breaks")
+    print(f"  {'janitor':<12}{'peak held MB':>14}{'peak RSS MB':>13}{'held at end':>13}{'evicted':>9}{'freed MB':>10}")
+    for label, ttl in (("off", float("inf")), (f"ttl {args.ttl}s", args.ttl)):
+        results = context.Queue()
+        worker = context.Process(target=simulate, args=(args, ttl, results))
+        worker.start()
+        peak_held, peak_rss, held, evicted, freed = results.get()
+        worker.join()
+        print(f"  {label:<12}{peak_held:>14.1f}{peak_rss:>13.1f}{held:>13.1f}{evicted:>9}{freed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Server CPU and bytes per rerun: matplotlib PNG vs. browser-drawn Vega-Lite.
+
+Redraws Correlationupdate's round plot with new points on every rerun and
+serializes it the way Streamlit does for each backend:
+- matplotlib: render_png saves a PNG at dpi 200 with a tight bounding box
+- Vega-Lite: st.vega_lite_chart sends the spec as JSON and the columns as Arrow
+
+    python -m benchmarks.bench_plot_backends --points 100 1000 10000
+"""
+import argparse
+import json
+import time
+import warnings
+
+import numpy as np
+from streamlit import dataframe_util
+
+from plot_backend import MAIN_WIDTH
+from render import render_png
+from round_chart import RoundChart
+from round_figure import RoundFigure
+
+RERUNS = 20
+STYLE = dict(figsize=(10, 7), edgecolors='white', s=80, alpha=0.8, linewidth=1.5)
+CHART_CONFIG = {
+    "axis": {"grid": True, "gridOpacity": 0.1, "gridDash": [4, 4], "domainColor": "#CCCCCC"},
+    "view": {"stroke": None},
+}
+
+
+def setup(fig, ax):
+    ax.grid(True, alpha=0.1, linestyle='--')
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+
+
+def style(plot):
+    plot.set_labels("X Variable", "Y Variable", fontsize=14, fontweight='bold')
+    plot.set_title("Round 1: Estimate the correlation!", fontsize=18, fontweight='bold', pad=20)
+    plot.set_point_color("#FF6B6B")
+    return plot
+
+
+def matplotlib_rerun(plot, x, y):
+    plot.set_data(x, y)
+    return len(render_png(plot.fig))
+
+
+def vega_lite_rerun(plot, x, y):
+    plot.set_data(x, y)
+    spec = json.dumps(plot.spec(MAIN_WIDTH))
+    data = dataframe_util.convert_anything_to_arrow_bytes(plot.columns())
+    return len(spec) + len(data)
+
+
+def measure(rerun, plot, points, reruns):
+    rng = np.random.default_rng(0)
+    times = []
+    size = 0
+    for _ in range(reruns):
+        x, y = rng.uniform(size=points), rng.uniform(size=points)
+        start = time.process_time()
+        size = rerun(plot, x, y)
+        times.append(time.process_time() - start)
+    return np.median(times) * 1e3, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--reruns", type=int, default=RERUNS)
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore", message="Glyph")
+
+    backends = [
+        ("matplotlib", matplotlib_rerun, lambda: style(RoundFigure(setup=setup, **STYLE))),
+        ("vega-lite", vega_lite_rerun, lambda: style(RoundChart(chart_config=CHART_CONFIG, **STYLE))),
+    ]
+    # Warm up imports and caches so the first measured rerun isn't penalized
+    for _, rerun, make in backends:
+        measure(rerun, make(), 10, 2)
+
+    print(f"{'points':>8}  {'backend':<11} {'cpu/rerun':>10} {'bytes/rerun':>12}")
+    for points in args.points:
+        results = {}
+        for name, rerun, make in backends:
+            results[name] = measure(rerun, make(), points, args.reruns)
+            ms, size = results[name]
+            print(f"{points:>8}  {name:<11} {ms:>8.2f}ms {size / 1024:>10.1f}KB")
+        (mpl_ms, mpl_bytes), (vl_ms, vl_bytes) = results["matplotlib"], results["vega-lite"]
+        print(f"{'':>8}  {'ratio':<11} {mpl_ms / vl_ms:>9.0f}x {mpl_bytes / vl_bytes:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
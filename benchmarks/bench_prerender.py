@@ -0,0 +1,80 @@
+"""Round latency with and without background pre-rendering of the next round.
+
+Plays load_test's games on a live ``streamlit run`` server twice: once with
+the pre-render pool switched off (CHALLENGER_PRERENDER_WORKERS=0) and once
+with two workers. A simulated student thinks for ``--think`` seconds before
+every interaction, which is when the pool builds the next round. The report
+is the p50 wall time of the reruns that put a new plot on screen. The pool's
+counts are read from the instructor panel afterwards.
+
+    python -m benchmarks.bench_prerender --games 2 --think 0.5
+"""
+import argparse
+import asyncio
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# App -> interactions that show a new round's plot
+NEW_PLOT = {
+    "Correlation.py": ["generate plot"],
+    "Correlation_Code.py": ["submit direction", "submit guess"],
+    "Correlationupdate.py": ["generate plot", "next round"],
+    "R_squared.py": ["generate plot"],
+}
+INSTRUCTOR_PASSWORD = "letmein"
+
+
+def play(app, games, think, workers):
+    from benchmarks.live_server import Browser, serve
+    from benchmarks.load_test import PLAYERS
+
+    class ThinkingBrowser(Browser):
+        async def rerun(self, action, triggers=(), fragment_id=""):
+            await asyncio.sleep(think)
+            await super().rerun(action, triggers, fragment_id)
+
+    async def session(url):
+        tab = await ThinkingBrowser(url).open()
+        rng = random.Random(0)
+        try:
+            for _ in range(games):
+                await PLAYERS[app](tab, rng, "Benchmark Student")
+            await tab.change("text_input", "password", INSTRUCTOR_PASSWORD, "unlock")
+        finally:
+            tab.close()
+        return tab
+
+    with serve(app, {"CHALLENGER_PRERENDER_WORKERS": str(workers)}) as server:
+        tab = asyncio.run(session(server.url))
+    latencies = [sample for kind in NEW_PLOT[app] for sample in tab.latencies.get(kind, [])]
+    caption = next(text for text in tab.texts() if "Pre-rendered rounds" in text)
+    stats = {key: int(value) for key, value in re.findall(r"(queued|shown): (\d+)", caption)}
+    return statistics.median(latencies) * 1e3, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--apps", nargs="+", default=list(NEW_PLOT))
+    parser.add_argument("--games", type=int, default=2)
+    parser.add_argument("--think", type=float, default=0.5, help="seconds before every interaction")
+    args = parser.parse_args()
+
+    # Scores go to a scratch leaderboard; the servers inherit this environment
+    os.environ["CHALLENGER_LEADERBOARD_DB"] = os.path.join(tempfile.mkdtemp(prefix="challenger_prerender_"),
+                                                           "leaderboard.sqlite3")
+    sys.path.insert(0, REPO_ROOT)
+    print(f"{args.games} game(s) per app, {args.think}s of thinking before every interaction")
+    print(f"  {'app':<24}{'off':>10}{'on':>10}  pre-rendered rounds shown")
+    for app in args.apps:
+        off_ms, _ = play(app, args.games, args.think, workers=0)
+        on_ms, stats = play(app, args.games, args.think, workers=2)
+        print(f"  {app:<24}{off_ms:>8.0f}ms{on_ms:>8.0f}ms  {stats['shown']} of {stats['queued']} queued")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Puzzle memory and fetch time per worker process, built on demand vs served from the puzzle bank.
+
+Writes a scratch bank, then starts ``--processes`` worker processes that
+each fetch every banked puzzle through a fresh PuzzleCache, the way the
+app's worker processes would. Each reports its fetch time and its memory
+from /proc/self/smaps_rollup: private memory is the process's own, shared
+memory is page cache the processes map together.
+
+    python -m benchmarks.bench_puzzle_bank --processes 4 --per-kind 20
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def memory_mb():
+    """(private, shared) resident MB of this process"""
+    fields = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    private = fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+    shared = fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0)
+    return private, shared
+
+
+def fetch_all(bank_path, use_bank, results):
+    import puzzle_bank
+    from puzzles import PuzzleCache
+
+    banked = puzzle_bank.PuzzleBank(bank_path)
+    puzzles = list(banked)
+    no_bank = puzzle_bank.PuzzleBank(os.path.join(os.path.dirname(bank_path), "missing.npy"))
+    # Big enough that nothing is evicted, as on a quiet server
+    cache = PuzzleCache(max_bytes=1024 ** 4, bank=banked if use_bank else no_bank)
+    before, _ = memory_mb()
+    start = time.perf_counter()
+    for puzzle in puzzles:
+        x, y, _ = cache.get(puzzle)
+        float(x.sum() + y.sum())  # touch every page, as drawing the plot would
+    elapsed = time.perf_counter() - start
+    private, shared = memory_mb()
+    results.put((elapsed, private - before, shared))
+
+
+def run(bank_path, use_bank, processes):
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    workers = [context.Process(target=fetch_all, args=(bank_path, use_bank, results)) for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    measured = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+    return measured
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--per-kind", type=int, default=20)
+    args = parser.parse_args()
+
+    sys.path.insert(0, REPO_ROOT)
+    from puzzle_bank import write_bank
+
+    bank_path = os.path.join(tempfile.mkdtemp(prefix="challenger_bank_"), "puzzle_bank.npy")
+    count = len(write_bank(bank_path, args.per_kind))
+    print(f"{count} puzzles, {os.path.getsize(bank_path) / 1024 ** 2:.1f} MB bank, {args.processes} processes")
+    print(f"  {'source':<10}{'fetch all':>12}{'private MB':>12}{'shared MB':>12}   per process, mean")
+    for label, use_bank in (("built", False), ("bank", True)):
+        measured = run(bank_path, use_bank, args.processes)
+        elapsed, private, shared = (sum(column) / len(measured) for column in zip(*measured))
+        print(f"  {label:<10}{elapsed * 1e3:>10.0f}ms{private:>12.1f}{shared:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Per-rerun render time and memory: fresh plt.subplots() vs. a persistent RoundFigure.
+
+Simulates the round view of the apps over many games (5 rounds, a few reruns
+per round) and prints the mean render time and the process RSS as it goes.
+
+    python -m benchmarks.bench_round_figure --games 500
+"""
+import argparse
+import io
+import os
+import time
+import warnings
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+
+from round_figure import RoundFigure  # noqa: E402
+
+ROUNDS = 5
+RERUNS_PER_ROUND = 3  # round shown, guess typed, guess submitted
+POINTS = 100
+
+
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+def to_png(fig, dpi):
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=dpi, bbox_inches="tight")
+    return buf
+
+
+def legacy(x, y, dpi, _state):
+    # What the apps used to do on every rerun; the figure is never closed
+    fig, ax = plt.subplots()
+    ax.scatter(x, y, c='orange', edgecolors='black')
+    ax.set_title("Estimate the correlation")
+    to_png(fig, dpi)
+
+
+def persistent(x, y, dpi, state):
+    if "round_figure" not in state:
+        state["round_figure"] = RoundFigure(c='orange', edgecolors='black')
+        state["round_figure"].set_title("Estimate the correlation")
+    round_fig = state["round_figure"]
+    round_fig.set_data(x, y)
+    to_png(round_fig.fig, dpi)
+
+
+def soak(render, games, dpi):
+    rng = np.random.default_rng(0)
+    state = {}
+    times = []
+    samples = []
+    for game in range(1, games + 1):
+        for _ in range(ROUNDS):
+            x = rng.random(POINTS)
+            y = rng.random(POINTS)
+            for _ in range(RERUNS_PER_ROUND):
+                start = time.perf_counter()
+                render(x, y, dpi, state)
+                times.append(time.perf_counter() - start)
+        if game % max(1, games // 5) == 0:
+            samples.append((game, rss_mb()))
+    if "round_figure" in state:
+        state["round_figure"].close()
+    return np.array(times), samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=500)
+    parser.add_argument("--legacy-games", type=int, default=50,
+                        help="the legacy path leaks every figure, so it gets a shorter run")
+    parser.add_argument("--dpi", type=int, default=200, help="st.pyplot renders at 200 dpi")
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore", message="More than 20 figures")
+    runs = [
+        ("plt.subplots per rerun", legacy, min(args.games, args.legacy_games)),
+        ("persistent RoundFigure", persistent, args.games),
+    ]
+    for name, render, games in runs:
+        start_rss = rss_mb()
+        times, samples = soak(render, games, args.dpi)
+        print(f"{name} ({games} games):")
+        print(f"  render per rerun: mean {times.mean() * 1e3:.1f} ms, p95 {np.percentile(times, 95) * 1e3:.1f} ms")
+        print(f"  open pyplot figures: {len(plt.get_fignums())}")
+        print("  RSS: " + ", ".join(f"game {g}: {mb - start_rss:+.0f} MB" for g, mb in samples))
+        plt.close("all")
+
+
+if __name__ == "__main__":
+    main()
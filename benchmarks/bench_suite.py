@@ -0,0 +1,253 @@
+"""Micro-benchmark suite for the hot paths, with JSON baselines and a compare mode.
+
+Cases cover:
+- data generation at every Correlation_Code difficulty level
+- building one round from its puzzle descriptor, per app
+- adaptive mode's nearest-r puzzle lookup at 1k / 100k / 1M banked puzzles
+- picking an unused scenario from a catalog of 15 / 10k scenarios
+- uniform + normal draws from the legacy global RandomState vs. a PCG64 Generator
+- the correlation computation
+- one scatter render per app at its figsize and point count
+- get_actual_label classification
+- scoreboard record + top-10 + own-rank reads at 10 / 1k / 100k rows
+
+Each case is timed with timeit: calibrated to run for about 0.2 s per
+repeat, then repeated, round-robin across cases. The fastest repeat is what gets compared, as the
+timeit docs recommend, since slower repeats mostly measure other load on
+the machine. The median is kept alongside it for reference.
+
+    python -m benchmarks.bench_suite --save reference      # write benchmarks/baselines/reference.json
+    python -m benchmarks.bench_suite --compare reference   # exit 1 on any regression over --threshold
+    python -m benchmarks.bench_suite --filter render       # run matching cases only
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import timeit
+import warnings
+
+import numpy as np
+
+from corrstats import pearson_r
+from game_config import (difficulty_settings, generate_correlated_data,
+                         get_actual_label)
+from puzzle_bank import RIndex
+from puzzles import build_puzzle, new_puzzles
+from render import render_png
+from round_figure import RoundFigure
+from scenario_catalog import ScenarioCatalog, get_scenario_catalog
+from scoreboard import RankedScoreboard
+from seeding import make_rng
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+REPEAT = 7
+MIN_TIME = 0.2  # seconds per repeat
+
+# Each app's round plot: (figsize, points per round, scatter keywords)
+RENDER_CASES = {
+    "Correlation": (None, 100, dict(c='orange', edgecolors='black')),
+    "Correlation_Code": ((8, 6), 60, dict(color="orange", edgecolors="black", alpha=0.7)),
+    "Correlationupdate": ((10, 7), 1000, dict(edgecolors='white', s=80, alpha=0.8, linewidth=1.5)),
+    "R_squared": (None, 100, dict(c='orange', edgecolors='black')),
+}
+
+
+# ---------------------
+# Cases: each returns the callable to time
+# ---------------------
+def case_level(level):
+    scenario = get_scenario_catalog().scenario(get_scenario_catalog().ids(level)[0])
+    rng = make_rng(0)
+    return lambda: generate_correlated_data(scenario, level, rng)
+
+
+# A typical round of each app as (scenario, difficulty, n)
+PUZZLE_CASES = {
+    "Correlation": (None, None, 100),
+    "Correlation_Code": (7, 3, 50),  # scenario id 7 is a level 3 scenario
+    "Correlationupdate": (0, None, 1000),
+    "R_squared": (0, None, 100),
+}
+
+
+def case_puzzle(game):
+    puzzle, = new_puzzles(game, make_rng(0), [PUZZLE_CASES[game]])
+    return lambda: build_puzzle(puzzle)
+
+
+def case_nearest(size):
+    rng = make_rng(0)
+    r_index = RIndex(new_puzzles("Correlation_Code", rng, [(7, 3, 50)] * size), rng.uniform(-1, 1, size))
+    targets = iter(rng.uniform(-1, 1, 10 ** 7).tolist())
+    return lambda: r_index.nearest(next(targets))
+
+
+def case_pick_scenario(size):
+    # Every level holds size / 5 scenarios; a game has already used a few of them
+    catalog = ScenarioCatalog([{"id": i, "difficulty": i % 5 + 1, "direction": "positive", "base_corr": 0.5,
+                                "x_label": f"X {i}", "y_label": f"Y {i}"} for i in range(size)])
+    rng = make_rng(0)
+    used = {int(scenario_id) for scenario_id in rng.integers(size, size=4)}
+    return lambda: catalog.pick(3, rng, used)
+
+
+def case_draws(source, n):
+    # What every round draws: n uniforms for x and n standard normals for the noise
+    rng = np.random.RandomState(0) if source == "randomstate" else make_rng(0)
+    return lambda: (rng.uniform(size=n), rng.standard_normal(size=n))
+
+
+def case_pearson(n):
+    rng = np.random.default_rng(0)
+    x, y = rng.uniform(size=n), rng.uniform(size=n)
+    return lambda: pearson_r(x, y)
+
+
+def case_render(app):
+    figsize, points, scatter_kwargs = RENDER_CASES[app]
+    round_fig = RoundFigure(figsize=figsize, **scatter_kwargs)
+    round_fig.set_title("Estimate the correlation")
+    rng = np.random.default_rng(0)
+    data = [(rng.uniform(size=points), rng.uniform(size=points)) for _ in range(2)]
+    state = {"round": 0}
+
+    def render():
+        # Alternate rounds so every call redraws new points, then encode like show_plot
+        state["round"] ^= 1
+        round_fig.set_data(*data[state["round"]])
+        render_png(round_fig.fig)
+
+    return render
+
+
+def case_label():
+    values = np.random.default_rng(0).uniform(-1, 1, 1000).tolist()
+    return lambda: [get_actual_label(v) for v in values]
+
+
+def case_scoreboard(rows):
+    rng = np.random.default_rng(0)
+    board = RankedScoreboard()
+    for row_id, score in enumerate(rng.integers(0, 601, rows).tolist(), start=1):
+        board.append(row_id, f"Student {row_id}", score)
+    scores = iter(rng.integers(0, 601, 10 ** 7).tolist())
+
+    def record_and_read():
+        position = board.append(len(board) + 1, "New Student", next(scores))
+        board.ranked(0, 10)
+        board.rank(position)
+
+    return record_and_read
+
+
+CASES = {
+    **{f"datagen.level{level}": (lambda level=level: case_level(level)) for level in difficulty_settings},
+    **{f"puzzle.build.{game}": (lambda game=game: case_puzzle(game)) for game in PUZZLE_CASES},
+    **{f"scenario.pick.n{size}": (lambda size=size: case_pick_scenario(size)) for size in (15, 10_000)},
+    **{f"puzzle.nearest.n{size}": (lambda size=size: case_nearest(size)) for size in (1000, 100_000, 1_000_000)},
+    **{f"rng.{source}.n{n}": (lambda source=source, n=n: case_draws(source, n))
+       for source in ("randomstate", "pcg64") for n in (100, 1000)},
+    "stats.pearson_r.n100": lambda: case_pearson(100),
+    "stats.pearson_r.n1000": lambda: case_pearson(1000),
+    **{f"render.{app}": (lambda app=app: case_render(app)) for app in RENDER_CASES},
+    "classify.get_actual_label.x1000": case_label,
+    **{f"scoreboard.record_top10.rows{rows}": (lambda rows=rows: case_scoreboard(rows))
+       for rows in (10, 1000, 100_000)},
+}
+
+
+# ---------------------
+# Runner
+# ---------------------
+def run(names):
+    timers = {}
+    for name in names:
+        timer = timeit.Timer(CASES[name]())
+        number, elapsed = timer.autorange()
+        timers[name] = (timer, max(1, int(number * MIN_TIME / max(elapsed, 1e-9))))
+
+    # Repeats are interleaved across cases, so a slow stretch on the machine
+    # costs every case one repeat instead of costing one case all of them
+    per_call = {name: [] for name in names}
+    for _ in range(REPEAT):
+        for name, (timer, number) in timers.items():
+            per_call[name].append(timer.timeit(number) / number * 1e6)
+
+    results = {}
+    for name, samples in per_call.items():
+        number = timers[name][1]
+        results[name] = {"median_us": float(np.median(samples)), "min_us": min(samples), "loops": number}
+        print(f"  {name:<38} {_fmt(min(samples)):>10}  (median {_fmt(results[name]['median_us'])}, {number} loops)")
+    return results
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    print(f"\n  {'case':<38} {'baseline':>10} {'now':>10} {'change':>8}")
+    for name, result in results.items():
+        before = baseline["results"].get(name)
+        if before is None:
+            print(f"  {name:<38} {'-':>10} {_fmt(result['min_us']):>10}      new")
+            continue
+        change = result["min_us"] / before["min_us"] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif change < -threshold:
+            flag = "  faster"
+        print(f"  {name:<38} {_fmt(before['min_us']):>10} {_fmt(result['min_us']):>10} "
+              f"{change:>+7.0%}{flag}")
+    return regressions
+
+
+def _fmt(us):
+    return f"{us / 1000:.2f}ms" if us >= 1000 else f"{us:.1f}us"
+
+
+def _baseline_path(name):
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--save", metavar="NAME", help="store the results as baselines/NAME.json")
+    parser.add_argument("--compare", metavar="NAME", help="compare against baselines/NAME.json")
+    parser.add_argument("--threshold", type=float, default=0.25, help="relative slowdown counted as a regression")
+    parser.add_argument("--filter", default="", help="only run cases whose name contains this")
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore", message="Glyph")
+
+    names = [name for name in CASES if args.filter in name]
+    print(f"{len(names)} cases, best of {REPEAT} repeats")
+    results = run(names)
+
+    if args.save:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        with open(_baseline_path(args.save), "w") as f:
+            json.dump({
+                "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "machine": f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs",
+                "results": results,
+            }, f, indent=2)
+            f.write("\n")
+        print(f"\nsaved {os.path.relpath(_baseline_path(args.save))}")
+
+    if args.compare:
+        with open(_baseline_path(args.compare)) as f:
+            baseline = json.load(f)
+        print(f"\nagainst {args.compare} ({baseline['created']}, {baseline['machine']})")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print(f"\nno regressions over {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""Drive a real ``streamlit run`` server over its websocket, the way browser tabs do.
+
+AppTest runs the whole script for every interaction, so it can't show what
+st.fragment saves, and its runtime is process-global, so every simulated
+student needs an interpreter of its own. ``Browser`` speaks Streamlit's own
+protocol instead. It opens the app's websocket and sends the widget states a
+browser would send, with the fragment's id when the widget sits in a
+fragment. Then it reads the deltas back. Any number of tabs can share one
+server from one event loop, as real students share one server.
+
+Only what the load test and the benchmarks need is modelled: buttons, form
+submits, radios, text and number inputs, and toggles. Elements are tracked by
+their delta path and dropped when a run doesn't send them again, as the
+browser drops stale elements.
+
+    async def play(url):
+        tab = await Browser(url).open()
+        await tab.change("text_input", "name", "Ada")
+        await tab.click("generate plot", "Generate")
+
+    with serve("Correlationupdate.py") as server:
+        asyncio.run(play(server.url))
+"""
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from contextlib import contextmanager
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+START_TIMEOUT = 60  # seconds for the server to answer its health check
+
+
+class Server:
+    """A ``streamlit run`` process serving one app on a local port."""
+
+    def __init__(self, process, port, log_path):
+        self.process = process
+        self.url = f"http://127.0.0.1:{port}"
+        self.log_path = log_path
+
+    def memory_mb(self):
+        """(current, peak) RSS of the server process in MB"""
+        fields = {}
+        with open(f"/proc/{self.process.pid}/status") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                fields[key] = value.split()
+        return int(fields["VmRSS"][0]) / 1024, int(fields["VmHWM"][0]) / 1024
+
+
+@contextmanager
+def serve(app, env=None):
+    """Run ``streamlit run app`` headless on a free local port; yields its Server"""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    log_path = os.path.join(tempfile.mkdtemp(prefix="challenger_server_"), "streamlit.log")
+    with open(log_path, "w") as log:
+        process = subprocess.Popen(
+            [sys.executable, "-m", "streamlit", "run", os.path.join(REPO_ROOT, app),
+             "--server.headless", "true", "--server.address", "127.0.0.1", "--server.port", str(port),
+             "--server.fileWatcherType", "none", "--browser.gatherUsageStats", "false"],
+            cwd=REPO_ROOT, env={**os.environ, **(env or {})}, stdout=log, stderr=subprocess.STDOUT,
+        )
+    server = Server(process, port, log_path)
+    try:
+        deadline = time.monotonic() + START_TIMEOUT
+        while True:
+            if process.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError(f"{app} did not start, see {log_path}")
+            try:
+                with urllib.request.urlopen(f"{server.url}/_stcore/health", timeout=1):
+                    break
+            except OSError:
+                time.sleep(0.2)
+        yield server
+    finally:
+        process.terminate()
+        process.wait()
+
+
+class Browser:
+    """One browser tab on a live app, counting and timing the script runs it causes.
+
+    ``full_runs`` and ``fragment_runs`` count the runs the server reports
+    starting, including the extra run of an ``st.rerun()``. ``runs`` holds
+    each interaction's (full, fragment) count, ``latencies`` its wall time.
+    """
+
+    def __init__(self, url, timeout=120):
+        self.url = url
+        self.timeout = timeout
+        self.elements = {}  # delta path -> (element type, element proto, fragment id)
+        self.full_runs = 0
+        self.fragment_runs = 0
+        self.runs = {}
+        self.latencies = {}
+        self._values = {}  # widget id -> WidgetState with the value this tab has set
+        self._ws = None
+
+    async def open(self):
+        from tornado.websocket import websocket_connect
+
+        self._ws = await websocket_connect(self.url.replace("http", "ws", 1) + "/_stcore/stream",
+                                           subprotocols=["streamlit"], max_message_size=256 * 1024 ** 2)
+        await self.rerun("open page")
+        return self
+
+    def close(self):
+        if self._ws is not None:
+            self._ws.close()
+            self._ws = None
+
+    # ---------------------
+    # What's on the page
+    # ---------------------
+    def widget(self, kind, label):
+        """(proto, fragment id) of the first ``kind`` element ("button", "radio", ...) whose label contains ``label``"""
+        for element_kind, proto, fragment_id in self.elements.values():
+            if element_kind == kind and label.lower() in proto.label.lower():
+                return proto, fragment_id
+        raise LookupError(f"no {kind} labelled {label!r} on the page")
+
+    def texts(self):
+        """The markdown and alert bodies on the page, in page order"""
+        return [proto.body for kind, proto, _ in self.elements.values() if kind in ("markdown", "alert")]
+
+    # ---------------------
+    # Interactions
+    # ---------------------
+    def set_value(self, kind, label, value):
+        """Set a widget; the value goes with every later rerun, as a browser's does"""
+        from streamlit.proto.NumberInput_pb2 import NumberInput
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        proto, _ = self.widget(kind, label)
+        state = WidgetState(id=proto.id)
+        if kind == "radio":
+            state.int_value = list(proto.options).index(value)
+        elif kind == "text_input":
+            state.string_value = value
+        elif kind == "number_input" and proto.data_type == NumberInput.INT:
+            state.int_value = value
+        elif kind == "number_input":
+            state.double_value = value
+        elif kind == "checkbox":
+            state.bool_value = value
+        else:
+            raise ValueError(f"can't set a {kind}")
+        self._values[proto.id] = state
+
+    async def change(self, kind, label, value, action=None):
+        """Change a widget outside any form: the browser reruns straight away"""
+        _, fragment_id = self.widget(kind, label)
+        self.set_value(kind, label, value)
+        await self.rerun(action or f"set {label}", fragment_id=fragment_id)
+
+    async def click(self, action, label, values=()):
+        """Press a button or a form's submit button, first setting ``values``: (kind, label, value) triples"""
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        for kind, widget_label, value in values:
+            self.set_value(kind, widget_label, value)
+        button, fragment_id = self.widget("button", label)
+        await self.rerun(action, [WidgetState(id=button.id, trigger_value=True)], fragment_id)
+
+    async def rerun(self, action, triggers=(), fragment_id=""):
+        """Send one rerun request and wait for its last script run to finish"""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ClientState_pb2 import ClientState
+        from streamlit.proto.WidgetStates_pb2 import WidgetStates
+
+        live = {proto.id for _, proto, _ in self.elements.values() if getattr(proto, "id", "")}
+        states = WidgetStates()
+        states.widgets.extend(state for widget_id, state in self._values.items() if widget_id in live)
+        states.widgets.extend(triggers)
+        message = BackMsg(rerun_script=ClientState(widget_states=states, fragment_id=fragment_id))
+        full_runs, fragment_runs = self.full_runs, self.fragment_runs
+        start = time.perf_counter()
+        await self._ws.write_message(message.SerializeToString(), binary=True)
+        await asyncio.wait_for(self._read_runs(), self.timeout)
+        self.latencies.setdefault(action, []).append(time.perf_counter() - start)
+        self.runs.setdefault(action, []).append((self.full_runs - full_runs, self.fragment_runs - fragment_runs))
+
+    async def _read_runs(self):
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        seen, run_fragments, errors = set(), set(), []
+        while True:
+            message = await self._read()
+            kind = message.WhichOneof("type")
+            if kind == "new_session":
+                seen, run_fragments = set(), set(message.new_session.fragment_ids_this_run)
+                if run_fragments:
+                    self.fragment_runs += 1
+                else:
+                    self.full_runs += 1
+            elif kind == "delta":
+                self._apply(message, seen, errors)
+            elif kind == "script_finished" and message.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                # Elements this run didn't send again are stale; a fragment run only owns its own
+                for path, (_, _, fragment_id) in list(self.elements.items()):
+                    if path not in seen and (not run_fragments or fragment_id in run_fragments):
+                        del self.elements[path]
+                # A widget that leaves the page is forgotten; if it comes back, it has its default value
+                live = {getattr(proto, "id", None) for _, proto, _ in self.elements.values()}
+                self._values = {widget_id: state for widget_id, state in self._values.items() if widget_id in live}
+                if errors or message.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    raise RuntimeError(f"the app raised: {errors[0] if errors else 'a compile error'}")
+                return
+
+    async def _read(self):
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        payload = await self._ws.read_message()
+        if payload is None:
+            raise ConnectionError("the server closed the websocket")
+        message = ForwardMsg()
+        message.ParseFromString(payload)
+        if message.WhichOneof("type") == "ref_hash":
+            # A message this tab was sent before: fetched from the server's cache, like the browser does
+            from tornado.httpclient import AsyncHTTPClient
+
+            response = await AsyncHTTPClient().fetch(f"{self.url}/_stcore/message?hash={message.ref_hash}")
+            cached = ForwardMsg()
+            cached.ParseFromString(response.body)
+            cached.metadata.CopyFrom(message.metadata)
+            message = cached
+        return message
+
+    def _apply(self, message, seen, errors):
+        path = tuple(message.metadata.delta_path)
+        delta = message.delta
+        kind = delta.WhichOneof("type")
+        if kind == "new_element":
+            element_kind = delta.new_element.WhichOneof("type")
+            proto = getattr(delta.new_element, element_kind)
+            if element_kind == "exception":
+                errors.append(f"{proto.type}: {proto.message}")
+            self.elements[path] = (element_kind, proto, delta.fragment_id)
+        elif kind == "add_block":
+            self.elements[path] = ("block", delta.add_block, delta.fragment_id)
+        else:
+            return  # rows added to a chart or table already on the page
+        seen.add(path)
@@ -0,0 +1,175 @@
+"""Headless load test: many simulated students playing full games on one server.
+
+Starts one real ``streamlit run`` server per app. Every student connects to
+it as a browser tab over the app's websocket (benchmarks.live_server), and
+all the tabs run from one event loop. As in a classroom, the students share
+the server's process: its puzzle and guide caches, its script threads and
+its memory. They also share the SQLite leaderboard. Each student enters a
+name, generates plots, and submits guesses round after round until the
+configured number of games is done.
+
+The report covers, per app:
+- rerun latency percentiles for each kind of interaction, from sending the
+  request to the end of its last script run
+- the server's RSS after one warm-up game, its peak under load, and the
+  peak growth per student
+- throughput in finished games per minute, from the moment all students start
+
+The tabs' protobuf parsing runs in this process, so at high student counts
+this process competes with the server for cores. Scores go to a throwaway
+leaderboard, never to the real one.
+
+    python -m benchmarks.load_test --students 20 --games 2
+    python -m benchmarks.load_test --apps Correlationupdate.py --students 50
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APPS = ["Correlation.py", "Correlation_Code.py", "Correlationupdate.py", "R_squared.py"]
+PERCENTILES = (50, 90, 99)
+
+
+# ---------------------
+# One full game per app, played in a live_server.Browser tab
+# ---------------------
+async def enter_name(tab, name):
+    await tab.change("text_input", "name", name, "enter name")
+
+
+async def play_correlation(tab, rng, name):
+    await enter_name(tab, name)
+    for _ in range(5):
+        await tab.click("generate plot", "Generate")
+        guess = round(rng.uniform(-1, 1), 2)
+        await tab.click("submit guess", "Submit", [("number_input", "guess", guess)])
+
+
+async def play_correlation_code(tab, rng, name):
+    await enter_name(tab, name)
+    for _ in range(5):
+        direction = rng.choice(["Positive", "Negative", "No Correlation"])
+        await tab.click("submit direction", "Submit Direction", [("radio", "direction", direction)])
+        guess = f"{rng.uniform(-1, 1):.2f}"
+        await tab.click("submit guess", "Submit Correlation", [("text_input", "guess", guess)])
+
+
+async def play_correlationupdate(tab, rng, name):
+    await enter_name(tab, name)
+    await tab.click("generate plot", "Generate")  # later rounds load with "Next Round"
+    for _ in range(6):
+        options = list(tab.widget("radio", "Choose")[0].options)
+        await tab.click("submit guess", "submit your awesome", [("radio", "Choose", rng.choice(options))])
+        await tab.click("next round", "Next Round")
+    await tab.click("new game", "Start New Game")
+
+
+async def play_r_squared(tab, rng, name):
+    await enter_name(tab, name)
+    for _ in range(5):
+        await tab.click("generate plot", "Generate")
+        guess = f"{rng.uniform(0, 1):.2f}"
+        await tab.click("submit guess", "Submit", [("text_input", "guess", guess)])
+
+
+PLAYERS = {
+    "Correlation.py": play_correlation,
+    "Correlation_Code.py": play_correlation_code,
+    "Correlationupdate.py": play_correlationupdate,
+    "R_squared.py": play_r_squared,
+}
+
+
+# ---------------------
+# Load test
+# ---------------------
+async def run_class(url, app, students, games, timeout):
+    """Open every student's tab, then play all games at once; returns (tabs, start, end)"""
+    from benchmarks.live_server import Browser
+
+    tabs = [await Browser(url, timeout).open() for _ in range(students)]
+
+    async def play(index, tab):
+        rng = random.Random(index)
+        for _ in range(games):
+            await PLAYERS[app](tab, rng, f"Student {index:03d}")
+
+    started = time.time()
+    try:
+        await asyncio.gather(*(play(index, tab) for index, tab in enumerate(tabs)))
+    finally:
+        for tab in tabs:
+            tab.close()
+    return tabs, started, time.time()
+
+
+def load_test(app, students, games, timeout):
+    from benchmarks.live_server import Browser, serve
+
+    async def warm_up(url):
+        # One game first, so the baseline already holds the app's lazy imports and warm caches
+        tab = await Browser(url, timeout).open()
+        await PLAYERS[app](tab, random.Random(-1), "Warm Up")
+        tab.close()
+
+    with serve(app) as server:
+        asyncio.run(warm_up(server.url))
+        loaded_rss = server.memory_mb()[0]
+        tabs, started, ended = asyncio.run(run_class(server.url, app, students, games, timeout))
+        peak_rss = server.memory_mb()[1]
+
+    latencies = {}
+    for tab in tabs:
+        for kind, samples in tab.latencies.items():
+            if kind != "open page":
+                latencies.setdefault(kind, []).extend(samples)
+    return latencies, ended - started, (loaded_rss, peak_rss)
+
+
+def report(app, latencies, elapsed, rss, students, games_played):
+    loaded_rss, peak_rss = rss
+    print(f"\n{app}: {games_played} games in {elapsed:.1f}s -> {games_played / elapsed * 60:.1f} games/min")
+    print(f"  server RSS {loaded_rss:.0f} MB after warm-up, {peak_rss:.0f} MB peak with {students} students "
+          f"-> {(peak_rss - loaded_rss) / students:.1f} MB per student")
+    header = "".join(f"{f'p{p}':>9}" for p in PERCENTILES)
+    print(f"  {'interaction':<18}{'reruns':>7}{header}{'max':>9}")
+    everything = []
+    for kind, samples in latencies.items():
+        everything.extend(samples)
+        print(f"  {kind:<18}{len(samples):>7}{_row(samples)}")
+    print(f"  {'all':<18}{len(everything):>7}{_row(everything)}")
+
+
+def _row(samples):
+    ms = np.asarray(samples) * 1e3
+    return "".join(f"{v:>7.0f}ms" for v in np.percentile(ms, PERCENTILES)) + f"{ms.max():>7.0f}ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--apps", nargs="+", default=APPS, choices=APPS)
+    parser.add_argument("--students", type=int, default=10, help="concurrent sessions per app")
+    parser.add_argument("--games", type=int, default=1, help="games each student plays")
+    parser.add_argument("--timeout", type=float, default=120, help="seconds a single rerun may take")
+    args = parser.parse_args()
+
+    # Students' scores go to a scratch leaderboard; the server inherits this environment
+    db_dir = tempfile.mkdtemp(prefix="challenger_load_")
+    os.environ["CHALLENGER_LEADERBOARD_DB"] = os.path.join(db_dir, "leaderboard.sqlite3")
+    sys.path.insert(0, REPO_ROOT)
+
+    print(f"{args.students} students x {args.games} game(s) per app on one server, {os.cpu_count()} CPUs")
+    for app in args.apps:
+        latencies, elapsed, rss = load_test(app, args.students, args.games, args.timeout)
+        report(app, latencies, elapsed, rss, args.students, args.students * args.games)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Concurrent render stress test: many sessions drawing round plots at once, without pyplot.
+
+Every thread plays one session: it keeps its own RoundFigure, as the apps
+keep one in session state, and renders a sequence of rounds to PNG with
+render_png, each with its own colour, title and points. The same sequences
+are rendered serially first. Under concurrency every PNG has to match its
+serial twin byte for byte. A mismatch would mean that shared matplotlib
+state leaked between figures, for example a title, a colour or points from
+another session.
+
+    python -m benchmarks.stress_render --threads 32 --rounds 8
+"""
+import argparse
+import hashlib
+import sys
+import threading
+import time
+import warnings
+
+from render import render_png
+from round_figure import RoundFigure
+from seeding import make_rng
+
+COLORS = ["#FF6B6B", "#4ECDC4", "#45B7D1", "#96CEB4", "#FFEAA7", "#DDA0DD", "orange", "skyblue"]
+
+
+def session_renders(session, rounds, points, dpi, start_gate=None):
+    """Digests of one session's rounds, rendered in order on its own figure."""
+    round_fig = RoundFigure(c=COLORS[session % len(COLORS)], edgecolors="black")
+    if start_gate is not None:
+        start_gate.wait()
+    digests = []
+    for round_index in range(rounds):
+        rng = make_rng([session, round_index])
+        round_fig.set_data(rng.uniform(size=points), rng.uniform(size=points))
+        round_fig.set_title(f"Session {session}, round {round_index + 1}")
+        digests.append(hashlib.sha1(render_png(round_fig.fig, dpi)).hexdigest())
+    round_fig.close()
+    return digests
+
+
+def concurrent(threads, rounds, points, dpi):
+    results = [None] * threads
+    errors = []
+    start_gate = threading.Barrier(threads)
+
+    def run(session):
+        try:
+            results[session] = session_renders(session, rounds, points, dpi, start_gate)
+        except Exception as error:  # reported below; one failing thread must not hide the others
+            errors.append((session, error))
+
+    workers = [threading.Thread(target=run, args=(session,)) for session in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return results, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=32, help="concurrent sessions")
+    parser.add_argument("--rounds", type=int, default=8, help="renders per session")
+    parser.add_argument("--points", type=int, default=100)
+    parser.add_argument("--dpi", type=int, default=100)
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore", message="Glyph")
+
+    renders = args.threads * args.rounds
+    print(f"{args.threads} sessions x {args.rounds} rounds, {args.points} points at {args.dpi} dpi")
+
+    start = time.perf_counter()
+    expected = [session_renders(session, args.rounds, args.points, args.dpi) for session in range(args.threads)]
+    serial = time.perf_counter() - start
+    print(f"  serial      {serial:6.2f}s  {renders / serial:6.1f} renders/s")
+
+    start = time.perf_counter()
+    results, errors = concurrent(args.threads, args.rounds, args.points, args.dpi)
+    parallel = time.perf_counter() - start
+    print(f"  concurrent  {parallel:6.2f}s  {renders / parallel:6.1f} renders/s")
+
+    for session, error in errors:
+        print(f"  session {session} raised {error!r}")
+    mismatches = sum(
+        got != want
+        for session, digests in enumerate(results) if digests is not None
+        for got, want in zip(digests, expected[session])
+    )
+    if errors or mismatches:
+        print(f"\nFAILED: {mismatches} of {renders} PNGs differ from their serial render, "
+              f"{len(errors)} session(s) raised")
+        sys.exit(1)
+    print(f"\nall {renders} PNGs match their serial render byte for byte")
+
+
+if __name__ == "__main__":
+    main()
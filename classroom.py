@@ -0,0 +1,63 @@
+import threading
+from collections import namedtuple
+
+from plot_backend import snapshot
+from puzzles import get_puzzle_cache
+from singleton import process_singleton
+
+ClassRound = namedtuple("ClassRound", ["number", "puzzle", "r", "plot"])
+
+
+class Classroom:
+    """Class-wide rounds: one shared puzzle per game, shown to every student session.
+
+    ``start_round`` (the instructor) builds the points and renders the plot
+    once; a student's rerun only reads ``current`` and shows the stored
+    snapshot. Guesses for the live round are kept so the instructor panel can
+    show how the class is doing.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rounds = {}  # game -> ClassRound
+        self._guesses = {}  # game -> {student: score} for the live round
+
+    def start_round(self, game, puzzle, build):
+        """Make ``puzzle`` the live round of ``game``; ``build(puzzle, x, y)`` returns its plot."""
+        x, y, r = get_puzzle_cache().get(puzzle)
+        plot = snapshot(build(puzzle, x, y))
+        with self._lock:
+            previous = self._rounds.get(game)
+            class_round = ClassRound(previous.number + 1 if previous else 1, puzzle, r, plot)
+            self._rounds[game] = class_round
+            self._guesses[game] = {}
+        return class_round
+
+    def current(self, game):
+        with self._lock:
+            return self._rounds.get(game)
+
+    def stop(self, game):
+        with self._lock:
+            self._rounds.pop(game, None)
+            self._guesses.pop(game, None)
+
+    def submit(self, game, number, student, score):
+        """Record a student's score for round ``number``; False if that round is no longer live."""
+        with self._lock:
+            class_round = self._rounds.get(game)
+            if class_round is None or class_round.number != number:
+                return False
+            self._guesses[game][student] = score
+            return True
+
+    def results(self, game):
+        """(answers, mean score) for the live round of ``game``."""
+        with self._lock:
+            scores = list(self._guesses.get(game, {}).values())
+        return len(scores), sum(scores) / len(scores) if scores else 0.0
+
+
+@process_singleton
+def get_classroom():
+    return Classroom()
@@ -0,0 +1,70 @@
+import streamlit as st
+
+from classroom import get_classroom
+from plot_backend import show_plot
+from puzzle_view import show_puzzle_code
+from timing_view import rerun
+
+# What students guess in a class round: (label, lowest, highest)
+ANSWERS = {
+    "r": ("correlation", -1.0, 1.0),
+    "r_squared": ("R²", 0.0, 1.0),
+}
+
+
+def show_class_round(game, class_round, answer="r"):
+    """Student view of a class-wide round: the shared plot, one guess, and its score."""
+    label, low, high = ANSWERS[answer]
+    actual = round(class_round.r ** 2 if answer == "r_squared" else class_round.r, 2)
+
+    st.write(f"👋 Hello **{st.session_state.student_name}** – 📣 Class round {class_round.number}")
+    show_plot(class_round.plot)
+    show_puzzle_code(class_round.puzzle)
+
+    answered = st.session_state.get("class_answer")
+    if answered is not None and answered[0] == (game, class_round.number):
+        _, guess, round_score = answered
+        st.markdown(f"**✅ Actual {label}:** `{actual:.2f}`")
+        st.markdown(f"**🎯 Your Guess:** `{guess:.2f}`")
+        st.markdown(f"**🏅 Score This Round:** `{round_score}/100` – class total `{st.session_state.class_score}`")
+    else:
+        with st.form("class_guess_form", border=False):
+            guess = st.number_input(f"What is your guess for the {label} ({low:g} to {high:g})?",
+                                    min_value=low, max_value=high, step=0.01, key=f"class_guess_{class_round.number}")
+            submitted = st.form_submit_button("✅ Submit Class Guess")
+        if submitted:
+            round_score = max(0, round((1 - abs(guess - actual)) * 100))
+            if get_classroom().submit(game, class_round.number, st.session_state.student_name, round_score):
+                st.session_state.class_answer = ((game, class_round.number), guess, round_score)
+                st.session_state.class_score = st.session_state.get("class_score", 0) + round_score
+            else:
+                st.session_state.class_answer = None  # the instructor moved on meanwhile
+            rerun()
+
+    st.button("🔄 Check for the next class round")
+
+
+def show_class_controls(game, new_puzzle, build):
+    """Instructor-panel controls that start, advance and end class mode for ``game``.
+
+    ``new_puzzle()`` returns the next round's Puzzle and ``build(puzzle, x, y)``
+    its plot, styled like the app's own round plot.
+    """
+    classroom = get_classroom()
+    class_round = classroom.current(game)
+    st.markdown("**📣 Class mode** – every student guesses the same plot, generated and rendered once")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("⏭️ Next class round" if class_round else "📣 Start class mode"):
+            classroom.start_round(game, new_puzzle(), build)
+            rerun()
+    with col2:
+        if class_round is not None and st.button("⏹️ End class mode"):
+            classroom.stop(game)
+            rerun()
+
+    if class_round is not None:
+        answers, mean_score = classroom.results(game)
+        st.caption(f"Class round {class_round.number} is live – actual r: {class_round.r:.2f}, "
+                   f"R²: {class_round.r ** 2:.2f}; {answers} answer(s), mean score {mean_score:.0f}/100")
@@ -0,0 +1,56 @@
+import numpy as np
+
+
+def pearson_r(x, y, sizes=None):
+    """Pearson correlation of x and y along the last axis.
+
+    Works on a single pair of 1-D arrays or on batches shaped (rounds, n). For
+    padded batches, ``sizes`` gives each row's real length and the padding is
+    ignored. Sums are taken on mean-centered data, which keeps the result
+    within ~1e-15 of scipy.stats.pearsonr without its p-value work.
+    """
+    _, _, sxx, syy, sxy = _centered_sums(x, y, sizes)
+    return np.clip(sxy / np.sqrt(sxx * syy), -1.0, 1.0)
+
+
+def r_squared(x, y, sizes=None):
+    """Coefficient of determination of the least-squares line (r squared)."""
+    return pearson_r(x, y, sizes) ** 2
+
+
+def linear_fit(x, y, sizes=None):
+    """Slope and intercept of the least-squares line of y on x."""
+    x_mean, y_mean, sxx, _, sxy = _centered_sums(x, y, sizes)
+    slope = sxy / sxx
+    return slope, y_mean - slope * x_mean
+
+
+def slope(x, y, sizes=None):
+    return linear_fit(x, y, sizes)[0]
+
+
+def intercept(x, y, sizes=None):
+    return linear_fit(x, y, sizes)[1]
+
+
+def _centered_sums(x, y, sizes):
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if sizes is None:
+        x_mean = x.mean(axis=-1)
+        y_mean = y.mean(axis=-1)
+        xc = x - x_mean[..., np.newaxis]
+        yc = y - y_mean[..., np.newaxis]
+    else:
+        mask = np.arange(x.shape[-1]) < np.asarray(sizes)[..., np.newaxis]
+        counts = mask.sum(axis=-1)
+        x = np.where(mask, x, 0.0)
+        y = np.where(mask, y, 0.0)
+        x_mean = x.sum(axis=-1) / counts
+        y_mean = y.sum(axis=-1) / counts
+        xc = np.where(mask, x - x_mean[..., np.newaxis], 0.0)
+        yc = np.where(mask, y - y_mean[..., np.newaxis], 0.0)
+    sxx = np.einsum("...i,...i->...", xc, xc)
+    syy = np.einsum("...i,...i->...", yc, yc)
+    sxy = np.einsum("...i,...i->...", xc, yc)
+    return x_mean, y_mean, sxx, syy, sxy
@@ -0,0 +1,51 @@
+import numpy as np
+
+
+def correlated_data(n, target_corr, x_range=(0.0, 1.0), y_range=(0.0, 1.0), rng=None):
+    """Generate x, y of length ``n`` whose sample correlation is ``target_corr``.
+
+    Built in one vectorized pass, with no retry loop: x is uniform, an independent
+    normal draw is made exactly orthogonal to x, and y is the standardized mix
+    ``r * x + sqrt(1 - r**2) * z``. Its Pearson r equals the target up to
+    floating-point rounding. Both variables are then mapped linearly onto
+    ``x_range`` / ``y_range``, which leaves r unchanged.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    x = rng.uniform(size=n)
+    z = rng.standard_normal(size=n)
+    return correlate(x, z, target_corr, x_range, y_range)
+
+
+def correlate(x, z, target_corr, x_range=(0.0, 1.0), y_range=(0.0, 1.0)):
+    """The construction behind ``correlated_data``, from draws already made: uniform ``x``, standard normal ``z``.
+
+    Also takes a stack of equal-size rounds shaped (rounds, n), with one
+    target and one (lo, hi) pair per round, and builds them all in one pass.
+    Up to 8192 points a stacked row is bit-identical to the same round built
+    alone; past that einsum sums in buffered chunks and the last bits differ.
+    """
+    x = x - x.mean(axis=-1, keepdims=True)
+    z = z - z.mean(axis=-1, keepdims=True)
+    # Remove the part of z that lies along x so the two are exactly uncorrelated
+    z = z - (_dot(z, x) / _dot(x, x)) * x
+    x = x / np.sqrt(_dot(x, x))
+    z = z / np.sqrt(_dot(z, z))
+
+    r = np.clip(np.asarray(target_corr, dtype=float), -1.0, 1.0)[..., np.newaxis]
+    y = r * x + np.sqrt(1.0 - r * r) * z
+    return _rescale(x, x_range), _rescale(y, y_range)
+
+
+def _dot(a, b):
+    return np.einsum("...i,...i->...", a, b)[..., np.newaxis]
+
+
+def _rescale(values, value_range):
+    """Map values linearly so that they span ``value_range`` exactly."""
+    value_range = np.asarray(value_range, dtype=float)
+    lo = values.min(axis=-1, keepdims=True)
+    hi = values.max(axis=-1, keepdims=True)
+    span = np.where(hi > lo, hi - lo, 1.0)
+    out_lo = value_range[..., 0, np.newaxis]
+    out_hi = value_range[..., 1, np.newaxis]
+    return out_lo + (values - lo) * ((out_hi - out_lo) / span)
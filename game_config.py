@@ -0,0 +1,170 @@
+import numpy as np
+
+from corrstats import pearson_r
+from datagen import correlated_data
+
+# ---------------------
+# Correlation_Code: difficulty levels for the transport scenarios
+# ---------------------
+# The scenarios themselves live in scenarios.json, loaded by scenario_catalog.py;
+# each has a stable id, a difficulty level, axis labels, a direction and a base_corr.
+
+# Difficulty settings for each round
+difficulty_settings = {
+    1: {"noise_factor": 0.1, "sample_size": 60, "label": "🟢 EASY"},
+    2: {"noise_factor": 0.3, "sample_size": 55, "label": "🟡 MEDIUM-EASY"},
+    3: {"noise_factor": 0.5, "sample_size": 50, "label": "🟠 MEDIUM"},
+    4: {"noise_factor": 0.7, "sample_size": 45, "label": "🔴 HARD"},
+    5: {"noise_factor": 0.9, "sample_size": 40, "label": "🟣 VERY HARD"}
+}
+
+
+# Default axis ranges for the transport scenarios (a scenario may set its own "x_range" / "y_range")
+SCENARIO_X_RANGE = (10, 100)
+SCENARIO_Y_RANGE = (0, 100)
+# The game's noise recipe, per unit of noise_factor: the noise on y (on "zero" scenarios, on
+# top of a spread around ZERO_Y_MEAN), and from EXTRA_NOISE_LEVEL on, extra noise on x and y
+NOISE_Y = 50
+ZERO_Y_MEAN, ZERO_Y_SPREAD, ZERO_NOISE_Y = 50, 15, 30
+EXTRA_NOISE_LEVEL = 4
+EXTRA_NOISE_X, EXTRA_NOISE_Y = 10, 15
+
+
+def round_target(scenario, difficulty, rng):
+    """Target correlation for one round of a scenario at a difficulty level.
+
+    The r of a cloud drawn with the game's noise recipe: y follows x at slope
+    |base_corr|, plus noise scaled by the level's noise_factor. Noisier levels
+    (and noisier scenarios) look noisier, as they always did; the round's data
+    then hits that r exactly.
+    """
+    settings = difficulty_settings[difficulty]
+    n, noise_factor = settings["sample_size"], settings["noise_factor"]
+    base_corr = scenario["base_corr"]
+    x = rng.uniform(*SCENARIO_X_RANGE, n)
+    if scenario["direction"] == "positive":
+        y = x * abs(base_corr) + rng.normal(0, noise_factor * NOISE_Y, n)
+    elif scenario["direction"] == "negative":
+        y = -x * abs(base_corr) + rng.normal(0, noise_factor * NOISE_Y, n)
+    else:
+        y = rng.normal(ZERO_Y_MEAN, ZERO_Y_SPREAD, n) + base_corr * x + rng.normal(0, noise_factor * ZERO_NOISE_Y, n)
+    if difficulty >= EXTRA_NOISE_LEVEL:
+        x = x + rng.normal(0, noise_factor * EXTRA_NOISE_X, n)
+        y = y + rng.normal(0, noise_factor * EXTRA_NOISE_Y, n)
+    return float(pearson_r(x, y))
+
+
+def generate_correlated_data(scenario, difficulty, rng, target=None):
+    """Generate data with controlled correlation and difficulty; ``target`` replaces the drawn round target"""
+    n = difficulty_settings[difficulty]["sample_size"]
+    if target is None:
+        target = round_target(scenario, difficulty, rng)
+    return correlated_data(n, target,
+                           scenario.get("x_range", SCENARIO_X_RANGE),
+                           scenario.get("y_range", SCENARIO_Y_RANGE), rng=rng)
+
+
+# Adaptive mode: each round's level and target follow the student's running error on the value guess
+ADAPTIVE_SMOOTHING = 0.5  # weight of the newest round in the running error
+ADAPTIVE_ERROR_SCALE = 0.5  # a running error this large (or larger) plays like a first round
+ADAPTIVE_R_RANGE = (0.3, 0.9)  # |target r| for the strongest students and for beginners
+ADAPTIVE_TOLERANCE = 0.05  # a round's r lands this close to its (jittered) target, banked or built
+ADAPTIVE_JITTER = 0.05  # spread of a round's target around the aimed r, so rounds at one skill differ
+
+
+def update_running_error(running_error, error):
+    """Exponentially weighted mean of a student's absolute errors; ``running_error`` is None before round 1"""
+    if running_error is None:
+        return error
+    return ADAPTIVE_SMOOTHING * error + (1 - ADAPTIVE_SMOOTHING) * running_error
+
+
+def adaptive_target(running_error, rng):
+    """(difficulty level, target r) for the next round: noisier levels and weaker correlations as the error drops.
+
+    The target ignores the level's scenarios; ScenarioCatalog.aim brings it within their reach.
+    """
+    skill = 0.0 if running_error is None else float(np.clip(1 - running_error / ADAPTIVE_ERROR_SCALE, 0, 1))
+    level = 1 + round(skill * (len(difficulty_settings) - 1))
+    weakest, strongest = ADAPTIVE_R_RANGE
+    return level, float(rng.choice([-1.0, 1.0])) * (strongest - skill * (strongest - weakest))
+
+
+# ---------------------
+# R_squared: transport scenarios with a random R² per round
+# ---------------------
+ROUND_POINTS = 100  # points per round in Correlation and R_squared
+R_SQUARED_NOISE = 10  # sd of the noise on y; "zero" scenarios scatter around ZERO_Y_MEAN by this much
+R_SQUARED_X_RANGE = (10, 100)
+R_SQUARED_Y_RANGE = (0, 100)
+r_squared_scenarios = [
+    {
+        "x_label": "Speed Limit (mph)",
+        "y_label": "Crash Count",
+        "direction": "positive"
+    },
+    {
+        "x_label": "Number of Vehicles",
+        "y_label": "Traffic Delay (min)",
+        "direction": "positive"
+    },
+    {
+        "x_label": "Public Transit Usage (%)",
+        "y_label": "Traffic Congestion Level",
+        "direction": "negative"
+    },
+    {
+        "x_label": "Road Width (m)",
+        "y_label": "Vehicle Throughput",
+        "direction": "positive"
+    },
+    {
+        "x_label": "Gas Prices ($/gallon)",
+        "y_label": "Vehicle Miles Traveled",
+        "direction": "negative"
+    }
+]
+
+
+def scenario_target(scenario, rng):
+    """Target correlation for one round of an R_squared scenario: the r of a cloud drawn with the game's noise"""
+    x = rng.uniform(*R_SQUARED_X_RANGE, ROUND_POINTS)
+    if scenario["direction"] == "positive":
+        y = x + rng.normal(0, R_SQUARED_NOISE, ROUND_POINTS)
+    elif scenario["direction"] == "negative":
+        y = -x + rng.normal(0, R_SQUARED_NOISE, ROUND_POINTS)
+    else:
+        y = rng.normal(ZERO_Y_MEAN, R_SQUARED_NOISE, ROUND_POINTS)
+    return float(pearson_r(x, y))
+
+
+# ---------------------
+# Correlationupdate: correlation structure for 6 rounds
+# ---------------------
+# Points per plot; big data rounds (over 5,000 points) are drawn as a density map
+POINTS_OPTIONS = [1000, 10_000, 100_000, 1_000_000]
+CORRELATION_STRUCTURE = [
+    {"type": "Strong Positive", "target": 0.95, "emoji": "🚀📈", "color": "#FF6B6B",
+     "desc": "Super Strong Upward Trend!"},
+    {"type": "Strong Negative", "target": -0.95, "emoji": "⚡📉", "color": "#4ECDC4",
+     "desc": "Super Strong Downward Trend!"},
+    {"type": "No Correlation", "target": 0.0, "emoji": "🌪️🔄", "color": "#45B7D1", "desc": "Random Chaos Mode!"},
+    {"type": "Strong Positive", "target": 0.90, "emoji": "🔥📈", "color": "#96CEB4", "desc": "Blazing Upward Pattern!"},
+    {"type": "Strong Negative", "target": -0.90, "emoji": "❄️📉", "color": "#FFEAA7", "desc": "Icy Downward Slide!"},
+    {"type": "No Correlation", "target": 0.0, "emoji": "🎲🔄", "color": "#DDA0DD", "desc": "Pure Randomness!"}
+]
+
+
+def get_actual_label(corr_val):
+    if corr_val >= 0.90:
+        return "High Positive Correlation"
+    elif 0.30 <= corr_val < 0.90:
+        return "Low Positive Correlation"
+    elif -0.30 < corr_val < 0.30:
+        return "No Correlation"
+    elif -0.90 < corr_val <= -0.30:
+        return "Low Negative Correlation"
+    elif corr_val <= -0.90:
+        return "High Negative Correlation"
+    else:
+        return "Uncategorized"
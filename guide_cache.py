@@ -0,0 +1,175 @@
+import functools
+import hashlib
+import importlib.metadata
+import os
+import tempfile
+import threading
+
+from cachetools import LRUCache
+
+from render import render_png
+from singleton import process_singleton
+
+# ---------------------
+# Cache settings
+# ---------------------
+GUIDE_DPI = 200  # same dpi as the round plots, so cached guides look identical
+GUIDE_VERSION = 2  # bump whenever a guide's data or styling changes; v2: guides drawn from seeded generators
+MEMORY_ENTRIES = 32
+DISK_DIR = os.path.join(tempfile.gettempdir(), "summer_challenger_guides")
+DISK_MAX_BYTES = 16 * 1024 * 1024
+
+
+class GuideImageCache:
+    """Two-tier (memory LRU + size-capped disk) cache of rendered guide PNGs.
+
+    Entries are keyed by (kind, style, dpi), plus GUIDE_VERSION and the
+    matplotlib version on disk. The disk tier outlives the process and is
+    shared by every checkout on the machine, so a PNG drawn by other code
+    must never be served. A miss calls ``render()``, which must return a
+    matplotlib figure; the figure is encoded to PNG and closed here.
+    """
+
+    def __init__(self, memory_entries=MEMORY_ENTRIES, disk_dir=DISK_DIR, disk_max_bytes=DISK_MAX_BYTES):
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._memory = LRUCache(maxsize=memory_entries)
+        self._lock = threading.Lock()
+        self._render_locks = {}  # key -> lock, so different guides can render at the same time
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, kind, style, dpi, render):
+        key = (kind, style, dpi)
+        with self._lock:
+            png = self._memory.get(key)
+            if png is not None:
+                self.memory_hits += 1
+                return png
+
+        # Only one thread renders a given guide; the others wait for it and then hit the cache
+        with self._lock:
+            render_lock = self._render_locks.setdefault(key, threading.Lock())
+        with render_lock:
+            with self._lock:
+                png = self._memory.get(key)
+                if png is not None:
+                    self.memory_hits += 1
+                    return png
+
+            png = self._read_disk(key)
+            if png is not None:
+                hit_kind = "disk"
+            else:
+                hit_kind = "miss"
+                png = figure_to_png(render(), dpi)
+                self._write_disk(key, png)
+
+            with self._lock:
+                self._memory[key] = png
+                if hit_kind == "disk":
+                    self.disk_hits += 1
+                else:
+                    self.misses += 1
+        return png
+
+    def stats(self):
+        disk_bytes = sum(size for _, size, _ in self._disk_entries())
+        with self._lock:
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "memory_entries": len(self._memory),
+                "disk_bytes": disk_bytes,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        for path, _, _ in self._disk_entries():
+            _remove_quietly(path)
+
+    # ---------------------
+    # Disk tier
+    # ---------------------
+    def _path(self, key):
+        digest = hashlib.sha1(repr(_version_key() + key).encode("utf-8")).hexdigest()
+        return os.path.join(self.disk_dir, f"{digest}.png")
+
+    def _read_disk(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                png = f.read()
+        except OSError:
+            return None
+        try:
+            os.utime(path)  # mtime doubles as the LRU clock for disk eviction
+        except OSError:
+            pass
+        return png
+
+    def _write_disk(self, key, png):
+        try:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            path = self._path(key)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(png)
+            os.replace(tmp_path, path)
+        except OSError:
+            return  # the disk tier is best effort; memory still serves the image
+        self._evict_disk()
+
+    def _disk_entries(self):
+        try:
+            names = os.listdir(self.disk_dir)
+        except OSError:
+            return []
+        entries = []
+        for name in names:
+            if not name.endswith(".png"):
+                continue
+            path = os.path.join(self.disk_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, st.st_size, st.st_mtime))
+        return entries
+
+    def _evict_disk(self):
+        entries = sorted(self._disk_entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.disk_max_bytes:
+                break
+            _remove_quietly(path)
+            total -= size
+
+
+def figure_to_png(fig, dpi):
+    """Encode a figure the same way st.pyplot does, then release it."""
+    png = render_png(fig, dpi)
+    fig.clear()
+    return png
+
+
+@functools.cache
+def _version_key():
+    """(GUIDE_VERSION, matplotlib version), read from package metadata so a disk hit doesn't import matplotlib"""
+    return GUIDE_VERSION, importlib.metadata.version("matplotlib")
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+@process_singleton
+def get_guide_cache():
+    return GuideImageCache()
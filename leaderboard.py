@@ -0,0 +1,135 @@
+import os
+import sqlite3
+import threading
+import time
+
+from scoreboard import RankedScoreboard
+from singleton import process_singleton
+
+# ---------------------
+# Leaderboard settings
+# ---------------------
+DB_PATH = os.environ.get("CHALLENGER_LEADERBOARD_DB",
+                         os.path.join(os.path.dirname(os.path.abspath(__file__)), "leaderboard.sqlite3"))
+TOP_N = 100  # rows shown on a scoreboard
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    game TEXT NOT NULL,
+    name TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    finished_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scores_by_game_score ON scores (game, score DESC, id);
+"""
+
+
+class Leaderboard:
+    """Finished games of every app, shared by all sessions and worker processes.
+
+    Backed by a local SQLite file in WAL mode, so readers never block the writer
+    and other processes see new scores as soon as they are committed. Reads are
+    served from an in-memory RankedScoreboard per game, loaded once and then
+    updated incrementally; commits made by other processes are picked up through
+    ``PRAGMA data_version``.
+    """
+
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._boards = {}
+        self._last_id = 0
+        self._data_version = self._read_data_version()
+
+    def record(self, game, name, score):
+        """Store a finished game and return its row id."""
+        with self._lock:
+            self._sync()
+            cur = self._conn.execute(
+                "INSERT INTO scores (game, name, score, finished_at) VALUES (?, ?, ?, ?)",
+                (game, name, int(score), time.time()),
+            )
+            row_id = cur.lastrowid
+            self._last_id = max(self._last_id, row_id)
+            if game in self._boards:
+                self._boards[game].append(row_id, name, int(score))
+            return row_id
+
+    def top(self, game, limit=TOP_N):
+        """The best ``limit`` (name, score) pairs, highest score first, earliest first on ties."""
+        with self._lock:
+            return self._board(game).top(limit)
+
+    def ranked(self, game, start, stop):
+        """(rank, name, score) rows for ranks ``start + 1`` to ``stop``, for paging."""
+        with self._lock:
+            return self._board(game).ranked(start, stop)
+
+    def rank(self, game, row_id):
+        """1-based rank of a recorded game, or None if it is not on the board."""
+        with self._lock:
+            board = self._board(game)
+            position = board.position_of(row_id)
+            return None if position is None else board.rank(position)
+
+    def count(self, game):
+        with self._lock:
+            return len(self._board(game))
+
+    def reset(self, game):
+        with self._lock:
+            self._conn.execute("DELETE FROM scores WHERE game = ?", (game,))
+            self._boards[game] = RankedScoreboard()
+
+    # ---------------------
+    # In-memory mirror (call with the lock held)
+    # ---------------------
+    def _board(self, game):
+        self._sync()
+        board = self._boards.get(game)
+        if board is None:
+            board = self._boards[game] = self._load(game)
+        return board
+
+    def _load(self, game):
+        board = RankedScoreboard()
+        rows = self._conn.execute("SELECT id, name, score FROM scores WHERE game = ? ORDER BY id", (game,))
+        for row_id, name, score in rows:
+            board.append(row_id, name, score)
+            self._last_id = max(self._last_id, row_id)
+        return board
+
+    def _read_data_version(self):
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _sync(self):
+        """Fold in rows committed by other processes since the last look."""
+        data_version = self._read_data_version()
+        if data_version == self._data_version:
+            return
+        self._data_version = data_version
+        rows = self._conn.execute("SELECT id, game, name, score FROM scores WHERE id > ? ORDER BY id",
+                                  (self._last_id,)).fetchall()
+        for row_id, game, name, score in rows:
+            self._last_id = row_id
+            if game in self._boards:
+                self._boards[game].append(row_id, name, score)
+        # Another process may have reset a game; rebuild any board that no longer matches
+        for game, board in list(self._boards.items()):
+            stored = self._conn.execute("SELECT COUNT(*) FROM scores WHERE game = ?", (game,)).fetchone()[0]
+            if stored != len(board):
+                self._boards[game] = self._load(game)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+@process_singleton
+def get_leaderboard():
+    return Leaderboard()
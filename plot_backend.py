@@ -0,0 +1,76 @@
+import os
+import threading
+
+import streamlit as st
+from cachetools import LRUCache
+
+from guide_cache import GUIDE_DPI, MEMORY_ENTRIES, get_guide_cache
+from render import render_png
+from round_chart import RoundChart
+from round_figure import RoundFigure
+
+# ---------------------
+# Plot backend settings
+# ---------------------
+MATPLOTLIB = "matplotlib"  # rendered to PNG on the server, without pyplot
+VEGA_LITE = "vega-lite"  # drawn in the browser from the point data
+PLOT_BACKEND = os.environ.get("CHALLENGER_PLOT_BACKEND", MATPLOTLIB)
+MAIN_WIDTH = 700  # px, the width of a centered Streamlit page
+GUIDE_WIDTH = 220  # px, one of three guide columns
+
+_guide_charts = LRUCache(maxsize=MEMORY_ENTRIES)
+_guide_charts_lock = threading.Lock()
+
+
+def new_plot(figsize=None, setup=None, chart_config=None, **scatter_kwargs):
+    """A scatter plot for the configured backend.
+
+    Both kinds share RoundFigure's methods. ``setup`` styles the matplotlib axes;
+    ``chart_config`` is the Vega-Lite equivalent and is merged over RoundChart's base config.
+    """
+    if PLOT_BACKEND == VEGA_LITE:
+        return RoundChart(figsize=figsize, chart_config=chart_config, **scatter_kwargs)
+    return RoundFigure(figsize=figsize, setup=setup, **scatter_kwargs)
+
+
+def snapshot(plot):
+    """A frozen copy of ``plot`` that show_plot can draw any number of times: PNG bytes, or the chart itself."""
+    if isinstance(plot, RoundChart):
+        return plot
+    png = render_png(plot.fig)
+    plot.close()
+    return png
+
+
+def show_plot(plot, container=st, width=MAIN_WIDTH):
+    if isinstance(plot, bytes):
+        container.image(plot, use_container_width=True)
+    elif isinstance(plot, RoundChart):
+        container.vega_lite_chart(plot.columns(), plot.spec(width), use_container_width=True, theme=None)
+    else:
+        container.image(render_png(plot.fig), use_container_width=True)
+
+
+def show_guide(container, kind, style, build):
+    """Show a guide example; ``build()`` returns a plot from ``new_plot`` with its data set.
+
+    Built once per process either way: as a PNG in the shared guide cache, or
+    as a chart kept here so random examples don't change on every rerun.
+    """
+    if PLOT_BACKEND != VEGA_LITE:
+        built = []  # keeps the RoundFigure, and so its figure, alive until it is encoded
+
+        def render():
+            built.append(build())
+            return built[-1].fig
+
+        png = get_guide_cache().get(kind, style, GUIDE_DPI, render)
+        container.image(png, use_container_width=True)
+        return
+
+    key = (kind, style)
+    with _guide_charts_lock:
+        chart = _guide_charts.get(key)
+        if chart is None:
+            chart = _guide_charts[key] = build()
+    show_plot(chart, container, GUIDE_WIDTH)
@@ -0,0 +1,152 @@
+import os
+import threading
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+from plot_backend import snapshot
+from puzzles import get_puzzle_cache
+from session_janitor import session_store
+from singleton import process_singleton
+
+# ---------------------
+# Pre-render settings
+# ---------------------
+WORKERS = int(os.environ.get("CHALLENGER_PRERENDER_WORKERS", "2"))  # 0 turns pre-rendering off
+QUEUE_SIZE = int(os.environ.get("CHALLENGER_PRERENDER_QUEUE", "32"))  # jobs queued or running, all sessions together
+JOB_TTL = 120  # seconds; a job still queued after this is dropped, its session has likely gone
+
+
+class Prerenderer:
+    """Process-wide pool that builds rounds before the student asks for them.
+
+    A job builds a puzzle's points (warming the shared puzzle cache) and its
+    plot, frozen with ``snapshot``, and returns the puzzle's r with it. At
+    most ``queue_size`` jobs are queued or running at once; past that,
+    ``submit`` refuses and the round is simply drawn in the foreground as
+    before. Jobs left queued for longer than ``ttl`` are skipped when a worker
+    reaches them, so the work of sessions that went away doesn't pile up.
+    With no workers, nothing is ever queued.
+    """
+
+    def __init__(self, workers=WORKERS, queue_size=QUEUE_SIZE, ttl=JOB_TTL):
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prerender") if workers else None
+        self._slots = threading.BoundedSemaphore(queue_size)
+        self._lock = threading.Lock()
+        self._counts = {"submitted": 0, "refused": 0, "expired": 0, "cancelled": 0, "used": 0}
+
+    def submit(self, puzzle, build):
+        """Future of ``puzzle``'s (snapshot(s) from ``build(puzzle, x, y)``, r), or None if the queue is full."""
+        if self._executor is None:
+            return None
+        if not self._slots.acquire(blocking=False):
+            self._count("refused")
+            return None
+        future = self._executor.submit(self._run, puzzle, build, time.monotonic() + self.ttl)
+        future.add_done_callback(self._done)  # also runs for a cancelled job, so its slot comes back
+        self._count("submitted")
+        return future
+
+    def _run(self, puzzle, build, deadline):
+        if time.monotonic() > deadline:
+            self._count("expired")
+            return None
+        x, y, r = get_puzzle_cache().get(puzzle)
+        plots = build(puzzle, x, y)
+        if isinstance(plots, tuple):
+            return tuple(snapshot(plot) for plot in plots), r
+        return snapshot(plots), r
+
+    def _done(self, future):
+        self._slots.release()
+        if future.cancelled():
+            self._count("cancelled")
+
+    def used(self):
+        """Count a job whose result a session showed."""
+        self._count("used")
+
+    def _count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counts)
+
+
+@process_singleton
+def get_prerenderer():
+    return Prerenderer()
+
+
+# ---------------------
+# Per-session jobs
+# ---------------------
+def prerender_round(puzzle, build):
+    """Start building the round this session will show next.
+
+    A session has at most one job; asking for another puzzle cancels the old
+    one if it hasn't started. ``build(puzzle, x, y)`` returns the round's plot
+    (or a tuple of plots) from ``new_plot``; it runs on a pool thread, so it
+    must not touch st.session_state.
+    """
+    store = session_store()
+    job = store.get("prerender_job")
+    if job is not None:
+        if job[0] == puzzle:
+            return
+        job[1].cancel()
+    future = get_prerenderer().submit(puzzle, build)
+    store["prerender_job"] = (puzzle, future) if future is not None else None
+
+
+def prerendered(puzzle):
+    """The snapshot(s) built in the background for ``puzzle``, or None to draw it in the foreground.
+
+    A job that is already running is waited for, since that is quicker than
+    starting over; one still queued is cancelled. The result is kept for the
+    session's later reruns of the same round.
+    """
+    store = session_store()
+    shown = store.get("prerender_shown")
+    if shown is not None and shown[0] == puzzle:
+        return shown[1]
+    job = store.get("prerender_job")
+    if job is None or job[0] != puzzle:
+        return None
+    store["prerender_job"] = None
+    future = job[1]
+    if future.cancel():
+        return None
+    try:
+        result = future.result()
+    except (CancelledError, Exception):  # CancelledError is a BaseException; either way, draw it here
+        return None
+    if result is None:
+        return None
+    get_prerenderer().used()
+    store["prerender_shown"] = (puzzle, *result)
+    return result[0]
+
+
+def prerendered_r(puzzle):
+    """``puzzle``'s r, kept with its background build so a ready round is shown without touching its data.
+
+    Collects the session's job for ``puzzle`` like ``prerendered``; a round
+    that had none is read from the shared puzzle cache.
+    """
+    prerendered(puzzle)
+    shown = session_store().get("prerender_shown")
+    if shown is not None and shown[0] == puzzle:
+        return shown[2]
+    return get_puzzle_cache().get(puzzle)[2]
+
+
+def cancel_prerender():
+    """Drop this session's job and kept result, e.g. when its game is over."""
+    store = session_store()
+    store.pop("prerender_shown", None)
+    job = store.pop("prerender_job", None)
+    if job is not None:
+        job[1].cancel()
@@ -0,0 +1,216 @@
+"""Pre-generated puzzle bank, memory-mapped and shared by every worker process.
+
+The build step draws ``--per-kind`` puzzles for every round kind the games
+deal (every Correlation_Code scenario and difficulty, every
+CORRELATION_STRUCTURE entry, ...), builds them once and writes:
+
+- ``puzzle_bank.npy``: one contiguous float64 array holding every puzzle's
+  x then y;
+- ``puzzle_bank.json``: the index, each puzzle's code, offset and true r.
+
+At run time the array is opened with ``np.load(mmap_mode="r")``, so a
+banked round is a pair of read-only slices of the page cache, shared by all
+processes on the machine instead of built and held by each of them.
+``new_puzzles`` deals rounds from the bank when it holds their kind, and
+``nearest`` finds the banked puzzle whose realized r is closest to a target.
+
+Bank puzzles are ordinary seeded Puzzles, so their codes replay the same
+points on a server without the bank.
+
+    python -m puzzle_bank --per-kind 50 --points 1000 10000
+"""
+import argparse
+import json
+import logging
+import os
+import time
+
+import numpy as np
+
+from game_config import CORRELATION_STRUCTURE, POINTS_OPTIONS, ROUND_POINTS, difficulty_settings, r_squared_scenarios
+from puzzles import GENERATOR_VERSION, Puzzle, build_puzzle
+from scenario_catalog import get_scenario_catalog
+from seeding import make_rng
+from singleton import process_singleton
+
+# ---------------------
+# Bank settings
+# ---------------------
+BANK_PATH = os.environ.get("CHALLENGER_PUZZLE_BANK",
+                           os.path.join(os.path.dirname(os.path.abspath(__file__)), "puzzle_bank.npy"))
+BANK_SEED = 20240601  # the bank's puzzles are drawn from this, so a rebuild writes the same bank
+PER_KIND = 50
+BANK_POINTS = (1000, 10_000)  # Correlationupdate point counts to bank; bigger rounds are built on demand
+
+_logger = logging.getLogger(__name__)
+
+
+def bank_kinds(points=BANK_POINTS):
+    """Every (game, scenario, difficulty, n) a game deals a round of, as passed to ``new_puzzles``"""
+    kinds = [("Correlation", None, None, ROUND_POINTS)]
+    kinds += [("Correlation_Code", scenario_id, level, settings["sample_size"])
+              for level, settings in difficulty_settings.items()
+              for scenario_id in get_scenario_catalog().ids(level)]
+    kinds += [("Correlationupdate", index, None, n) for n in points for index in range(len(CORRELATION_STRUCTURE))]
+    kinds += [("R_squared", index, None, ROUND_POINTS) for index in range(len(r_squared_scenarios))]
+    return kinds
+
+
+class RIndex:
+    """Puzzles sorted by their realized r, for nearest-r lookups in O(log n)."""
+
+    def __init__(self, puzzles, rs):
+        order = np.argsort(rs, kind="stable")
+        self.rs = np.asarray(rs, dtype=np.float64)[order]
+        self.puzzles = [puzzles[i] for i in order]
+
+    def __len__(self):
+        return len(self.puzzles)
+
+    def nearest(self, target, exclude=()):
+        """The puzzle whose r is closest to ``target``, skipping any in ``exclude``; None if all are"""
+        above = int(np.searchsorted(self.rs, target))
+        below = above - 1
+        while below >= 0 or above < len(self.rs):
+            if above >= len(self.rs) or (below >= 0 and target - self.rs[below] <= self.rs[above] - target):
+                puzzle = self.puzzles[below]
+                below -= 1
+            else:
+                puzzle = self.puzzles[above]
+                above += 1
+            if puzzle not in exclude:
+                return puzzle
+        return None
+
+
+class PuzzleBank:
+    """Read-only view of a bank written by ``write_bank``; empty if there is none.
+
+    A bank that can't be read is logged and left empty, and an entry that
+    doesn't parse is logged and skipped: rounds are then built on demand, as
+    without a bank. Entries aren't checked against the live scenario
+    catalog, which may have changed since the build; callers dealing a
+    banked round by its r (``nearest``) check its scenario themselves.
+    """
+
+    def __init__(self, path=BANK_PATH):
+        self.path = path
+        self._entries = {}  # Puzzle -> (x, y, r), x and y slices of the memory map
+        self._seeds = {}  # (game, scenario, difficulty, n) -> seeds of the banked puzzles
+        self._r_indexes = {}  # (game, difficulty, n) -> RIndex over every scenario
+        index_path = _index_path(path)
+        if not (os.path.exists(path) and os.path.exists(index_path)):
+            return
+        try:
+            with open(index_path) as f:
+                index = json.load(f)
+            if index["generator_version"] != GENERATOR_VERSION:
+                return  # drawn by another generator; building fresh is the only way to match the codes
+            values = np.load(path, mmap_mode="r")
+            if values.shape != (index["values"],):
+                return  # data and index are from different builds
+            entries = index["puzzles"]
+        except (OSError, ValueError, KeyError) as error:
+            _logger.warning("puzzle bank %s can't be read, serving without it: %s", path, error)
+            return
+        skipped = []
+        for entry in entries:
+            try:
+                code, offset, r = entry
+                puzzle = Puzzle.from_code(code, check=False)
+            except (ValueError, TypeError, AttributeError):
+                skipped.append(entry)
+                continue
+            n = puzzle.n
+            self._entries[puzzle] = (values[offset:offset + n], values[offset + n:offset + 2 * n], r)
+            self._seeds.setdefault(_kind(puzzle), []).append(puzzle.seed)
+        if skipped:
+            _logger.warning("puzzle bank %s: skipped %d entries that don't parse, e.g. %r",
+                            path, len(skipped), skipped[0])
+
+        by_level = {}
+        for puzzle, (_, _, r) in self._entries.items():
+            by_level.setdefault((puzzle.game, puzzle.difficulty, puzzle.n), []).append((puzzle, r))
+        for key, entries in by_level.items():
+            self._r_indexes[key] = RIndex(*zip(*entries))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def get(self, puzzle):
+        """(x, y, r) of a banked puzzle, or None"""
+        return self._entries.get(puzzle)
+
+    def seeds(self, game, scenario, difficulty, n):
+        """Seeds of the banked puzzles of one round kind (empty if there are none)"""
+        return self._seeds.get((game, scenario, difficulty, n), [])
+
+    def nearest(self, game, difficulty, n, target, exclude=()):
+        """The banked puzzle of any scenario with this difficulty and n whose r is closest to ``target``, or None"""
+        r_index = self._r_indexes.get((game, difficulty, n))
+        return r_index.nearest(target, exclude) if r_index is not None else None
+
+
+def _kind(puzzle):
+    return puzzle.game, puzzle.scenario, puzzle.difficulty, puzzle.n
+
+
+def _index_path(path):
+    return os.path.splitext(path)[0] + ".json"
+
+
+@process_singleton
+def get_puzzle_bank():
+    """The process's puzzle bank, opened on first use"""
+    return PuzzleBank()
+
+
+# ---------------------
+# Build step
+# ---------------------
+def write_bank(path=BANK_PATH, per_kind=PER_KIND, points=BANK_POINTS):
+    """Build ``per_kind`` puzzles of every bank kind and write the data and index files; returns the puzzles"""
+    rng = make_rng(BANK_SEED)
+    puzzles = [Puzzle(game, GENERATOR_VERSION, int(seed), scenario, difficulty, n)
+               for game, scenario, difficulty, n in bank_kinds(points)
+               for seed in rng.integers(2 ** 63, size=per_kind)]
+    offsets = np.cumsum([0] + [2 * puzzle.n for puzzle in puzzles])
+
+    # Written under temporary names and then swapped in, so running servers never map half a bank
+    data_tmp, index_tmp = f"{path}.tmp", f"{_index_path(path)}.tmp"
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    values = np.lib.format.open_memmap(data_tmp, mode="w+", dtype=np.float64, shape=(int(offsets[-1]),))
+    index = []
+    for puzzle, offset in zip(puzzles, offsets):
+        x, y, r = build_puzzle(puzzle)
+        values[offset:offset + puzzle.n] = x
+        values[offset + puzzle.n:offset + 2 * puzzle.n] = y
+        index.append((puzzle.code(), int(offset), r))
+    values.flush()
+    del values
+    with open(index_tmp, "w") as f:
+        json.dump({"generator_version": GENERATOR_VERSION, "values": int(offsets[-1]), "puzzles": index}, f)
+    os.replace(data_tmp, path)
+    os.replace(index_tmp, _index_path(path))
+    return puzzles
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the memory-mapped puzzle bank.")
+    parser.add_argument("--per-kind", type=int, default=PER_KIND, help="puzzles per round kind")
+    parser.add_argument("--points", type=int, nargs="+", default=list(BANK_POINTS), choices=POINTS_OPTIONS,
+                        help="Correlationupdate point counts to bank")
+    parser.add_argument("--out", default=BANK_PATH)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    puzzles = write_bank(args.out, args.per_kind, tuple(args.points))
+    print(f"{len(puzzles)} puzzles of {len(bank_kinds(args.points))} kinds, "
+          f"{os.path.getsize(args.out) / 1024 ** 2:.1f} MB, in {time.perf_counter() - start:.1f}s -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import streamlit as st
+
+from plot_backend import new_plot, show_plot
+from prerender import get_prerenderer
+from puzzle_bank import get_puzzle_bank
+from puzzles import Puzzle, get_puzzle_cache
+
+
+def show_puzzle_code(puzzle):
+    """Caption under a round's plot; the code lets an instructor redraw exactly this round."""
+    st.caption(f"🧩 Puzzle code: `{puzzle.code()}`")
+
+
+def show_replay():
+    """Instructor-panel box that redraws a round from the puzzle code shown under its plot."""
+    code = st.text_input("🧩 Replay a puzzle code", placeholder="e.g. Correlation.3.5f3a…", key="replay_code")
+    if code:
+        try:
+            puzzle = Puzzle.from_code(code)
+            x, y, r = get_puzzle_cache().get(puzzle)
+        except (ValueError, LookupError) as error:
+            st.error(f"❗ Can't replay that code: {error}")
+        else:
+            plot = new_plot(c='orange', edgecolors='black')
+            plot.set_data(x, y)
+            plot.set_title(f"{puzzle.game} puzzle, {puzzle.n} points")
+            show_plot(plot)
+            st.markdown(f"**Actual r:** `{r:.4f}` · **Actual R²:** `{r * r:.4f}`")
+
+    stats = get_puzzle_cache().stats()
+    st.caption(f"🧩 Puzzle cache – hits: {stats['hits']}, misses: {stats['misses']}, "
+               f"entries: {stats['entries']}, {stats['bytes'] / 1024 ** 2:.1f} MB; "
+               f"puzzle bank – {len(get_puzzle_bank())} puzzles, hits: {stats['bank_hits']}")
+    stats = get_prerenderer().stats()
+    st.caption(f"🖼️ Pre-rendered rounds – queued: {stats['submitted']}, shown: {stats['used']}, "
+               f"cancelled: {stats['cancelled']}, expired: {stats['expired']}, refused (queue full): {stats['refused']}")
@@ -0,0 +1,310 @@
+import threading
+from collections import namedtuple
+
+import numpy as np
+from cachetools import LRUCache
+
+from corrstats import pearson_r
+from datagen import correlate
+from game_config import (CORRELATION_STRUCTURE, POINTS_OPTIONS, R_SQUARED_X_RANGE, R_SQUARED_Y_RANGE, ROUND_POINTS,
+                         SCENARIO_X_RANGE, SCENARIO_Y_RANGE, difficulty_settings, r_squared_scenarios, round_target,
+                         scenario_target)
+from scenario_catalog import get_scenario_catalog
+from seeding import make_rng
+from singleton import process_singleton
+
+# ---------------------
+# Puzzle settings
+# ---------------------
+GENERATOR_VERSION = 3  # bump whenever an existing descriptor would draw different points
+CACHE_BYTES = 64 * 1024 * 1024  # materialized rounds kept for all sessions together
+BATCH_POINTS = 1000  # rounds up to this size are built stacked with the rest of their game (see build_puzzles)
+UNIT_RANGE = (0.0, 1.0)
+AIMED_R_LIMIT = 0.95  # an aimed round's target r is drawn uniformly from [-AIMED_R_LIMIT, AIMED_R_LIMIT]
+AIMED_MARK = "a"  # last field of an aimed round's code
+
+
+class Puzzle(namedtuple("Puzzle", ["game", "version", "seed", "scenario", "difficulty", "n", "aimed"],
+                        defaults=(False,))):
+    """One round as a handful of ints: enough to redraw exactly the points a student saw.
+
+    ``scenario`` and ``difficulty`` are read by the game's builder below and
+    are None where a game has no such choice. ``aimed`` marks rounds whose
+    target r is drawn from their seed (Correlation_Code's adaptive mode, see
+    aimed_puzzle); their codes end in ".a". The target itself is never part
+    of a code, since the code is shown under the plot.
+    """
+
+    __slots__ = ()
+
+    def code(self):
+        """Short text form, shown under the plot and pasted into the instructor's replay box"""
+        fields = (self.game, self.version, f"{self.seed:x}", self.scenario, self.difficulty, self.n)
+        if self.aimed:
+            fields += (AIMED_MARK,)
+        return ".".join("-" if field is None else str(field) for field in fields)
+
+    @classmethod
+    def from_code(cls, code, check=True):
+        """Parse a code; raises ValueError unless it describes a round its game actually deals.
+
+        ``check=False`` only parses, for codes this server wrote itself (the
+        puzzle bank's index): checking reads the live scenario catalog.
+        """
+        parts = code.strip().strip("`").split(".")
+        if len(parts) not in (len(cls._fields) - 1, len(cls._fields)) or parts[0] not in BUILDERS:
+            raise ValueError(f"{code!r} is not a puzzle code")
+        if len(parts) == len(cls._fields) and parts[6] != AIMED_MARK:
+            raise ValueError(f"{code!r} is not a puzzle code")
+        game, version, seed, scenario, difficulty, n = parts[:6]
+        puzzle = cls(game, int(version), int(seed, 16), _optional_int(scenario), _optional_int(difficulty), int(n),
+                     len(parts) == len(cls._fields))
+        problem = CHECKS[game](puzzle) if check else None
+        if problem:
+            raise ValueError(f"{code!r}: {game} {problem}")
+        return puzzle
+
+
+def _optional_int(text):
+    return None if text == "-" else int(text)
+
+
+# ---------------------
+# Builders: each game's round as (target r, x range, y range), drawing what it
+# needs from the puzzle's generator; build_puzzle then draws the points
+# ---------------------
+def _build_correlation(puzzle, rng):
+    return rng.uniform(-1, 1), UNIT_RANGE, UNIT_RANGE
+
+
+def _build_correlation_code(puzzle, rng):
+    scenario = get_scenario_catalog().scenario(puzzle.scenario)  # a catalog id, not a position
+    target = _aimed_target(rng) if puzzle.aimed else round_target(scenario, puzzle.difficulty, rng)
+    return target, scenario.get("x_range", SCENARIO_X_RANGE), scenario.get("y_range", SCENARIO_Y_RANGE)
+
+
+def _aimed_target(rng):
+    """An aimed round's target r: the first draw from its seed"""
+    return rng.uniform(-AIMED_R_LIMIT, AIMED_R_LIMIT)
+
+
+def _build_correlationupdate(puzzle, rng):
+    return CORRELATION_STRUCTURE[puzzle.scenario]["target"], UNIT_RANGE, UNIT_RANGE
+
+
+def _build_r_squared(puzzle, rng):
+    return scenario_target(r_squared_scenarios[puzzle.scenario], rng), R_SQUARED_X_RANGE, R_SQUARED_Y_RANGE
+
+
+BUILDERS = {
+    "Correlation": _build_correlation,
+    "Correlation_Code": _build_correlation_code,
+    "Correlationupdate": _build_correlationupdate,
+    "R_squared": _build_r_squared,
+}
+
+
+# ---------------------
+# Checks: the rounds each game deals, so a pasted code can't ask for anything else
+# (say, a scenario the builder would index with None, or a billion points)
+# ---------------------
+def _check_correlation(puzzle):
+    if puzzle.scenario is not None or puzzle.difficulty is not None or puzzle.aimed:
+        return "rounds have no scenario or difficulty and aren't aimed"
+    if puzzle.n != ROUND_POINTS:
+        return f"rounds have {ROUND_POINTS} points"
+
+
+def _check_correlation_code(puzzle):
+    if puzzle.difficulty not in difficulty_settings:
+        return f"difficulty must be one of {list(difficulty_settings)}"
+    if puzzle.scenario not in get_scenario_catalog():
+        return f"has no scenario {puzzle.scenario}"
+    if puzzle.n != difficulty_settings[puzzle.difficulty]["sample_size"]:
+        return f"level {puzzle.difficulty} rounds have {difficulty_settings[puzzle.difficulty]['sample_size']} points"
+
+
+def _check_correlationupdate(puzzle):
+    if puzzle.scenario not in range(len(CORRELATION_STRUCTURE)):
+        return f"scenario must be 0 to {len(CORRELATION_STRUCTURE) - 1}"
+    if puzzle.difficulty is not None or puzzle.aimed:
+        return "rounds have no difficulty and aren't aimed"
+    if puzzle.n not in POINTS_OPTIONS:
+        return f"rounds have one of {POINTS_OPTIONS} points"
+
+
+def _check_r_squared(puzzle):
+    if puzzle.scenario not in range(len(r_squared_scenarios)):
+        return f"scenario must be 0 to {len(r_squared_scenarios) - 1}"
+    if puzzle.difficulty is not None or puzzle.aimed:
+        return "rounds have no difficulty and aren't aimed"
+    if puzzle.n != ROUND_POINTS:
+        return f"rounds have {ROUND_POINTS} points"
+
+
+CHECKS = {
+    "Correlation": _check_correlation,
+    "Correlation_Code": _check_correlation_code,
+    "Correlationupdate": _check_correlationupdate,
+    "R_squared": _check_r_squared,
+}
+
+
+def new_puzzles(game, rng, rounds):
+    """One Puzzle per (scenario, difficulty, n) in ``rounds``, each with its own seed drawn from ``rng``.
+
+    Rounds of a kind the puzzle bank holds are dealt from the bank instead,
+    without repeats within one call while the bank has enough of them.
+    """
+    from puzzle_bank import get_puzzle_bank  # deferred: puzzle_bank imports this module
+
+    bank = get_puzzle_bank()
+    seeds = [int(seed) for seed in rng.integers(2 ** 63, size=len(rounds))]
+    dealt = {}  # round kind -> iterator over its banked seeds, shuffled
+    for i, (scenario, difficulty, n) in enumerate(rounds):
+        kind = (game, scenario, difficulty, n)
+        if kind not in dealt:
+            banked = bank.seeds(*kind)
+            dealt[kind] = iter(rng.permutation(banked).tolist()) if banked else iter(())
+        seeds[i] = next(dealt[kind], seeds[i])
+    return [Puzzle(game, GENERATOR_VERSION, seed, scenario, difficulty, n)
+            for seed, (scenario, difficulty, n) in zip(seeds, rounds)]
+
+
+def aimed_puzzle(game, rng, scenario, difficulty, n, target, tolerance):
+    """An aimed Puzzle whose points have a correlation within ``tolerance`` of ``target``.
+
+    Seeds are drawn from ``rng`` until one whose own target draw lands close
+    enough, so the round's r follows from its seed alone and its code gives
+    nothing away. About ``AIMED_R_LIMIT / tolerance`` seeds are tried.
+    """
+    target = min(max(target, -AIMED_R_LIMIT), AIMED_R_LIMIT)
+    while True:
+        seed = int(rng.integers(2 ** 63))
+        if abs(_aimed_target(make_rng(seed)) - target) <= tolerance:
+            return Puzzle(game, GENERATOR_VERSION, seed, scenario, difficulty, n, aimed=True)
+
+
+def build_puzzle(puzzle):
+    """Draw a puzzle's points; returns read-only x and y and their Pearson r"""
+    x, z, target, x_range, y_range = _draws(puzzle)
+    return _entry(*correlate(x, z, target, x_range, y_range))
+
+
+def build_puzzles(puzzles):
+    """``build_puzzle`` for several puzzles, in order.
+
+    Rounds of one size up to BATCH_POINTS are stacked and built in one pass
+    (datagen.correlate), their r in one batched reduction; the points are
+    bit-identical to building each alone. Bigger rounds are built one by one.
+    """
+    by_size = {}
+    for index, puzzle in enumerate(puzzles):
+        by_size.setdefault(puzzle.n if puzzle.n <= BATCH_POINTS else -1 - index, []).append(index)
+    entries = [None] * len(puzzles)
+    for indexes in by_size.values():
+        if len(indexes) == 1:
+            entries[indexes[0]] = build_puzzle(puzzles[indexes[0]])
+            continue
+        x, z, targets, x_ranges, y_ranges = zip(*(_draws(puzzles[index]) for index in indexes))
+        xs, ys = correlate(np.stack(x), np.stack(z), np.asarray(targets), np.asarray(x_ranges, dtype=float),
+                           np.asarray(y_ranges, dtype=float))
+        rs = pearson_r(xs, ys)
+        for row, index in enumerate(indexes):
+            entries[index] = _entry(xs[row], ys[row], rs[row])
+    return entries
+
+
+def _draws(puzzle):
+    """(x draws, z draws, target r, x range, y range) of a puzzle, in the order its generator makes them"""
+    if puzzle.version != GENERATOR_VERSION:
+        raise ValueError(f"puzzle is from generator version {puzzle.version}, this build draws version "
+                         f"{GENERATOR_VERSION}")
+    rng = make_rng(puzzle.seed)
+    target, x_range, y_range = BUILDERS[puzzle.game](puzzle, rng)
+    return rng.uniform(size=puzzle.n), rng.standard_normal(size=puzzle.n), target, x_range, y_range
+
+
+def _entry(x, y, r=None):
+    x.flags.writeable = False  # shared by every session showing this puzzle
+    y.flags.writeable = False
+    return x, y, float(pearson_r(x, y) if r is None else r)
+
+
+class PuzzleCache:
+    """Bounded LRU of built puzzles, shared by every session in the process.
+
+    Sessions keep only their Puzzle descriptors and fetch the points from here
+    when a plot is drawn, so session memory no longer grows with the number of
+    points. Entries are weighed by their array bytes. Puzzles in the puzzle
+    bank (``bank``, the process's bank by default) are served straight from
+    its memory map and never take up room here.
+    """
+
+    def __init__(self, max_bytes=CACHE_BYTES, bank=None):
+        self.bank = bank
+        self._cache = LRUCache(maxsize=max_bytes, getsizeof=_entry_bytes)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bank_hits = 0
+
+    def get(self, puzzle):
+        entry = self._bank().get(puzzle)
+        if entry is not None:
+            with self._lock:
+                self.bank_hits += 1
+            return entry
+
+        with self._lock:
+            entry = self._cache.get(puzzle)
+            if entry is not None:
+                self.hits += 1
+                return entry
+
+        # Built outside the lock; two sessions rarely need the same new puzzle at once
+        entry = build_puzzle(puzzle)
+        with self._lock:
+            self.misses += 1
+            if _entry_bytes(entry) <= self._cache.maxsize:
+                self._cache[puzzle] = entry
+        return entry
+
+    def fill(self, puzzles):
+        """Build a game's rounds that are neither banked nor cached, stacked in one pass (``build_puzzles``).
+
+        Called when a game is dealt, so that drawing each round later is a
+        cache hit. Rounds over BATCH_POINTS are left to ``get``: they'd be
+        built one by one anyway, and would only take up room early.
+        """
+        bank = self._bank()
+        with self._lock:
+            missing = [puzzle for puzzle in dict.fromkeys(puzzles)
+                       if puzzle.n <= BATCH_POINTS and puzzle not in self._cache and bank.get(puzzle) is None]
+        if not missing:
+            return
+        entries = build_puzzles(missing)
+        with self._lock:
+            self.misses += len(missing)
+            for puzzle, entry in zip(missing, entries):
+                self._cache[puzzle] = entry
+
+    def _bank(self):
+        from puzzle_bank import get_puzzle_bank  # deferred: puzzle_bank imports this module
+
+        return get_puzzle_bank() if self.bank is None else self.bank
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "bank_hits": self.bank_hits,
+                    "entries": len(self._cache), "bytes": self._cache.currsize}
+
+
+def _entry_bytes(entry):
+    x, y, _ = entry
+    return x.nbytes + y.nbytes
+
+
+@process_singleton
+def get_puzzle_cache():
+    return PuzzleCache()
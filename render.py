@@ -0,0 +1,29 @@
+import io
+
+# ---------------------
+# Render settings
+# ---------------------
+RENDER_DPI = 200  # what st.pyplot uses, so images look the same as before
+
+
+def new_figure(figsize=None):
+    """A Figure on its own Agg canvas, never registered with pyplot.
+
+    Nothing here touches pyplot's global figure manager or current-figure
+    state, so figures of different sessions can be built and rendered on
+    their script threads at the same time without a lock.
+    """
+    # Deferred so importing this module stays cheap
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def render_png(fig, dpi=RENDER_DPI):
+    """Encode ``fig`` to PNG bytes the way st.pyplot does, on the figure's own canvas."""
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=dpi, bbox_inches="tight")
+    return buf.getvalue()
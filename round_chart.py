@@ -0,0 +1,214 @@
+import numpy as np
+
+from density import bin_points, use_density
+
+# ---------------------
+# Chart settings
+# ---------------------
+PX_PER_PT = 96 / 72  # matplotlib sizes are in points, Vega-Lite sizes in pixels
+DEFAULT_FIGSIZE = (6.4, 4.8)  # matplotlib's default, so both backends keep the same aspect
+DEFAULT_COLOR = "#1f77b4"
+DEFAULT_MARKER_SIZE = 36  # matplotlib's default ``s`` (points squared)
+
+# Vega-Lite defaults brought in line with a plain matplotlib axes
+BASE_CONFIG = {
+    "axis": {
+        "grid": False,
+        "domainColor": "black",
+        "tickColor": "black",
+        "labelColor": "black",
+        "titleColor": "black",
+        "labelFontSize": round(10 * PX_PER_PT),
+        "titleFontSize": round(10 * PX_PER_PT),
+        "titleFontWeight": "normal",
+    },
+    "title": {"fontSize": round(12 * PX_PER_PT), "fontWeight": "normal", "color": "black"},
+    "view": {"stroke": "black"},
+}
+
+# matplotlib text keyword -> Vega-Lite property suffix
+_TEXT_STYLE = {"fontsize": "FontSize", "fontweight": "FontWeight", "color": "Color"}
+
+
+class RoundChart:
+    """Browser-rendered twin of RoundFigure, drawn client-side by Vega-Lite.
+
+    Takes the same scatter keywords as RoundFigure (``c``/``color``,
+    ``edgecolors``, ``s``, ``alpha``, ``linewidth``) and has the same methods, so
+    the apps can use either one. Instead of a PNG it produces a small Vega-Lite
+    spec plus the point columns as float32, which Streamlit ships to the browser
+    as Arrow. ``chart_config`` is merged over BASE_CONFIG for styling that
+    RoundFigure does with its ``setup`` callback. Large rounds are sent as the
+    non-empty bins of a density grid, like RoundFigure draws them.
+    """
+
+    def __init__(self, figsize=None, chart_config=None, **scatter_kwargs):
+        width, height = figsize or DEFAULT_FIGSIZE
+        self.aspect = height / width
+        self.config = _merge(BASE_CONFIG, chart_config or {})
+        self.mark, self._stroke_follows_fill = _mark(scatter_kwargs)
+        self.title = None
+        self.x_axis = {"title": None}
+        self.y_axis = {"title": None}
+        self._data = None
+        self._columns = _empty_columns()
+        self._extent = None  # (x0, x1, y0, y1, bin width, bin height) while showing a density grid
+        self._closed = False
+
+    def set_data(self, x, y):
+        """Show new points. No-op if they are unchanged."""
+        if self._data is not None and self._data[0] is x and self._data[1] is y:
+            return
+        if use_density(len(x)):
+            self._columns, self._extent = _density_columns(x, y, self.aspect)
+        else:
+            self._columns = {"x": np.asarray(x, dtype=np.float32), "y": np.asarray(y, dtype=np.float32)}
+            self._extent = None
+        self._data = (x, y)
+
+    def clear_data(self):
+        """Hide the points and go back to empty (0, 1) axes."""
+        self._columns = _empty_columns()
+        self._extent = None
+        self._data = None
+
+    def set_point_color(self, color):
+        self.mark["fill"] = color
+        if self._stroke_follows_fill:
+            self.mark["stroke"] = color
+
+    def set_title(self, title, **kwargs):
+        self.title = {"text": title, **_text_style(kwargs, "")}
+        if "pad" in kwargs:
+            self.title["offset"] = kwargs["pad"]
+
+    def set_labels(self, xlabel, ylabel, **kwargs):
+        style = _text_style(kwargs, "title")
+        self.x_axis = {"title": xlabel, **style}
+        self.y_axis = {"title": ylabel, **style}
+
+    def columns(self):
+        """The point data, one float32 array per column."""
+        return self._columns
+
+    def spec(self, width):
+        """Vega-Lite spec for a chart ``width`` pixels wide (data is passed separately)."""
+        transform = None
+        if self._extent is not None:
+            mark, encoding, transform = self._density_encoding()
+        else:
+            scale = {"zero": False, "nice": True}
+            if self._data is None:
+                scale = {"domain": [0, 1]}
+            mark = self.mark
+            encoding = {
+                "x": {"field": "x", "type": "quantitative", "scale": scale, "axis": self.x_axis},
+                "y": {"field": "y", "type": "quantitative", "scale": scale, "axis": self.y_axis},
+            }
+        spec = {
+            "height": round(width * self.aspect),
+            "mark": mark,
+            "encoding": encoding,
+            "config": self.config,
+        }
+        if transform is not None:
+            spec["transform"] = transform
+        if self.title is not None:
+            spec["title"] = self.title
+        return spec
+
+    def _density_encoding(self):
+        x0, x1, y0, y1, bin_w, bin_h = self._extent
+        mark = {"type": "rect", "fill": self.mark["fill"]}
+        transform = [
+            {"calculate": f"datum.x + {bin_w!r}", "as": "x2"},
+            {"calculate": f"datum.y + {bin_h!r}", "as": "y2"},
+        ]
+        encoding = {
+            "x": {"field": "x", "type": "quantitative", "scale": {"domain": [x0, x1], "nice": False},
+                  "axis": self.x_axis},
+            "x2": {"field": "x2"},
+            "y": {"field": "y", "type": "quantitative", "scale": {"domain": [y0, y1], "nice": False},
+                  "axis": self.y_axis},
+            "y2": {"field": "y2"},
+            # sqrt scaling keeps the sparse tails of the cloud visible next to its dense core
+            "opacity": {"field": "count", "type": "quantitative",
+                        "scale": {"type": "sqrt", "range": [0.15, 1]}, "legend": None},
+        }
+        return mark, encoding, transform
+
+    @property
+    def closed(self):
+        return self._closed
+
+    @property
+    def nbytes(self):
+        """Rough memory held by this chart: its column arrays"""
+        return sum(getattr(column, "nbytes", 0) for column in self._columns.values())
+
+    def close(self):
+        self._columns = _empty_columns()
+        self._extent = None
+        self._data = None
+        self._closed = True
+
+
+def _mark(scatter_kwargs):
+    """Translate matplotlib scatter keywords into a Vega-Lite point mark.
+
+    Also returns whether the edge follows the face colour, as it does by default in matplotlib.
+    """
+    fill = scatter_kwargs.get("c", scatter_kwargs.get("color", DEFAULT_COLOR))
+    size = scatter_kwargs.get("s", DEFAULT_MARKER_SIZE)
+    mark = {
+        "type": "point",
+        "filled": True,
+        "fill": fill,
+        "size": size * PX_PER_PT ** 2,
+        "opacity": scatter_kwargs.get("alpha", 1.0),
+    }
+    stroke = scatter_kwargs.get("edgecolors", "face")
+    mark["stroke"] = fill if stroke == "face" else stroke
+    mark["strokeWidth"] = scatter_kwargs.get("linewidth", scatter_kwargs.get("linewidths", 1.0)) * PX_PER_PT
+    return mark, stroke == "face"
+
+
+def _density_columns(x, y, aspect):
+    """Lower-left corners and counts of the non-empty density bins, plus the grid's extent and bin size."""
+    counts, extent = bin_points(x, y, aspect)
+    x0, x1, y0, y1 = extent
+    ny, nx = counts.shape
+    iy, ix = np.nonzero(counts)
+    bin_w, bin_h = (x1 - x0) / nx, (y1 - y0) / ny
+    columns = {
+        "x": (x0 + ix * bin_w).astype(np.float32),
+        "y": (y0 + iy * bin_h).astype(np.float32),
+        "count": counts[iy, ix].astype(np.float32),
+    }
+    return columns, extent + (bin_w, bin_h)
+
+
+def _text_style(kwargs, prefix):
+    style = {}
+    for key, suffix in _TEXT_STYLE.items():
+        if key in kwargs:
+            value = kwargs[key]
+            if key == "fontsize":
+                value = round(value * PX_PER_PT)
+            name = prefix + suffix if prefix else suffix[0].lower() + suffix[1:]
+            style[name] = value
+    return style
+
+
+def _merge(base, override):
+    merged = dict(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def _empty_columns():
+    return {"x": np.empty(0, dtype=np.float32), "y": np.empty(0, dtype=np.float32)}
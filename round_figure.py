@@ -0,0 +1,126 @@
+import weakref
+
+import numpy as np
+
+from density import bin_points, use_density
+from render import new_figure
+
+
+class RoundFigure:
+    """The guessing-plot figure a session keeps for its whole lifetime.
+
+    The figure, axes styling and scatter artist are built once; each new round
+    only swaps the point data with ``set_offsets``. The figure lives on its own
+    Agg canvas, never in pyplot's global registry, and it is released when the
+    owning session state is garbage collected (or when ``close`` is called).
+    Encode it with ``render.render_png``; st.pyplot would go through pyplot.
+
+    Rounds with more than DENSITY_THRESHOLD points are drawn as a binned density
+    image in the point colour instead of one marker per point, so the render
+    cost stays flat however many points a round has.
+    """
+
+    def __init__(self, figsize=None, setup=None, **scatter_kwargs):
+        self.fig = new_figure(figsize)
+        self.ax = self.fig.add_subplot()
+        self.points = self.ax.scatter(np.empty(0), np.empty(0), **scatter_kwargs)
+        self.density = None  # image artist, created by the first large round
+        if setup is not None:
+            setup(self.fig, self.ax)
+        self._data = None
+        self._finalizer = weakref.finalize(self, _release, self.fig)
+
+    def set_data(self, x, y):
+        """Show new points, rescaling the axes to them. No-op if they are unchanged."""
+        if self._data is not None and self._data[0] is x and self._data[1] is y:
+            return
+        if use_density(len(x)):
+            self._show_density(x, y)
+        else:
+            self._hide_density()
+            xy = np.column_stack((x, y))
+            self.points.set_offsets(xy)
+            self.points.set_visible(True)
+            self.ax.ignore_existing_data_limits = True
+            self.ax.update_datalim(xy)
+            self.ax.set_autoscale_on(True)  # set_xlim/set_ylim in clear_data turn it off
+            self.ax.autoscale_view()
+        self._data = (x, y)
+
+    def clear_data(self):
+        """Hide the points and go back to empty (0, 1) axes."""
+        self._hide_density()
+        self.points.set_offsets(np.empty((0, 2)))
+        self.points.set_visible(False)
+        self.ax.set_xlim(0, 1)
+        self.ax.set_ylim(0, 1)
+        self._data = None
+
+    def set_point_color(self, color):
+        self.points.set_facecolor(color)
+        if self.density is not None:
+            self.density.set_cmap(_density_cmap(color))
+
+    def set_title(self, title, **kwargs):
+        if self.ax.get_title() != title:
+            self.ax.set_title(title, **kwargs)
+
+    def set_labels(self, xlabel, ylabel, **kwargs):
+        if self.ax.get_xlabel() != xlabel:
+            self.ax.set_xlabel(xlabel, **kwargs)
+        if self.ax.get_ylabel() != ylabel:
+            self.ax.set_ylabel(ylabel, **kwargs)
+
+    def _show_density(self, x, y):
+        width, height = self.fig.get_size_inches()
+        counts, extent = bin_points(x, y, height / width)
+        # Empty bins stay transparent
+        counts = np.ma.masked_equal(counts, 0)
+        if self.density is None:
+            from matplotlib.colors import PowerNorm
+
+            # sqrt scaling keeps the sparse tails of the cloud visible next to its dense core
+            self.density = self.ax.imshow(counts, extent=extent, origin="lower", aspect="auto",
+                                          interpolation="nearest", norm=PowerNorm(0.5),
+                                          cmap=_density_cmap(self.points.get_facecolor()[0]))
+        else:
+            self.density.set_data(counts)
+            self.density.set_extent(extent)
+            self.density.norm.vmin, self.density.norm.vmax = counts.min(), counts.max()
+        self.density.set_visible(True)
+        self.points.set_offsets(np.empty((0, 2)))
+        self.points.set_visible(False)
+        self.ax.set_xlim(extent[0], extent[1])
+        self.ax.set_ylim(extent[2], extent[3])
+
+    def _hide_density(self):
+        if self.density is not None:
+            self.density.set_visible(False)
+
+    @property
+    def closed(self):
+        return not self._finalizer.alive
+
+    @property
+    def nbytes(self):
+        """Rough memory held by this figure: its Agg pixel buffer, once rendered, and its point offsets"""
+        if self.closed:
+            return 0
+        renderer = getattr(self.fig.canvas, "renderer", None)
+        buffer = renderer.buffer_rgba().nbytes if renderer is not None else 0
+        return buffer + self.points.get_offsets().nbytes
+
+    def close(self):
+        self._finalizer()
+
+
+def _release(fig):
+    fig.clear()
+
+
+def _density_cmap(color):
+    from matplotlib.colors import LinearSegmentedColormap, to_rgba
+
+    cmap = LinearSegmentedColormap.from_list("density", [to_rgba(color, 0.15), to_rgba(color, 1.0)])
+    cmap.set_bad((0, 0, 0, 0))
+    return cmap
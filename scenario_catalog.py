@@ -0,0 +1,151 @@
+import csv
+import json
+import os
+import threading
+
+from game_config import difficulty_settings
+
+# ---------------------
+# Catalog settings
+# ---------------------
+CATALOG_PATH = os.environ.get("CHALLENGER_SCENARIO_CATALOG",
+                              os.path.join(os.path.dirname(os.path.abspath(__file__)), "scenarios.json"))
+DIRECTIONS = ("positive", "negative", "zero")
+REQUIRED_KEYS = ("id", "difficulty", "direction", "base_corr", "x_label", "y_label")
+PICK_TRIES = 8  # random draws before pick() falls back to scanning for an unused scenario
+
+
+class ScenarioCatalog:
+    """Correlation_Code's transport scenarios, indexed by their stable ids.
+
+    Puzzles store a scenario's id, so editing, reordering or adding
+    scenarios never changes what an existing puzzle code draws. Ids are
+    also indexed by difficulty level and by (level, direction), so picking
+    a round's scenario is a few random draws however big the catalog is.
+    """
+
+    def __init__(self, scenarios):
+        self._by_id = {}
+        self._ids = {}  # (difficulty, direction or None) -> ids
+        for scenario in scenarios:
+            _validate(scenario)
+            scenario_id, difficulty, direction = scenario["id"], scenario["difficulty"], scenario["direction"]
+            if scenario_id in self._by_id:
+                raise ValueError(f"scenario id {scenario_id} is used twice")
+            if difficulty not in difficulty_settings:
+                raise ValueError(f"scenario {scenario_id} has unknown difficulty {difficulty!r}")
+            if direction not in DIRECTIONS:
+                raise ValueError(f"scenario {scenario_id} has unknown direction {direction!r}")
+            self._by_id[scenario_id] = scenario
+            self._ids.setdefault((difficulty, None), []).append(scenario_id)
+            self._ids.setdefault((difficulty, direction), []).append(scenario_id)
+        missing = [level for level in difficulty_settings if (level, None) not in self._ids]
+        if missing:
+            raise ValueError(f"no scenarios for difficulty level(s) {missing}")
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def __contains__(self, scenario_id):
+        return scenario_id in self._by_id
+
+    def scenario(self, scenario_id):
+        return self._by_id[scenario_id]
+
+    def ids(self, difficulty, direction=None):
+        """Ids of a level's scenarios, optionally only those of one direction"""
+        return self._ids.get((difficulty, direction), [])
+
+    def pick(self, difficulty, rng, used=(), direction=None):
+        """A random scenario id of a level, avoiding the ids in ``used`` while the level has others"""
+        ids = self.ids(difficulty, direction)
+        for _ in range(PICK_TRIES):
+            scenario_id = ids[rng.integers(len(ids))]
+            if scenario_id not in used:
+                return scenario_id
+        # Most of the level is used up (only likely in a small catalog): choose among what's left
+        fresh = [scenario_id for scenario_id in ids if scenario_id not in used]
+        return (fresh or ids)[rng.integers(len(fresh or ids))]
+
+    def aim(self, difficulty, target, used=()):
+        """(scenario id, target) for a round of a level aimed at correlation ``target``.
+
+        A level's rounds stay close to its scenarios' base_corr, so the target
+        is clamped to the base_corr range of the level's scenarios on its side
+        of zero (all of them if there are none on that side). The id is that
+        side's scenario nearest the clamped target, unused ones first, so the
+        round's direction matches its data.
+        """
+        ids = self.ids(difficulty)
+        side = [scenario_id for scenario_id in ids if (self._by_id[scenario_id]["base_corr"] < 0) == (target < 0)]
+        side = side or ids
+        base_corrs = [self._by_id[scenario_id]["base_corr"] for scenario_id in side]
+        target = float(min(max(target, min(base_corrs)), max(base_corrs)))
+        fresh = [scenario_id for scenario_id in side if scenario_id not in used] or side
+        return min(fresh, key=lambda scenario_id: abs(self._by_id[scenario_id]["base_corr"] - target)), target
+
+
+def _validate(scenario):
+    """Raise ValueError unless ``scenario`` has every key a round reads, with a usable value"""
+    if not isinstance(scenario, dict):
+        raise ValueError(f"a scenario must be an object, not {scenario!r}")
+    scenario_id = scenario.get("id", "?")
+    missing = [key for key in REQUIRED_KEYS if key not in scenario]
+    if missing:
+        raise ValueError(f"scenario {scenario_id} has no {', '.join(missing)}")
+    base_corr = scenario["base_corr"]
+    if isinstance(base_corr, bool) or not isinstance(base_corr, (int, float)) or not -1 <= base_corr <= 1:
+        raise ValueError(f"scenario {scenario_id} has base_corr {base_corr!r}, not a number in [-1, 1]")
+    for key in ("x_label", "y_label"):
+        if not isinstance(scenario[key], str) or not scenario[key].strip():
+            raise ValueError(f"scenario {scenario_id} has an empty or non-text {key}")
+    for key in ("x_range", "y_range"):
+        value_range = scenario.get(key)
+        if value_range is not None and not (
+                isinstance(value_range, (list, tuple)) and len(value_range) == 2 and all(isinstance(v, (int, float)) for v in value_range)
+                and value_range[0] < value_range[1]):
+            raise ValueError(f"scenario {scenario_id} has {key} {value_range!r}, not a (low, high) pair")
+
+
+def load_catalog(path):
+    """Parse a catalog file: JSON ``{"scenarios": [...]}`` or CSV, one scenario per row"""
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            scenarios = [dict(row, id=int(row["id"]), difficulty=int(row["difficulty"]),
+                              base_corr=float(row["base_corr"]))
+                         for row in csv.DictReader(f)]
+    else:
+        with open(path, encoding="utf-8") as f:
+            scenarios = json.load(f)["scenarios"]
+        for scenario in scenarios:
+            for key in ("x_range", "y_range"):
+                if key in scenario:
+                    scenario[key] = tuple(scenario[key])
+    return ScenarioCatalog(scenarios)
+
+
+_catalog = None
+_catalog_stamp = None
+_catalog_lock = threading.Lock()
+
+
+def get_scenario_catalog():
+    """Return the scenario catalog, parsed once and again only after the file changes.
+
+    A reload that fails (say, the file is saved half-edited, or is missing
+    while it is renamed into place) keeps serving the previous catalog; with
+    no previous catalog, the error is raised.
+    """
+    global _catalog, _catalog_stamp
+    with _catalog_lock:
+        try:
+            stat = os.stat(CATALOG_PATH)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+            if stamp != _catalog_stamp:
+                _catalog_stamp = stamp  # a broken file is parsed once, not on every rerun
+                _catalog = load_catalog(CATALOG_PATH)
+        except (OSError, ValueError, KeyError, TypeError):
+            if _catalog is None:
+                _catalog_stamp = None
+                raise
+        return _catalog
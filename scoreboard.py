@@ -0,0 +1,79 @@
+import sys
+from array import array
+from bisect import bisect_left
+
+_SCORE_BIAS = 2 ** 31 - 1  # maps an int32 score onto [0, 2**32) with higher scores first
+
+
+class RankedScoreboard:
+    """Append-only scoreboard for one game that is always kept in rank order.
+
+    Columns are typed arrays (int64 row ids, int32 scores) plus a list of
+    interned names; rows are never copied or re-sorted. Rank order lives in one
+    uint64 array of sort keys ``(biased score << 32) | position`` kept sorted with
+    binary-search insertion, so ties rank by arrival. Rank lookups are a binary
+    search and a top-k read touches only k keys; the leading slice is cached
+    until an insert lands inside it.
+    """
+
+    def __init__(self):
+        self.row_ids = array("q")
+        self.scores = array("i")
+        self.names = []
+        self._order = array("Q")
+        self._leading = None  # (k, rows) cache of ranked(0, k)
+
+    def __len__(self):
+        return len(self.scores)
+
+    def append(self, row_id, name, score):
+        """Add a finished game and return its position (arrival index)."""
+        position = len(self.scores)
+        self.row_ids.append(row_id)
+        self.scores.append(score)
+        self.names.append(sys.intern(name))
+        key = self._key(score, position)
+        index = bisect_left(self._order, key)
+        self._order.insert(index, key)
+        if self._leading is not None and index < self._leading[0]:
+            self._leading = None
+        return position
+
+    def top(self, k):
+        """The best ``k`` (name, score) pairs, highest score first."""
+        return [self._entry(key) for key in self._order[:k]]
+
+    def ranked(self, start, stop):
+        """(rank, name, score) rows for the rank-order slice ``[start:stop]``."""
+        start = max(0, start)
+        if start == 0:
+            if self._leading is None or self._leading[0] != stop:
+                self._leading = (stop, self._ranked(0, stop))
+            return self._leading[1]
+        return self._ranked(start, stop)
+
+    def _ranked(self, start, stop):
+        return [(start + i + 1,) + self._entry(key) for i, key in enumerate(self._order[start:stop])]
+
+    def rank(self, position):
+        """1-based rank of the entry at ``position``."""
+        return bisect_left(self._order, self._key(self.scores[position], position)) + 1
+
+    def rank_of_score(self, score):
+        """The rank a new game with this score would get (1 + number of higher scores)."""
+        return bisect_left(self._order, self._key(score, 0)) + 1
+
+    def position_of(self, row_id):
+        """Position of a stored row id, or None. Row ids arrive in increasing order."""
+        position = bisect_left(self.row_ids, row_id)
+        if position < len(self.row_ids) and self.row_ids[position] == row_id:
+            return position
+        return None
+
+    def _entry(self, key):
+        position = key & 0xFFFFFFFF
+        return self.names[position], self.scores[position]
+
+    @staticmethod
+    def _key(score, position):
+        return ((_SCORE_BIAS - score) << 32) | position
@@ -0,0 +1,49 @@
+import streamlit as st
+
+from leaderboard import get_leaderboard
+from timing_view import fragment
+
+# ---------------------
+# Scoreboard view settings
+# ---------------------
+TOP_K = 10
+NEIGHBOURS = 2  # rows shown above and below the player's own rank
+PAGE_SIZE = 25
+
+
+@fragment
+def show_scoreboard(game, last_row_id=None, rank_label=str, column_config=None):
+    """Render the top of ``game``'s leaderboard, the player's own rank and a paged full list.
+
+    Only the top-k slice, a few neighbour rows and one page are sent to the
+    browser, so the payload stays the same size however big the board grows.
+    It is a fragment: paging through the list reruns only the scoreboard.
+    """
+    board = get_leaderboard()
+    total = board.count(game)
+    _show_rows(board.ranked(game, 0, TOP_K), rank_label, column_config)
+
+    if last_row_id is not None:
+        rank = board.rank(game, last_row_id)
+        if rank is not None:
+            st.markdown(f"**📍 Your last game ranks #{rank} of {total}**")
+            if rank > TOP_K:
+                start = max(TOP_K, rank - 1 - NEIGHBOURS)
+                _show_rows(board.ranked(game, start, rank + NEIGHBOURS), rank_label, column_config)
+
+    if total > TOP_K and st.toggle("📜 Show full leaderboard", key="scoreboard_show_all"):
+        pages = (total + PAGE_SIZE - 1) // PAGE_SIZE
+        page = st.number_input("Page", min_value=1, max_value=pages, value=1, step=1, key="scoreboard_page")
+        start = (page - 1) * PAGE_SIZE
+        _show_rows(board.ranked(game, start, start + PAGE_SIZE), rank_label, column_config)
+        st.caption(f"Page {page} of {pages} · {total} games played")
+
+
+def _show_rows(rows, rank_label, column_config):
+    import pandas as pd  # only loaded once there is a scoreboard to show
+
+    frame = pd.DataFrame(
+        [(rank_label(rank), name, score) for rank, name, score in rows],
+        columns=["Rank", "Name", "Total Score"],
+    )
+    st.dataframe(frame, use_container_width=True, hide_index=True, column_config=column_config)
@@ -0,0 +1,245 @@
+import http.server
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from singleton import process_singleton
+
+# ---------------------
+# Timing settings
+# ---------------------
+TIMING_ENABLED = os.environ.get("CHALLENGER_TIMING", "1") != "0"
+METRICS_PORT = os.environ.get("CHALLENGER_METRICS_PORT")  # serve /metrics on 127.0.0.1:<port> if set
+METRICS_FILE = os.environ.get("CHALLENGER_METRICS_FILE")  # rewrite this file every EXPORT_SECONDS if set
+EXPORT_SECONDS = 15
+# Histogram bucket upper bounds in seconds (Prometheus "le" labels); one more bucket catches the rest
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+SLOT_SECONDS = 30  # the rolling window is kept as WINDOW_SLOTS slots of this length
+WINDOW_SLOTS = 10
+FRAGMENT_SUFFIX = "(fragment rerun)"  # appended to sections timed in a fragment's own rerun
+
+
+class SectionHistogram:
+    """Latency histogram of one section: cumulative for export, plus a rolling window."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+        self._slots = []  # [slot number, counts, total, count], oldest first
+
+    def observe(self, seconds, now):
+        bucket = bisect_left(BUCKETS, seconds)
+        self.counts[bucket] += 1
+        self.total += seconds
+        self.count += 1
+
+        slot_number = int(now // SLOT_SECONDS)
+        if not self._slots or self._slots[-1][0] != slot_number:
+            self._slots.append([slot_number, [0] * len(self.counts), 0.0, 0])
+            if len(self._slots) > WINDOW_SLOTS:
+                del self._slots[0]
+        slot = self._slots[-1]
+        slot[1][bucket] += 1
+        slot[2] += seconds
+        slot[3] += 1
+
+    def window(self, now):
+        """(counts, total, count) over the last WINDOW_SLOTS * SLOT_SECONDS seconds."""
+        oldest = int(now // SLOT_SECONDS) - WINDOW_SLOTS + 1
+        counts = [0] * len(self.counts)
+        total, count = 0.0, 0
+        for slot_number, slot_counts, slot_total, slot_count in self._slots:
+            if slot_number >= oldest:
+                counts = [a + b for a, b in zip(counts, slot_counts)]
+                total += slot_total
+                count += slot_count
+        return counts, total, count
+
+
+class Span:
+    """One timed run of a section; a context manager, or call ``stop()`` yourself."""
+
+    __slots__ = ("_timings", "_key", "_start")
+
+    def __init__(self, timings, key):
+        self._timings = timings
+        self._key = key
+        self._start = time.perf_counter()
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def stop(self):
+        self._timings.observe(self._key, time.perf_counter() - self._start)
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def stop(self):
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+class SectionTimings:
+    """Per-app, per-section rerun timings shared by every session in the process.
+
+    Wrap a section with ``with timings.section(app, name):``, or time a span
+    that can't be a block (a whole rerun) with ``start(...)`` and ``stop()``.
+    A span costs two clock reads and one locked histogram update, a few
+    microseconds against reruns of tens of milliseconds. With
+    CHALLENGER_TIMING=0 spans do nothing at all.
+
+    Sections timed inside ``fragment_rerun()`` are filed under their name
+    plus FRAGMENT_SUFFIX. They ran outside any full rerun, so they must not
+    count towards its time.
+    """
+
+    def __init__(self, enabled=TIMING_ENABLED):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._histograms = {}  # (app, section) -> SectionHistogram
+        self._local = threading.local()  # a script run is on one thread: is it a fragment's rerun?
+
+    def section(self, app, name):
+        if not self.enabled:
+            return _NO_SPAN
+        if getattr(self._local, "fragment_rerun", False):
+            name = f"{name} {FRAGMENT_SUFFIX}"
+        return Span(self, (app, name))
+
+    start = section
+
+    @contextmanager
+    def fragment_rerun(self):
+        """Time the sections run inside this block as parts of a fragment's own rerun"""
+        self._local.fragment_rerun = True
+        try:
+            yield
+        finally:
+            self._local.fragment_rerun = False
+
+    def observe(self, key, seconds):
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = SectionHistogram()
+            histogram.observe(seconds, time.time())
+
+    def summary(self, app):
+        """Rolling-window stats per section of ``app``: name -> (count, p50, p95, mean) in seconds."""
+        now = time.time()
+        with self._lock:
+            windows = {section: histogram.window(now)
+                       for (key_app, section), histogram in self._histograms.items() if key_app == app}
+        return {
+            section: (count, percentile(counts, count, 0.50), percentile(counts, count, 0.95), total / count)
+            for section, (counts, total, count) in windows.items() if count
+        }
+
+    def to_prometheus(self):
+        """All histograms in the Prometheus text exposition format."""
+        with self._lock:
+            snapshot = [(key, list(h.counts), h.total, h.count) for key, h in sorted(self._histograms.items())]
+        lines = [
+            "# HELP challenger_section_seconds Time spent in each section of a Streamlit rerun.",
+            "# TYPE challenger_section_seconds histogram",
+        ]
+        for (app, section), counts, total, count in snapshot:
+            labels = f'app="{_escape(app)}",section="{_escape(section)}"'
+            cumulative = 0
+            for bound, bucket_count in zip(BUCKETS + ("+Inf",), counts):
+                cumulative += bucket_count
+                lines.append(f'challenger_section_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"challenger_section_seconds_sum{{{labels}}} {total!r}")
+            lines.append(f"challenger_section_seconds_count{{{labels}}} {count}")
+        return "\n".join(lines) + "\n"
+
+    # ---------------------
+    # Export
+    # ---------------------
+    def write_file(self, path):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+    def start_exporters(self, port=METRICS_PORT, path=METRICS_FILE):
+        """Serve /metrics on ``port`` and/or keep ``path`` up to date, each only if set."""
+        if port:
+            try:
+                server = http.server.ThreadingHTTPServer(("127.0.0.1", int(port)), _metrics_handler(self))
+            except OSError:
+                server = None  # another worker process already serves this port
+            if server is not None:
+                threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        if path:
+            threading.Thread(target=self._export_loop, args=(path,), name="metrics-file", daemon=True).start()
+
+    def _export_loop(self, path):
+        while True:
+            time.sleep(EXPORT_SECONDS)
+            try:
+                self.write_file(path)
+            except OSError:
+                pass  # best effort, like the guide cache's disk tier
+
+
+def percentile(counts, count, q):
+    """Estimate a quantile from bucket counts, interpolating linearly inside the bucket."""
+    rank = q * count
+    seen = 0
+    for index, bucket_count in enumerate(counts):
+        if bucket_count and seen + bucket_count >= rank:
+            lower = BUCKETS[index - 1] if index > 0 else 0.0
+            if index == len(BUCKETS):
+                return lower  # open-ended top bucket
+            return lower + (BUCKETS[index] - lower) * (rank - seen) / bucket_count
+        seen += bucket_count
+    return 0.0
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _metrics_handler(timings):
+    class MetricsHandler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+            body = timings.to_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # keep scrapes out of the Streamlit log
+
+    return MetricsHandler
+
+
+@process_singleton
+def get_section_timings():
+    """The process's timings, with their exporters started"""
+    timings = SectionTimings()
+    timings.start_exporters()
+    return timings
@@ -0,0 +1,21 @@
+import secrets
+
+import numpy as np
+
+# Cached guide plots are drawn from this seed, so every process renders the same examples
+GUIDE_SEED = 42
+
+
+def new_seed():
+    """A fresh 64-bit seed; recorded in session state so the game it starts can be rebuilt"""
+    return secrets.randbits(64)
+
+
+def make_rng(seed):
+    """Independent PCG64 generator for one game or one cached asset.
+
+    Each session draws from its own generator instead of NumPy's global
+    RandomState, which every session thread in the process shares (and
+    reseeds) under one lock.
+    """
+    return np.random.Generator(np.random.PCG64(seed))
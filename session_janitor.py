@@ -0,0 +1,120 @@
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+from singleton import process_singleton
+
+# ---------------------
+# Janitor settings
+# ---------------------
+IDLE_TTL = int(os.environ.get("CHALLENGER_SESSION_TTL", "900"))  # seconds without a rerun before heavy state goes
+SWEEP_SECONDS = 60
+
+
+class SessionJanitor:
+    """Heavy per-session objects, kept outside st.session_state and dropped once a session goes idle.
+
+    A session's round figure, pre-render job and pre-rendered PNGs live in
+    its ``store``. What st.session_state keeps is already a compact,
+    resumable descriptor: name, round, score and the round's Puzzle (its
+    seed). So once a session has had no rerun for ``ttl`` seconds, its
+    store can simply be dropped. Figures are closed and queued jobs
+    cancelled. A student who comes back carries on where they left off, and
+    the figure is rebuilt on the next plot. Sessions that never come back,
+    such as a closed laptop or a finished class, are forgotten altogether,
+    so memory follows the number of active sessions over a whole day.
+    """
+
+    def __init__(self, ttl=IDLE_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._sessions = {}  # session id -> [last activity, store]
+        self.evicted = 0
+        self.freed_bytes = 0
+        self._sweeper = None
+
+    def touch(self, session_id, now=None):
+        """Record activity of a session; returns its store of heavy objects."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                entry = self._sessions[session_id] = [now, {}]
+            entry[0] = now
+            return entry[1]
+
+    def sweep(self, now=None):
+        """Drop the stores of sessions idle for longer than ``ttl``; returns (sessions, bytes) freed."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            idle = [session_id for session_id, (last, _) in self._sessions.items() if now - last > self.ttl]
+            stores = [self._sessions.pop(session_id)[1] for session_id in idle]
+        freed = 0
+        for store in stores:
+            for value in store.values():
+                freed += _heavy_bytes(value)
+                _release(value)
+        with self._lock:
+            self.evicted += len(stores)
+            self.freed_bytes += freed
+        return len(stores), freed
+
+    def stats(self):
+        with self._lock:
+            held = sum(_heavy_bytes(value) for _, store in self._sessions.values() for value in store.values())
+            return {"sessions": len(self._sessions), "held_bytes": held,
+                    "evicted": self.evicted, "freed_bytes": self.freed_bytes}
+
+    def start_sweeper(self, interval=SWEEP_SECONDS):
+        """Sweep every ``interval`` seconds on a daemon thread (once per janitor)."""
+        with self._lock:
+            if self._sweeper is not None:
+                return
+            self._sweeper = threading.Thread(target=self._sweep_loop, args=(interval,), name="session-janitor",
+                                             daemon=True)
+        self._sweeper.start()
+
+    def _sweep_loop(self, interval):
+        while True:
+            time.sleep(interval)
+            self.sweep()
+
+
+def _heavy_bytes(value):
+    """Rough size of a stored object: PNG bytes, figures and charts, and finished jobs' results"""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, tuple):
+        return sum(_heavy_bytes(item) for item in value)
+    if isinstance(value, Future):
+        if value.done() and not value.cancelled() and value.exception() is None:
+            return _heavy_bytes(value.result())
+        return 0
+    return getattr(value, "nbytes", 0)
+
+
+def _release(value):
+    if isinstance(value, tuple):
+        for item in value:
+            _release(item)
+    elif isinstance(value, Future):
+        value.cancel()
+    elif hasattr(value, "close"):
+        value.close()
+
+
+@process_singleton
+def get_session_janitor():
+    """The process's janitor, with its sweeper running"""
+    janitor = SessionJanitor()
+    janitor.start_sweeper()
+    return janitor
+
+
+def session_store():
+    """This session's store of heavy objects; reading it counts as activity."""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    return get_session_janitor().touch(ctx.session_id if ctx is not None else None)
@@ -0,0 +1,22 @@
+import functools
+import threading
+
+
+def process_singleton(factory):
+    """Make ``factory`` a getter that builds its object once per process and then returns it.
+
+    ``functools.cache`` on a no-argument function, with the first call under a
+    lock: sessions starting together on different script threads must not
+    build two (two sweeper threads, or two exporters on one port).
+    ``getter.cache_clear()`` drops the object; the next call builds a new one.
+    """
+    cached = functools.cache(factory)
+    lock = threading.Lock()
+
+    @functools.wraps(factory)
+    def getter():
+        with lock:
+            return cached()
+
+    getter.cache_clear = cached.cache_clear
+    return getter
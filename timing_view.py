@@ -0,0 +1,121 @@
+import functools
+import os
+
+import streamlit as st
+
+from section_timing import FRAGMENT_SUFFIX, METRICS_FILE, METRICS_PORT, SLOT_SECONDS, WINDOW_SLOTS, get_section_timings
+from session_janitor import get_session_janitor, session_store
+
+
+FRAGMENTS = os.environ.get("CHALLENGER_FRAGMENTS", "1") != "0"  # 0 runs fragments inside every full rerun instead
+
+
+def fragment(func):
+    """``st.fragment`` that counts this session's fragment reruns; a plain function if CHALLENGER_FRAGMENTS=0.
+
+    Switching fragments off gives the flow from before the fragment split,
+    for before/after comparisons such as benchmarks/bench_fragments.py.
+    """
+    if not FRAGMENTS:
+        return func
+
+    @functools.wraps(func)
+    def counted(*args, **kwargs):
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+        ctx = get_script_run_ctx()
+        if ctx is not None and ctx.fragment_ids_this_run:  # a rerun of the fragment alone
+            st.session_state.fragment_reruns = st.session_state.get("fragment_reruns", 0) + 1
+            session_store()
+            with get_section_timings().fragment_rerun():
+                return func(*args, **kwargs)
+        return func(*args, **kwargs)
+
+    return st.fragment(counted)
+
+
+def start_rerun(game):
+    """Start timing this full rerun of ``game``; call at the top of the app and finish_rerun() at the end.
+
+    A run that ends in a rerun request must go through rerun(), or its time is lost.
+    """
+    st.session_state.rerun_span = get_section_timings().start(game, "rerun")
+
+
+def finish_rerun():
+    span = st.session_state.pop("rerun_span", None)
+    if span is not None:
+        span.stop()
+
+
+def rerun():
+    """``st.rerun()``, first recording the run it cuts short"""
+    finish_rerun()
+    st.rerun()
+
+
+def count_rerun():
+    """Count a full script run of this session; call once near the top of the app."""
+    st.session_state.reruns = st.session_state.get("reruns", 0) + 1
+    session_store()  # a rerun is activity, so the session janitor keeps this session's figure and jobs
+
+
+def count_round():
+    """Count a finished round of this session."""
+    st.session_state.rounds_finished = st.session_state.get("rounds_finished", 0) + 1
+
+
+def show_section_timings(game):
+    """Instructor-panel table of where ``game``'s reruns spend their time, over the rolling window."""
+    reruns = st.session_state.get("reruns", 0)
+    fragment_reruns = st.session_state.get("fragment_reruns", 0)
+    rounds = st.session_state.get("rounds_finished", 0)
+    per_round = f" – {reruns / rounds:.1f} full reruns per finished round" if rounds else ""
+    st.caption(f"🔁 This session: {reruns} full reruns, {fragment_reruns} fragment reruns, "
+               f"{rounds} rounds finished{per_round}")
+    janitor = get_session_janitor()
+    held = janitor.stats()
+    st.caption(f"🧹 {held['sessions']} sessions holding {held['held_bytes'] / 1024 ** 2:.1f} MB of plots; "
+               f"{held['evicted']} idle sessions cleared after {janitor.ttl // 60} min, "
+               f"{held['freed_bytes'] / 1024 ** 2:.1f} MB freed")
+
+    timings = get_section_timings()
+    if not timings.enabled:
+        st.caption("⏱️ Rerun timing is switched off (CHALLENGER_TIMING=0)")
+        return
+    summary = timings.summary(game)
+    if not summary:
+        st.caption("⏱️ No rerun timings yet")
+        return
+
+    import pandas as pd  # loaded only once the panel is unlocked
+
+    rerun_total = summary["rerun"][0] * summary["rerun"][3] if "rerun" in summary else None
+    frame = pd.DataFrame(
+        [
+            (section, count, p50 * 1e3, p95 * 1e3, mean * 1e3,
+             100 * count * mean / rerun_total
+             if rerun_total and section != "rerun" and not section.endswith(FRAGMENT_SUFFIX) else None)
+            for section, (count, p50, p95, mean) in sorted(summary.items(), key=lambda item: -item[1][3])
+        ],
+        columns=["Section", "Runs", "p50 (ms)", "p95 (ms)", "Mean (ms)", "Share of rerun time"],
+    )
+    st.markdown(f"**⏱️ Rerun timings, last {WINDOW_SLOTS * SLOT_SECONDS // 60} minutes**")
+    st.dataframe(
+        frame,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "p50 (ms)": st.column_config.NumberColumn(format="%.1f"),
+            "p95 (ms)": st.column_config.NumberColumn(format="%.1f"),
+            "Mean (ms)": st.column_config.NumberColumn(format="%.1f"),
+            "Share of rerun time": st.column_config.ProgressColumn(min_value=0, max_value=100, format="%.0f%%"),
+        },
+    )
+    exports = []
+    if METRICS_PORT:
+        exports.append(f"http://127.0.0.1:{METRICS_PORT}/metrics")
+    if METRICS_FILE:
+        exports.append(METRICS_FILE)
+    if exports:
+        st.caption("Prometheus metrics: " + ", ".join(exports))